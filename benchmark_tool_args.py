@@ -0,0 +1,105 @@
+"""
+Micro-benchmark: converting function-call arguments from Gemini protos to Python
+
+Compares the previous hasattr-probing converter, protobuf's MessageToDict
+and core.proto_convert.function_call_args on argument trees the agents
+actually receive (a small file read, budget/worklog row arrays, a workflow).
+
+Usage: python benchmark_tool_args.py [--repeat N]
+"""
+
+import argparse
+import sys
+import timeit
+import warnings
+from pathlib import Path
+
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import google.generativeai as genai
+from google.protobuf.json_format import MessageToDict
+
+from core.proto_convert import function_call_args
+
+
+def legacy_convert(value):
+    """The converter BaseAgent used before core.proto_convert"""
+    if hasattr(value, "items"):
+        return {k: legacy_convert(v) for k, v in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [legacy_convert(v) for v in value]
+    elif hasattr(value, "__iter__") and not isinstance(value, (str, bytes)):
+        return [legacy_convert(v) for v in value]
+    return value
+
+
+def _rows(count: int, columns: int):
+    return [[f"항목 {i}-{c}" if c else f"{i * 1000}" for c in range(columns)] for i in range(count)]
+
+
+def sample_calls():
+    return {
+        "read_local_file": genai.protos.FunctionCall(
+            name="read_local_file",
+            args={"path": "reports/weekly.md", "offset": 0, "length": 8192}
+        ),
+        "update_budget_to_sheets (50 rows)": genai.protos.FunctionCall(
+            name="update_budget_to_sheets",
+            args={"spreadsheet_id": "1AbC", "sheet_name": "Opex", "headers": ["항목", "금액", "비고"], "budget_data": _rows(50, 3)}
+        ),
+        "update_budget_to_sheets (500 rows)": genai.protos.FunctionCall(
+            name="update_budget_to_sheets",
+            args={"spreadsheet_id": "1AbC", "sheet_name": "Capex", "headers": ["항목", "금액", "비고", "담당", "일자"], "budget_data": _rows(500, 5)}
+        ),
+        "update_worklog (100 rows)": genai.protos.FunctionCall(
+            name="update_worklog",
+            args={"spreadsheet_id": "1AbC", "log_data": _rows(100, 4)}
+        ),
+        "submit_workflow (10 nodes)": genai.protos.FunctionCall(
+            name="submit_workflow",
+            args={
+                "name": "분기 보고",
+                "global_context": {"project": "nextnine", "quarter": 3},
+                "nodes": [
+                    {
+                        "id": f"n{i}",
+                        "agent_id": "finance_agent",
+                        "task": "예산 집계 " * 5,
+                        "depends_on": [f"n{i - 1}"] if i else [],
+                        "instructions": {"format": "table", "limit": 20}
+                    }
+                    for i in range(10)
+                ]
+            }
+        )
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200, help="Conversions per measurement")
+    args = parser.parse_args()
+
+    converters = {
+        "legacy": lambda fc: legacy_convert(fc.args),
+        "MessageToDict": lambda fc: MessageToDict(type(fc).pb(fc).args),
+        "function_call_args": function_call_args
+    }
+
+    print(f"{'call':<36}" + "".join(f"{name:>20}" for name in converters) + f"{'speedup':>10}")
+    for label, fc in sample_calls().items():
+        expected = legacy_convert(fc.args)
+        timings = {}
+        for name, convert in converters.items():
+            assert convert(fc) == expected, f"{name} disagrees on {label}"
+            # Best of 5 to damp scheduler noise
+            seconds = min(timeit.repeat(lambda: convert(fc), number=args.repeat, repeat=5)) / args.repeat
+            timings[name] = seconds
+        speedup = timings['legacy'] / timings['function_call_args']
+        print(f"{label:<36}" + "".join(f"{t * 1e6:>17.1f} µs" for t in timings.values()) + f"{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,22 @@
 MCP Agent CLI - Command-line interface for agent interaction
 """
 
+import sys
+import sqlite3
 import click
 import requests
 import json
+import time
+from pathlib import Path
 from rich.console import Console
+from rich.live import Live
 from rich.table import Table
 from rich.panel import Panel
 from rich.markdown import Markdown
 
+# Add parent directory to Python path (offline reports use core directly)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 console = Console()
 MCP_SERVER_URL = "http://localhost:8000"
 
@@ -85,6 +93,8 @@ def ask(agent_id, message, session, context):
         )
         console.print(panel)
         
+        if data.get('routed_from'):
+            console.print(f"\n[dim]⚡ Fast-routed from {data['routed_from']} to {data['agent_id']}[/dim]")
         console.print(f"\n[dim]Session ID: {data['session_id']}[/dim]")
         
     except requests.exceptions.ConnectionError:
@@ -125,12 +135,16 @@ def status(agent_id):
 
 @cli.command()
 @click.option('--agent', '-a', help='Filter by agent ID')
-def sessions(agent):
+@click.option('--limit', '-l', default=50, help='Number of sessions per page')
+@click.option('--cursor', help='Cursor from the previous page')
+def sessions(agent, limit, cursor):
     """List conversation sessions"""
     try:
-        params = {}
+        params = {'limit': limit}
         if agent:
             params['agent_id'] = agent
+        if cursor:
+            params['cursor'] = cursor
         
         response = requests.get(f"{MCP_SERVER_URL}/api/v1/sessions", params=params)
         response.raise_for_status()
@@ -151,7 +165,9 @@ def sessions(agent):
             )
         
         console.print(table)
-        console.print(f"\n[bold]Total sessions:[/bold] {data['total']}")
+        console.print(f"\n[bold]Sessions shown:[/bold] {data['count']}")
+        if data['next_cursor']:
+            console.print(f"[dim]Next page: --cursor {data['next_cursor']}[/dim]")
         
     except requests.exceptions.ConnectionError:
         console.print("[bold red]❌ Error: Cannot connect to MCP server[/bold red]")
@@ -162,12 +178,17 @@ def sessions(agent):
 @cli.command()
 @click.argument('session_id')
 @click.option('--limit', '-l', default=50, help='Number of messages to show')
-def history(session_id, limit):
+@click.option('--before', type=int, help='Show messages older than this cursor')
+def history(session_id, limit, before):
     """Show conversation history for a session"""
     try:
+        params = {'limit': limit}
+        if before:
+            params['before'] = before
+        
         response = requests.get(
             f"{MCP_SERVER_URL}/api/v1/session/{session_id}/history",
-            params={'limit': limit}
+            params=params
         )
         response.raise_for_status()
         data = response.json()
@@ -184,12 +205,233 @@ def history(session_id, limit):
                 console.print(f"[bold green]🤖 Agent:[/bold green] {content}\n")
         
         console.print(f"[dim]Total messages: {data['message_count']}[/dim]")
+        if data.get('next_cursor'):
+            console.print(f"[dim]Older messages: --before {data['next_cursor']}[/dim]")
+        
+    except requests.exceptions.ConnectionError:
+        console.print("[bold red]❌ Error: Cannot connect to MCP server[/bold red]")
+    except Exception as e:
+        console.print(f"[bold red]❌ Error: {str(e)}[/bold red]")
+
+
+@cli.command()
+@click.argument('query')
+@click.option('--agent', '-a', help='Filter by agent ID')
+@click.option('--session', '-s', help='Filter by session ID')
+@click.option('--since', help='Only messages at or after this local time (YYYY-MM-DD[ HH:MM:SS])')
+@click.option('--until', help='Only messages before this time')
+@click.option('--limit', '-l', default=20, help='Results per page')
+@click.option('--page', '-p', default=1, help='Page number')
+@click.option('--recent', is_flag=True, help='Newest first instead of by relevance')
+def search(query, agent, session, since, until, limit, page, recent):
+    """Search conversation history"""
+    try:
+        params = {
+            'q': query,
+            'limit': limit,
+            'offset': (page - 1) * limit,
+            'sort': 'recent' if recent else 'rank'
+        }
+        for key, value in (('agent_id', agent), ('session_id', session), ('since', since), ('until', until)):
+            if value:
+                params[key] = value
+        
+        response = requests.get(f"{MCP_SERVER_URL}/api/v1/history/search", params=params)
+        response.raise_for_status()
+        data = response.json()
+        
+        table = Table(title=f"🔎 Search: {query}", show_header=True, header_style="bold magenta")
+        table.add_column("Time", style="yellow")
+        table.add_column("Agent", style="green")
+        table.add_column("Session", style="cyan")
+        table.add_column("Role", style="blue")
+        table.add_column("Match")
+        
+        for result in data['results']:
+            table.add_row(
+                result['timestamp'],
+                result['agent_id'],
+                result['session_id'][:16] + "...",
+                result['role'],
+                result['snippet']
+            )
+        
+        console.print(table)
+        if data['next_offset'] is not None:
+            console.print(f"\n[dim]More results: --page {page + 1}[/dim]")
+        
+    except requests.exceptions.ConnectionError:
+        console.print("[bold red]❌ Error: Cannot connect to MCP server[/bold red]")
+    except Exception as e:
+        console.print(f"[bold red]❌ Error: {str(e)}[/bold red]")
+
+
+@cli.command()
+@click.option('--evaluate', '-e', is_flag=True, help='Replay logged sessions to measure routing accuracy')
+def routing(evaluate):
+    """Show fast-routing metrics (and optionally run an offline evaluation)"""
+    try:
+        if evaluate:
+            response = requests.get(f"{MCP_SERVER_URL}/api/v1/routing/evaluate")
+            response.raise_for_status()
+            results = response.json()
+            
+            table = Table(title="🧭 Routing Evaluation", show_header=True, header_style="bold magenta")
+            table.add_column("Metric", style="cyan")
+            for name in results:
+                table.add_column(name.capitalize(), style="green")
+            for key in ("samples", "routed", "correct", "precision", "coverage", "top1_accuracy"):
+                table.add_row(key, *[str(result[key]) for result in results.values()])
+            console.print(table)
+            
+            for miss in results['combined']['misroutes']:
+                console.print(f"[red]✗[/red] {miss['message'][:60]} → {miss['routed_to']} (expected {miss['expected']})")
         
+        response = requests.get(f"{MCP_SERVER_URL}/api/v1/routing/metrics")
+        response.raise_for_status()
+        metrics = response.json()['metrics']
+        
+        console.print(f"\n[bold]Requests:[/bold] {metrics['requests']} "
+                      f"(direct {metrics['direct']}, via master {metrics['fallback']})")
+        console.print(f"[bold]Avg latency:[/bold] direct {metrics['avg_direct_seconds']}s / "
+                      f"via master {metrics['avg_fallback_seconds']}s")
+        console.print(f"[bold]Estimated time saved:[/bold] {metrics['estimated_seconds_saved']}s")
+        
+    except requests.exceptions.ConnectionError:
+        console.print("[bold red]❌ Error: Cannot connect to MCP server[/bold red]")
+    except Exception as e:
+        console.print(f"[bold red]❌ Error: {str(e)}[/bold red]")
+
+
+def _dashboard_table(agents: dict) -> Table:
+    table = Table(title="📋 Agent Dashboard", show_header=True, header_style="bold magenta")
+    table.add_column("Agent", style="cyan", no_wrap=True)
+    table.add_column("In progress", style="green")
+    table.add_column("Waiting", style="yellow")
+    table.add_column("Blocking", style="red")
+    table.add_column("Next", style="blue")
+    table.add_column("Turns", justify="right")
+    table.add_column("Updated", style="dim", no_wrap=True)
+    
+    def cell(items):
+        if not items:
+            return "-"
+        return items[0][:40] + (f" (+{len(items) - 1})" if len(items) > 1 else "")
+    
+    for agent_id in sorted(agents):
+        entry = agents[agent_id]
+        status = entry['status']
+        table.add_row(
+            entry['agent_name'],
+            cell(status['in_progress']),
+            cell(status['waiting']),
+            cell(status['blocking_issues']),
+            cell(status['next_steps']),
+            str(entry['turns']),
+            (status['updated_at'] or "-").replace('T', ' ')[:16]
+        )
+    return table
+
+
+@cli.command()
+@click.option('--interval', '-i', default=2.0, help='Refresh interval in seconds')
+@click.option('--once', is_flag=True, help='Print the dashboard once and exit')
+def dashboard(interval, once):
+    """Live status of all agents"""
+    agents = {}
+    etag = None
+    version = 0
+    
+    def refresh() -> bool:
+        """Fetch changes since the last version; False when nothing changed"""
+        nonlocal etag, version
+        headers = {"If-None-Match": etag} if etag else {}
+        response = requests.get(
+            f"{MCP_SERVER_URL}/api/v1/agents/status",
+            params={"since": version},
+            headers=headers
+        )
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+        data = response.json()
+        
+        # A restarted server has a new ETag epoch and restarts its version count
+        if etag and data['etag'].split("-")[0] != etag.split("-")[0]:
+            agents.clear()
+            etag, version = None, 0
+            return refresh()
+        
+        for entry in data['agents']:
+            agents[entry['agent_id']] = entry
+        etag, version = response.headers.get("ETag"), data['version']
+        return True
+    
+    try:
+        refresh()
+        if once:
+            console.print(_dashboard_table(agents))
+            return
+        
+        with Live(_dashboard_table(agents), console=console, refresh_per_second=4) as live:
+            while True:
+                time.sleep(interval)
+                if refresh():
+                    live.update(_dashboard_table(agents))
+    
+    except KeyboardInterrupt:
+        pass
     except requests.exceptions.ConnectionError:
         console.print("[bold red]❌ Error: Cannot connect to MCP server[/bold red]")
     except Exception as e:
         console.print(f"[bold red]❌ Error: {str(e)}[/bold red]")
 
 
+@cli.command()
+@click.option('--by', 'group_by', default='tool', type=click.Choice(['tool', 'agent', 'agent_tool', 'day']), help='Grouping')
+@click.option('--agent', '-a', help='Filter by agent ID')
+@click.option('--tool', '-t', help='Filter by tool name')
+@click.option('--since', default='7d', help='ISO date or relative age (7d, 12h, 30m)')
+@click.option('--until', help='ISO date or relative age')
+@click.option('--sort', default='p95_ms', help='Column to rank by',
+              type=click.Choice(['calls', 'errors', 'error_rate', 'avg_ms', 'p50_ms', 'p95_ms', 'max_ms', 'total_ms']))
+@click.option('--limit', '-l', default=20, help='Number of rows')
+@click.option('--data-dir', type=click.Path(file_okay=False, path_type=Path),
+              default=Path(__file__).parent.parent / "data", help='Server data directory')
+def actions(group_by, agent, tool, since, until, sort, limit, data_dir):
+    """Tool latency/error report from the action log (runs locally, no server needed)"""
+    from core.action_index import open_action_index
+    
+    try:
+        index = open_action_index(data_dir)
+        started = time.perf_counter()
+        ingested = index.ingest()
+        report = index.summary(group_by, agent, tool, None, since, until, sort, limit)
+        elapsed = time.perf_counter() - started
+        
+        table = Table(title=f"🛠️ Tool Calls by {group_by}", show_header=True, header_style="bold magenta")
+        key_columns = {"tool": ["tool"], "agent": ["agent_id"], "agent_tool": ["agent_id", "tool"], "day": ["day"]}[group_by]
+        for column in key_columns:
+            table.add_column(column, style="cyan", no_wrap=True)
+        for column in ("calls", "errors", "timeouts", "error_rate", "avg_ms", "p50_ms", "p95_ms", "max_ms"):
+            table.add_column(column, justify="right")
+        
+        def cell(value):
+            return "-" if value is None else str(value)
+        
+        for row in report['rows']:
+            table.add_row(
+                *[row[column] for column in key_columns],
+                *[cell(row[column]) for column in ("calls", "errors", "timeouts", "error_rate", "avg_ms", "p50_ms", "p95_ms", "max_ms")]
+            )
+        
+        console.print(table)
+        console.print(f"[dim]{report['total_calls']} call(s) matched, {ingested['ingested']} newly indexed, "
+                      f"{elapsed:.2f}s[/dim]")
+    
+    except (ValueError, sqlite3.Error, OSError) as e:
+        console.print(f"[bold red]❌ Error: {str(e)}[/bold red]")
+
+
 if __name__ == '__main__':
     cli()
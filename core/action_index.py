@@ -0,0 +1,331 @@
+"""
+Action Index - Incremental SQLite index and vectorized analytics over agent_actions.log
+"""
+
+import json
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.db_migrations import Migration, apply_migrations
+
+
+def _migrate_base_schema(conn: sqlite3.Connection) -> None:
+    # One row per tool call; ts is epoch seconds so range filters stay numeric
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS actions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL NOT NULL,
+            day DATE NOT NULL,
+            agent_id TEXT NOT NULL,
+            tool TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            mode TEXT,
+            status TEXT,
+            queued_ms REAL,
+            duration_ms REAL,
+            log_offset INTEGER NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_actions_agent_tool_ts ON actions(agent_id, tool, ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_actions_tool_ts ON actions(tool, ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_actions_ts ON actions(ts)")
+
+    # How far into the log file ingestion has got
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_state (
+            log_path TEXT PRIMARY KEY,
+            inode INTEGER,
+            offset INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME
+        )
+    """)
+
+
+# Append new migrations here; never edit one that has shipped
+MIGRATIONS: List[Migration] = [
+    (1, "actions table", _migrate_base_schema),
+]
+
+# summary group_by -> grouping columns
+GROUPS = {
+    "tool": ("tool",),
+    "agent": ("agent_id",),
+    "agent_tool": ("agent_id", "tool"),
+    "day": ("day",)
+}
+SORT_KEYS = ("calls", "errors", "error_rate", "avg_ms", "p50_ms", "p95_ms", "max_ms", "total_ms")
+
+_RELATIVE = re.compile(r"(\d+)([mhdw])")
+_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds from an ISO date/datetime or a relative age like '7d', '12h', '30m'"""
+    if not value:
+        return None
+    match = _RELATIVE.fullmatch(value.strip())
+    if match:
+        delta = timedelta(**{_UNITS[match.group(2)]: int(match.group(1))})
+        return (datetime.now() - delta).timestamp()
+    return datetime.fromisoformat(value.strip()).timestamp()
+
+
+def _row_from_entry(entry: Dict, offset: int) -> Optional[tuple]:
+    try:
+        ts = datetime.fromisoformat(entry['timestamp']).timestamp()
+        agent_id, tool = entry['agent_id'], entry['tool']
+    except (KeyError, TypeError, ValueError):
+        return None
+    result = entry.get('result')
+    status = result.get('status') if isinstance(result, dict) else None
+    # Entries written before timing was logged only carry the result status
+    outcome = entry.get('outcome') or ("error" if status == "error" else "timeout" if status == "timeout" else "success")
+    return (ts, entry['timestamp'][:10], agent_id, tool, outcome, entry.get('mode'), status,
+            entry.get('queued_ms'), entry.get('duration_ms'), offset)
+
+
+class ActionLogIndex:
+    """Tails data/logs/agent_actions.log into an indexed SQLite table.
+
+    ingest() resumes from the byte offset it stopped at, only consumes
+    complete lines, and starts over when the log was rotated or
+    truncated. Aggregations load just the filtered columns into numpy
+    arrays and group them in one pass, so percentiles over millions of
+    calls don't go through Python loops.
+    """
+
+    def __init__(self, db_path: Path, log_path: Path):
+        self.db_path = db_path
+        self.log_path = log_path
+        conn = self._connect()
+        # WAL lets queries read while ingestion writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        apply_migrations(conn, MIGRATIONS)
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def ingest(self, batch_lines: int = 50000) -> Dict:
+        """Index log lines appended since the last run"""
+        if not self.log_path.exists():
+            return {"ingested": 0, "skipped": 0, "offset": 0}
+
+        stat = self.log_path.stat()
+        log_key = str(self.log_path.resolve())
+        conn = self._connect()
+        conn.isolation_level = None
+        ingested = skipped = 0
+        try:
+            # Serializes concurrent ingesters (several workers, CLI next to the server)
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT inode, offset FROM ingest_state WHERE log_path = ?", (log_key,)).fetchone()
+            offset = row[1] if row else 0
+            if row and (row[0] != stat.st_ino or stat.st_size < offset):
+                offset = 0
+
+            with open(self.log_path, 'rb') as f:
+                f.seek(offset)
+                while True:
+                    lines = f.readlines(batch_lines * 256)
+                    if not lines:
+                        break
+                    # Leave a partially written last line for the next run
+                    if not lines[-1].endswith(b"\n"):
+                        lines.pop()
+                        if not lines:
+                            break
+                    rows = []
+                    for line in lines:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            entry = None
+                        parsed = _row_from_entry(entry, offset) if isinstance(entry, dict) else None
+                        if parsed:
+                            rows.append(parsed)
+                        elif line.strip():
+                            skipped += 1
+                        offset += len(line)
+                    conn.executemany("""
+                        INSERT INTO actions (ts, day, agent_id, tool, outcome, mode, status, queued_ms, duration_ms, log_offset)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, rows)
+                    ingested += len(rows)
+                    f.seek(offset)
+
+            conn.execute("""
+                INSERT INTO ingest_state (log_path, inode, offset, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(log_path) DO UPDATE SET
+                    inode = excluded.inode, offset = excluded.offset, updated_at = excluded.updated_at
+            """, (log_key, stat.st_ino, offset, datetime.now().isoformat()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return {"ingested": ingested, "skipped": skipped, "offset": offset}
+
+    def _where(
+        self,
+        agent_id: Optional[str],
+        tool: Optional[str],
+        outcome: Optional[str],
+        since: Optional[str],
+        until: Optional[str]
+    ):
+        where, params = [], []
+        for column, value in (("agent_id", agent_id), ("tool", tool), ("outcome", outcome)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            where.append("ts >= ?")
+            params.append(parse_time(since))
+        if until:
+            where.append("ts < ?")
+            params.append(parse_time(until))
+        return (f"WHERE {' AND '.join(where)}" if where else ""), params
+
+    def summary(
+        self,
+        group_by: str = "tool",
+        agent_id: Optional[str] = None,
+        tool: Optional[str] = None,
+        outcome: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        sort: str = "p95_ms",
+        limit: int = 50
+    ) -> Dict:
+        """Calls, errors, timeouts and latency percentiles per tool, agent, agent+tool or day"""
+        if group_by not in GROUPS:
+            raise ValueError(f"group_by must be one of {sorted(GROUPS)}")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {list(SORT_KEYS)}")
+
+        where_sql, params = self._where(agent_id, tool, outcome, since, until)
+        key_sql = " || char(31) || ".join(GROUPS[group_by])
+        conn = self._connect()
+        # Outcome as a small code and missing durations as -1 keep every column numeric
+        rows = conn.execute(f"""
+            SELECT {key_sql},
+                   CASE outcome WHEN 'error' THEN 1 WHEN 'timeout' THEN 2 ELSE 0 END,
+                   IFNULL(duration_ms, -1.0)
+            FROM actions {where_sql}
+        """, params).fetchall()
+        conn.close()
+
+        if not rows:
+            return {"group_by": group_by, "total_calls": 0, "rows": []}
+
+        # Factorize group keys to dense integer codes in a single pass
+        codes: Dict[str, int] = {}
+        group = np.fromiter((codes.setdefault(row[0], len(codes)) for row in rows), dtype=np.int64, count=len(rows))
+        outcomes = np.fromiter((row[1] for row in rows), dtype=np.int8, count=len(rows))
+        durations = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        # Calls logged before timing was recorded have no duration
+        durations[durations < 0] = np.nan
+        labels = np.array(list(codes), dtype=object)
+        n_groups = len(labels)
+
+        calls = np.bincount(group, minlength=n_groups)
+        errors = np.bincount(group, weights=outcomes == 1, minlength=n_groups).astype(int)
+        timeouts = np.bincount(group, weights=outcomes == 2, minlength=n_groups).astype(int)
+
+        timed = ~np.isnan(durations)
+        timed_group, timed_durations = group[timed], durations[timed]
+        timed_calls = np.bincount(timed_group, minlength=n_groups)
+        total_ms = np.bincount(timed_group, weights=timed_durations, minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_ms = total_ms / timed_calls
+
+        # Percentiles: sort once by (group, duration), then index into each group's run
+        order = np.lexsort((timed_durations, timed_group))
+        sorted_durations = timed_durations[order]
+        starts = np.concatenate(([0], np.cumsum(timed_calls)[:-1]))
+
+        def percentile(q: float) -> np.ndarray:
+            values = np.full(n_groups, np.nan)
+            present = timed_calls > 0
+            values[present] = sorted_durations[starts[present] + np.floor((timed_calls[present] - 1) * q).astype(int)]
+            return values
+
+        stats = {
+            "calls": calls,
+            "errors": errors,
+            "error_rate": errors / calls,
+            "avg_ms": avg_ms,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": percentile(1.0),
+            "total_ms": total_ms
+        }
+        # Largest first (NaN last), except days which read best newest first
+        if group_by == "day":
+            ranking = np.argsort(labels)[::-1]
+        else:
+            ranking = np.argsort(-np.nan_to_num(stats[sort], nan=-np.inf), kind="stable")
+
+        result_rows = []
+        for i in ranking[:limit]:
+            row = dict(zip(GROUPS[group_by], labels[i].split("\x1f")))
+            row.update({
+                "calls": int(calls[i]),
+                "errors": int(errors[i]),
+                "timeouts": int(timeouts[i]),
+                "error_rate": round(float(stats['error_rate'][i]), 4),
+                **{
+                    key: (None if np.isnan(stats[key][i]) else round(float(stats[key][i]), 1))
+                    for key in ("avg_ms", "p50_ms", "p95_ms", "max_ms", "total_ms")
+                }
+            })
+            result_rows.append(row)
+
+        return {"group_by": group_by, "total_calls": len(rows), "rows": result_rows}
+
+    def calls(
+        self,
+        agent_id: Optional[str] = None,
+        tool: Optional[str] = None,
+        outcome: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        sort: str = "recent",
+        limit: int = 50
+    ) -> List[Dict]:
+        """Individual calls, newest first or slowest first"""
+        if sort not in ("recent", "slowest"):
+            raise ValueError("sort must be 'recent' or 'slowest'")
+        where_sql, params = self._where(agent_id, tool, outcome, since, until)
+        order_sql = "ts DESC" if sort == "recent" else "duration_ms IS NULL, duration_ms DESC"
+
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(f"""
+            SELECT ts, agent_id, tool, outcome, mode, status, queued_ms, duration_ms, log_offset
+            FROM actions {where_sql}
+            ORDER BY {order_sql}
+            LIMIT ?
+        """, (*params, limit)).fetchall()
+        conn.close()
+
+        return [
+            {
+                **{key: row[key] for key in row.keys() if key != "ts"},
+                "timestamp": datetime.fromtimestamp(row['ts']).isoformat()
+            }
+            for row in rows
+        ]
+
+
+def open_action_index(data_dir: Path) -> ActionLogIndex:
+    """Index for a data directory (data/action_index.db over data/logs/agent_actions.log)"""
+    return ActionLogIndex(data_dir / "action_index.db", data_dir / "logs" / "agent_actions.log")
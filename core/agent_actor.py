@@ -0,0 +1,166 @@
+"""
+Agent Actor - Per-agent bounded mailbox and worker tasks
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from core.base_agent import BaseAgent
+from core.job_queue import current_job_id
+from core.tool_loop import TurnResult
+
+
+class MailboxFullError(RuntimeError):
+    """Raised when a message is offered to an agent whose mailbox is full"""
+
+
+class AgentActor:
+    """Runs an agent's turns from a bounded inbox with limited parallelism.
+
+    Up to `max_concurrency` turns of the same agent run at once; tools that
+    mutate the agent's own state are additionally serialized by the agent's
+    state lock (see BaseAgent.STATE_MUTATING_TOOLS), so read-only work still
+    overlaps. Callers either wait for mailbox space or get MailboxFullError
+    to turn into backpressure (HTTP 429).
+    """
+
+    def __init__(self, agent: BaseAgent, max_concurrency: int = 2, mailbox_size: int = 32):
+        self.agent = agent
+        self.max_concurrency = max(1, max_concurrency)
+        self.mailbox_size = max(1, mailbox_size)
+        self.inbox: asyncio.Queue = asyncio.Queue(maxsize=self.mailbox_size)
+        self.active = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        for _ in range(self.max_concurrency):
+            self._workers.append(asyncio.create_task(self._work()))
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # Fail whatever is still waiting so callers don't hang
+        while not self.inbox.empty():
+            *_, future = self.inbox.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError(f"Agent '{self.agent.agent_id}' stopped"))
+
+    async def ask(
+        self,
+        message: str,
+        session_id: str,
+        context_package: Optional[Dict] = None,
+        wait_for_slot: bool = True
+    ) -> TurnResult:
+        """Queue a turn and wait for its response"""
+        future = asyncio.get_running_loop().create_future()
+        # The turn runs in a worker task; carry the caller's job so delegations are its children
+        item = (message, session_id, context_package, current_job_id.get(), future)
+
+        if wait_for_slot:
+            await self.inbox.put(item)
+        else:
+            try:
+                self.inbox.put_nowait(item)
+            except asyncio.QueueFull:
+                self.rejected += 1
+                raise MailboxFullError(
+                    f"Agent '{self.agent.agent_id}' mailbox is full ({self.mailbox_size} queued)"
+                )
+
+        return await future
+
+    async def _work(self) -> None:
+        while True:
+            message, session_id, context_package, job_id, future = await self.inbox.get()
+            token = current_job_id.set(job_id)
+            try:
+                # Caller went away while queued
+                if future.cancelled():
+                    continue
+
+                self.active += 1
+                try:
+                    response = await self._run_turn(message, session_id, context_package)
+                    self.processed += 1
+                    if not future.done():
+                        future.set_result(response)
+                except Exception as e:
+                    self.failed += 1
+                    if not future.done():
+                        future.set_exception(e)
+                finally:
+                    self.active -= 1
+            finally:
+                current_job_id.reset(token)
+                self.inbox.task_done()
+
+    async def _run_turn(self, message: str, session_id: str, context_package: Optional[Dict]) -> TurnResult:
+        # Agents that override process() keep their own turn logic (no loop stats)
+        if type(self.agent).process is not BaseAgent.process:
+            return TurnResult(response=await self.agent.process(
+                user_message=message,
+                session_id=session_id,
+                context_package=context_package
+            ))
+        return await self.agent.run_turn(message, session_id, context_package)
+
+    def stats(self) -> Dict:
+        return {
+            "agent_id": self.agent.agent_id,
+            "queued": self.inbox.qsize(),
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "mailbox_size": self.mailbox_size,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
+
+
+class ActorSystem:
+    """One actor per agent, created on first use"""
+
+    def __init__(
+        self,
+        default_concurrency: int = 2,
+        default_mailbox_size: int = 32,
+        agent_settings: Optional[Dict[str, Dict]] = None
+    ):
+        self.default_concurrency = default_concurrency
+        self.default_mailbox_size = default_mailbox_size
+        # agent_id -> {"max_concurrency": int, "mailbox_size": int}
+        self.agent_settings = agent_settings or {}
+        self.actors: Dict[str, AgentActor] = {}
+
+    def actor_for(self, agent: BaseAgent) -> AgentActor:
+        actor = self.actors.get(agent.agent_id)
+        if actor:
+            # Agent re-registered at runtime: keep the mailbox, swap the instance
+            actor.agent = agent
+            return actor
+
+        settings = self.agent_settings.get(agent.agent_id, {})
+        actor = AgentActor(
+            agent,
+            max_concurrency=settings.get('max_concurrency', self.default_concurrency),
+            mailbox_size=settings.get('mailbox_size', self.default_mailbox_size)
+        )
+        actor.start()
+        self.actors[agent.agent_id] = actor
+        return actor
+
+    async def stop(self) -> None:
+        await asyncio.gather(*(actor.stop() for actor in self.actors.values()))
+
+    def stats(self, agent_id: Optional[str] = None) -> List[Dict]:
+        return [
+            actor.stats() for actor in self.actors.values()
+            if agent_id is None or actor.agent.agent_id == agent_id
+        ]
@@ -74,7 +74,8 @@ class AgentLoader:
                     job_category=agent_config.get('job_category'),
                     scope=agent_config.get('scope'),
                     tools=agent_config.get('tools'),
-                    integrations=agent_config.get('integrations')
+                    integrations=agent_config.get('integrations'),
+                    tool_loop=agent_config.get('tool_loop')
                 )
                 
                 self.agents[agent_config['id']] = agent
@@ -132,7 +133,8 @@ class AgentLoader:
                 work_docs_dir=self.work_docs_dir,
                 job_category=agent_config.get('job_category'),
                 scope=agent_config.get('scope'),
-                tools=agent_config.get('tools', [])
+                tools=agent_config.get('tools', []),
+                tool_loop=agent_config.get('tool_loop')
             )
             
             # 2. Add to active agents
@@ -0,0 +1,186 @@
+"""
+Artifact Store - Content-addressed storage for payloads too large to pass inline
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core.file_tools import DEFAULT_READ_BYTES, read_bytes_range
+
+try:
+    import zstandard
+except ImportError:  # optional dependency; gzip is always available
+    zstandard = None
+
+
+REF_PREFIX = "sha256:"
+REF_PATTERN = re.compile(r"sha256:([0-9a-f]{64})")
+
+PREVIEW_CHARS = 160
+
+
+class ArtifactStore:
+    """Immutable text blobs keyed by the SHA-256 of their content.
+
+    Blobs live at <root>/<first two hex digits>/<hex>.<txt|zst|gz>, so
+    storing the same content twice is a no-op and a reference stays valid
+    for as long as the file exists. Blobs of at least `compress_min_bytes`
+    are written compressed (zstd when installed, else gzip); 0 disables
+    compression. The hash is always taken over the uncompressed text.
+    """
+
+    def __init__(self, root: Path, compress_min_bytes: int = 4096, level: int = 10):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compress_min_bytes = compress_min_bytes
+        self.level = level
+        self.extension = "zst" if zstandard else "gz"
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.dedupe_hits = 0
+        self.bytes_in = 0
+        self.bytes_written = 0
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def parse_ref(ref: str) -> Optional[str]:
+        """Hex digest from 'sha256:<hex>', a bare digest or an inlined reference string"""
+        ref = ref.strip()
+        if re.fullmatch(r"[0-9a-f]{64}", ref):
+            return ref
+        match = REF_PATTERN.search(ref)
+        return match.group(1) if match else None
+
+    def _find(self, digest: str) -> Optional[Path]:
+        for extension in ("txt", "zst", "gz"):
+            path = self.root / digest[:2] / f"{digest}.{extension}"
+            if path.is_file():
+                return path
+        return None
+
+    def _compress(self, data: bytes) -> bytes:
+        if zstandard:
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=min(self.level, 9))
+
+    @staticmethod
+    def _decompress(path: Path, data: bytes) -> bytes:
+        if path.suffix == ".zst":
+            if not zstandard:
+                raise RuntimeError(f"zstandard is required to read {path.name}")
+            return zstandard.ZstdDecompressor().decompress(data)
+        if path.suffix == ".gz":
+            return gzip.decompress(data)
+        return data
+
+    def put(self, text: str) -> str:
+        """Store text and return its reference"""
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.bytes_in += len(data)
+            if self._find(digest):
+                self.dedupe_hits += 1
+                return REF_PREFIX + digest
+
+            if self.compress_min_bytes and len(data) >= self.compress_min_bytes:
+                data, extension = self._compress(data), self.extension
+            else:
+                extension = "txt"
+            path = self.root / digest[:2] / f"{digest}.{extension}"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so a concurrent reader never sees a partial blob
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self.writes += 1
+            self.bytes_written += len(data)
+        return REF_PREFIX + digest
+
+    def get_bytes(self, ref: str) -> Optional[bytes]:
+        digest = self.parse_ref(ref)
+        path = self._find(digest) if digest else None
+        if path is None:
+            return None
+        return self._decompress(path, path.read_bytes())
+
+    def get(self, ref: str) -> Optional[str]:
+        data = self.get_bytes(ref)
+        return data.decode('utf-8') if data is not None else None
+
+    def exists(self, ref: str) -> bool:
+        digest = self.parse_ref(ref)
+        return digest is not None and self._find(digest) is not None
+
+    def read(self, ref: str, offset: int = 0, length: int = DEFAULT_READ_BYTES) -> Optional[Dict]:
+        """A byte window of an artifact, shaped like read_local_file's result"""
+        data = self.get_bytes(ref)
+        if data is None:
+            return None
+        return read_bytes_range(data, offset=offset, length=length)
+
+    def reference(self, text: str) -> str:
+        """Store text and return the inline stand-in: reference, size and a preview"""
+        ref = self.put(text)
+        return f"[{ref} · {len(text)}자] {text[:PREVIEW_CHARS]}…"
+
+    def externalize(self, text: str, min_chars: int) -> str:
+        """text itself when shorter than min_chars (or min_chars is 0), else its inline reference"""
+        if not min_chars or len(text) < min_chars:
+            return text
+        return self.reference(text)
+
+    def externalize_value(self, value: Any, min_chars: int) -> Any:
+        """A JSON-able value, replaced by the reference of its JSON when that is min_chars or longer"""
+        if not min_chars or isinstance(value, (int, float, bool)) or value is None:
+            return value
+        text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+        if len(text) < min_chars:
+            return value
+        return self.reference(text)
+
+    def stats(self) -> Dict:
+        blobs = 0
+        stored_bytes = 0
+        for path in self.root.glob("??/*"):
+            if path.suffix in (".txt", ".zst", ".gz"):
+                blobs += 1
+                stored_bytes += path.stat().st_size
+        with self._lock:
+            return {
+                "blobs": blobs,
+                "stored_bytes": stored_bytes,
+                "compression": self.extension if self.compress_min_bytes else None,
+                "writes": self.writes,
+                "dedupe_hits": self.dedupe_hits,
+                "bytes_in": self.bytes_in,
+                "bytes_written": self.bytes_written
+            }
+
+
+# Payloads at least this long are stored once and passed by reference
+INLINE_MAX_CHARS = int(os.getenv("ARTIFACT_INLINE_MAX_CHARS", 4000))
+
+_stores: Dict[Path, ArtifactStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_artifact_store(data_dir: Path) -> ArtifactStore:
+    """Shared store for a data directory (data/artifacts)"""
+    root = (data_dir / "artifacts").resolve()
+    with _stores_lock:
+        if root not in _stores:
+            _stores[root] = ArtifactStore(
+                root,
+                compress_min_bytes=int(os.getenv("ARTIFACT_COMPRESS_MIN_BYTES", 4096))
+            )
+        return _stores[root]
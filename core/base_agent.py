@@ -2,22 +2,42 @@
 Base Agent Class - Foundation for all MCP agents
 """
 
-from abc import ABC, abstractmethod
+from abc import ABC
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional
 import json
 import asyncio
+import inspect
 import warnings
 import google.generativeai as genai
 
+from core.artifact_store import INLINE_MAX_CHARS, get_artifact_store
+from core.context_compactor import ContextCompactor
+from core.resource_registry import get_resource_registry
+from core.status_store import AgentStatus, StatusStore, atomic_write_text
+from core.tool_loop import ToolLoop, ToolLoopLimits, TurnResult, canonical_call_key
+from core.file_tools import DEFAULT_READ_BYTES, list_directory, listing_cache, read_file_range, search_file
+from core.tool_cache import tool_cache
+from core.tool_executor import ToolExecution, ToolPolicy, function_declaration, tool_executor
+from core.token_usage import scale_sections, section_tokens
+from core.tool_registry import ToolArgumentError, ToolSpec, collect_tools, tool, validate_arguments
+
 # Suppress FutureWarning for google.generativeai
 warnings.filterwarnings('ignore', category=FutureWarning, module='google.generativeai')
 
+# Batch file tools: max items per call / items processed at once
+MAX_FILE_BATCH = 20
+FILE_BATCH_CONCURRENCY = 8
+
 
 class BaseAgent(ABC):
     """Base class for all MCP agents"""
     
+    # Tools that change this agent's own state (work_docs files, status);
+    # concurrent turns run them one at a time under state_lock
+    STATE_MUTATING_TOOLS = {"write_local_file", "write_local_files", "update_agent_status"}
+    
     def __init__(
         self,
         agent_id: str,
@@ -30,7 +50,8 @@ class BaseAgent(ABC):
         job_category: Optional[str] = None,
         scope: Optional[Dict] = None,
         tools: Optional[List[str]] = None,
-        integrations: Optional[List[Dict]] = None
+        integrations: Optional[List[Dict]] = None,
+        tool_loop: Optional[Dict] = None
     ):
         self.agent_id = agent_id
         self.agent_name = agent_name
@@ -41,10 +62,22 @@ class BaseAgent(ABC):
         self.scope = scope or {}
         self.tools = tools or []
         self.integrations = integrations or []
+        # Per-turn tool budget (agentconfig.json "tool_loop" overrides TOOL_LOOP_* env defaults)
+        self.tool_loop_limits = ToolLoopLimits.from_config(tool_loop)
         
         # Work documentation
         self.work_docs_dir = work_docs_dir / agent_id
         self.work_docs_dir.mkdir(parents=True, exist_ok=True)
+        self.status_store = StatusStore(self.work_docs_dir, agent_name)
+        
+        # Shared project resources live next to work_docs (data/project_resources.db)
+        self.data_dir = work_docs_dir.parent
+        self.resource_registry = get_resource_registry(self.data_dir)
+        self._resources_cache = (None, "")
+        
+        # Large context payloads are passed by content hash (data/artifacts)
+        self.artifact_store = get_artifact_store(self.data_dir)
+        self.context_compactor = ContextCompactor(self.artifact_store)
         
         # Gemini setup (legacy API for 0.1.0rc1)
         genai.configure(api_key=gemini_api_key)
@@ -56,6 +89,13 @@ class BaseAgent(ABC):
         
         # Conversation history
         self.conversation_history = []
+        
+        # Serializes state mutations when the actor runs several turns at once
+        self.state_lock = asyncio.Lock()
+        
+        # Tool index and model declarations, built from the tool definitions on first use
+        self._tool_specs: Optional[Dict[str, ToolSpec]] = None
+        self._function_declarations: List[Dict] = []
     
     def _build_system_prompt(self) -> str:
         """Build agent persona-based system prompt"""
@@ -80,190 +120,272 @@ class BaseAgent(ABC):
 """
     
     def get_common_tool_definitions(self) -> List[Dict]:
-        """Return common tools available to all agents"""
-        return [
-            {
-                "name": "read_local_file",
-                "description": "로컬 파일을 읽어 내용을 반환합니다.",
-                "parameters": {
+        """Return common tools available to all agents (the @tool methods declared on BaseAgent)"""
+        return [spec.definition() for spec in collect_tools(BaseAgent).values()]
+    
+    def get_tool_definitions(self) -> List[Dict]:
+        """Return agent-specific tool definitions.
+        
+        Defaults to the agent's @tool methods. Agents that still declare
+        tools as dicts override this together with execute_tool().
+        """
+        common = collect_tools(BaseAgent)
+        return [spec.definition() for name, spec in collect_tools(type(self)).items() if name not in common]
+    
+    async def execute_tool(self, tool_name: str, parameters: Dict) -> Dict:
+        """Dispatch for tools declared as dicts in get_tool_definitions (@tool methods are called directly)"""
+        return {"status": "not_implemented", "tool": tool_name}
+
+    @tool(
+        (
+            "로컬 파일의 일부를 읽습니다. 바이트 범위(offset/length) 또는 줄 범위(start_line/end_line)로 읽을 수 있으며, "
+            f"기본값은 처음부터 {DEFAULT_READ_BYTES}바이트입니다. 결과의 next_offset 또는 next_line으로 다음 부분을 이어서 읽으십시오."
+        ),
+        params={
+            "path": "읽을 파일의 경로",
+            "offset": "읽기 시작 바이트 위치",
+            "length": "읽을 최대 바이트 수 (최대 65536)",
+            "start_line": "읽기 시작 줄 (1부터)",
+            "end_line": "마지막 줄 (포함)"
+        },
+        read_only=True,
+        cache_ttl=60
+    )
+    def read_local_file(
+        self,
+        path: str,
+        offset: int = 0,
+        length: int = DEFAULT_READ_BYTES,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None
+    ) -> Dict:
+        file_path = self._resolve_path(path)
+        if not file_path.is_file():
+            return {"status": "error", "message": f"File not found at: {file_path}"}
+        
+        return read_file_range(file_path, offset=offset, length=length, start_line=start_line, end_line=end_line)
+
+    @tool(
+        "파일 내용에서 문자열(또는 정규식)을 검색해 일치하는 줄과 앞뒤 문맥만 반환합니다. 큰 파일에서 필요한 위치를 찾을 때 사용하십시오.",
+        params={
+            "path": "검색할 파일의 경로",
+            "pattern": "찾을 문자열",
+            "regex": "pattern을 정규식으로 해석할지 여부",
+            "context": "일치한 줄 앞뒤로 포함할 줄 수 (기본 1)",
+            "max_matches": "반환할 최대 일치 수 (기본 20)"
+        },
+        read_only=True,
+        cache_ttl=60
+    )
+    def search_local_file(self, path: str, pattern: str, regex: bool = False, context: int = 1, max_matches: int = 20) -> Dict:
+        file_path = self._resolve_path(path)
+        if not file_path.is_file():
+            return {"status": "error", "message": f"File not found at: {file_path}"}
+        
+        return search_file(file_path, pattern, regex=regex, context=context, max_matches=max_matches)
+
+    @tool(
+        "로컬 파일에 내용을 씁니다.",
+        params={
+            "path": "저장할 파일 경로",
+            "content": "저장할 내용",
+            "append": "기존 내용에 추가할지 여부"
+        }
+    )
+    def write_local_file(self, path: str, content: str, append: bool = False) -> Dict:
+        file_path = self._resolve_path(path)
+        
+        # Ensure directory exists
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(file_path, 'a' if append else 'w', encoding='utf-8') as f:
+            f.write(content)
+        listing_cache.invalidate(file_path)
+        tool_cache.invalidate(file_path)
+        
+        return {"status": "success", "message": f"File written to {file_path}", "path": str(file_path)}
+
+    @tool(
+        f"여러 파일을 한 번에 읽습니다 (최대 {MAX_FILE_BATCH}개). 파일별로 read_local_file과 같은 옵션을 쓸 수 있으며 결과는 파일별로 반환됩니다.",
+        params={
+            "files": {
+                "type": "array",
+                "items": {
                     "type": "object",
                     "properties": {
-                        "path": {"type": "string", "description": "읽을 파일의 경로"}
+                        "path": {"type": "string"},
+                        "offset": {"type": "integer"},
+                        "length": {"type": "integer"},
+                        "start_line": {"type": "integer"},
+                        "end_line": {"type": "integer"}
                     },
                     "required": ["path"]
                 }
-            },
-            {
-                "name": "write_local_file",
-                "description": "로컬 파일에 내용을 씁니다.",
-                "parameters": {
+            }
+        },
+        read_only=True,
+        cache_ttl=60
+    )
+    async def read_local_files(self, files: List[Dict]) -> Dict:
+        return await self._run_file_batch(self.read_local_file, files)
+
+    @tool(
+        f"여러 파일을 한 번에 씁니다 (최대 {MAX_FILE_BATCH}개). 같은 파일에 대한 항목은 주어진 순서대로 처리되며 결과는 파일별로 반환됩니다.",
+        params={
+            "files": {
+                "type": "array",
+                "items": {
                     "type": "object",
                     "properties": {
-                        "path": {"type": "string", "description": "저장할 파일 경로"},
-                        "content": {"type": "string", "description": "저장할 내용"},
-                        "append": {"type": "boolean", "description": "기존 내용에 추가할지 여부"}
+                        "path": {"type": "string"},
+                        "content": {"type": "string"},
+                        "append": {"type": "boolean"}
                     },
                     "required": ["path", "content"]
                 }
-            },
-            {
-                "name": "list_files",
-                "description": "지정된 디렉토리의 파일 목록을 반환합니다.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "directory": {"type": "string", "description": "조회할 디렉토리 (기본값: 에이전트 폴더)"}
-                    }
-                }
-            },
-            {
-                "name": "fetch_web_content",
-                "description": "웹 페이지의 URL에 접속하여 내용을 가져옵니다.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "url": {"type": "string", "description": "접속할 URL"}
-                    },
-                    "required": ["url"]
-                }
-            },
-            {
-                "name": "update_agent_status",
-                "description": "에이전트의 현재 작업 상태 및 계획을 업데이트합니다.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "in_progress": {"type": "array", "items": {"type": "string"}},
-                        "waiting": {"type": "array", "items": {"type": "string"}},
-                        "blocking_issues": {"type": "array", "items": {"type": "string"}},
-                        "next_steps": {"type": "array", "items": {"type": "string"}}
-                    }
-                }
             }
-        ]
+        }
+    )
+    async def write_local_files(self, files: List[Dict]) -> Dict:
+        return await self._run_file_batch(self.write_local_file, files, ordered_by_path=True)
 
-    async def execute_common_tool(self, tool_name: str, parameters: Dict) -> Dict:
-        """Execute common tools for all agents with detailed logging"""
-        action_log_file = self.work_docs_dir.parent.parent / "logs" / "agent_actions.log"
-        action_log_file.parent.mkdir(parents=True, exist_ok=True)
+    @tool(
+        (
+            "디렉토리의 파일/폴더 목록을 크기, 수정 시각과 함께 반환합니다. "
+            "depth로 하위 폴더까지 한 번에 조회하고, pattern(glob)으로 거를 수 있습니다. 결과가 많으면 next_offset으로 다음 페이지를 조회하십시오."
+        ),
+        params={
+            "directory": "조회할 디렉토리 (기본값: 에이전트 폴더)",
+            "pattern": "glob 패턴 (예: *.md, reports/*.json)",
+            "depth": "하위 폴더 탐색 깊이 (기본 1, 최대 5)",
+            "offset": "페이지 시작 위치",
+            "limit": "페이지 크기 (기본 100, 최대 500)"
+        },
+        read_only=True,
+        cache_ttl=30
+    )
+    def list_files(
+        self,
+        directory: Optional[str] = None,
+        pattern: Optional[str] = None,
+        depth: int = 1,
+        offset: int = 0,
+        limit: int = 100
+    ) -> Dict:
+        dir_path = self._resolve_path(directory) if directory else self.work_docs_dir
+        if not dir_path.is_dir():
+            return {"status": "error", "message": f"Directory not found: {dir_path}"}
         
-        try:
-            log_entry = {
-                "timestamp": datetime.now().isoformat(),
-                "agent_id": self.agent_id,
-                "tool": tool_name,
-                "parameters": parameters
-            }
-            
-            if tool_name == "read_local_file":
-                path_str = parameters['path']
-                file_path = Path(path_str)
-                if not file_path.is_absolute():
-                    if path_str.startswith("data/"):
-                        # Relative to project root's data dir
-                        file_path = self.work_docs_dir.parent.parent / path_str
-                    else:
-                        file_path = self.work_docs_dir / file_path
-                
-                if not file_path.exists():
-                    return {"status": "error", "message": f"File not found at: {file_path}"}
-                
-                content = file_path.read_text(encoding='utf-8')
-                result = {"status": "success", "content": content[:1000] + ("..." if len(content) > 1000 else "")}
-                
-            elif tool_name == "write_local_file":
-                path_str = parameters['path']
-                file_path = Path(path_str)
-                if not file_path.is_absolute():
-                    if path_str.startswith("data/"):
-                        file_path = self.work_docs_dir.parent.parent / path_str
-                    else:
-                        file_path = self.work_docs_dir / file_path
-                
-                # Ensure directory exists
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                mode = 'a' if parameters.get('append') else 'w'
-                with open(file_path, mode, encoding='utf-8') as f:
-                    f.write(parameters['content'])
-                
-                result = {"status": "success", "message": f"File written to {file_path}", "path": str(file_path)}
+        return list_directory(dir_path, pattern=pattern, depth=depth, offset=offset, limit=limit)
 
-            elif tool_name == "list_files":
-                dir_path = parameters.get('directory')
-                if dir_path:
-                    dir_path = Path(dir_path)
-                    if not dir_path.is_absolute():
-                        dir_path = self.work_docs_dir / dir_path
-                else:
-                    dir_path = self.work_docs_dir
-                
-                if not dir_path.exists():
-                    return {"status": "error", "message": f"Directory not found: {dir_path}"}
-                
-                files = [f.name for f in dir_path.iterdir()]
-                result = {"status": "success", "files": files}
-
-            elif tool_name == "fetch_web_content":
-                import httpx
-                async with httpx.AsyncClient(timeout=15.0) as client:
-                    response = await client.get(parameters['url'], headers={"User-Agent": "Mozilla/5.0"})
-                    response.raise_for_status()
-                    # Return content and metadata for verification
-                    result = {
-                        "status": "success", 
-                        "content": response.text[:2000], 
-                        "url": parameters['url'],
-                        "length": len(response.text)
-                    }
-
-            elif tool_name == "update_agent_status":
-                self.update_current_status(
-                    in_progress=parameters.get('in_progress', []),
-                    waiting=parameters.get('waiting', []),
-                    blocking_issues=parameters.get('blocking_issues', []),
-                    next_steps=parameters.get('next_steps', [])
-                )
-                result = {"status": "success", "message": "Agent status updated"}
-
-            else:
-                result = {"status": "not_implemented", "tool": tool_name}
-
-            # Append to action log
-            log_entry["result"] = result
-            with open(action_log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-            
-            return result
+    @tool(
+        "웹 페이지의 URL에 접속하여 내용을 가져옵니다.",
+        params={"url": "접속할 URL"},
+        read_only=True,
+        cache_ttl=300,
+        timeout=20,
+        max_concurrency=4
+    )
+    async def fetch_web_content(self, url: str) -> Dict:
+        import httpx
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            response = await client.get(url, headers={"User-Agent": "Mozilla/5.0"})
+            response.raise_for_status()
+            # Return content and metadata for verification
+            return {
+                "status": "success", 
+                "content": response.text[:2000], 
+                "url": url,
+                "length": len(response.text)
+            }
 
-        except Exception as e:
-            error_result = {"status": "error", "message": str(e)}
-            # Log error
-            log_entry["result"] = error_result
-            with open(action_log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-            return error_result
+    @tool(
+        "컨텍스트에 sha256: 참조로만 실린 긴 내용을 읽습니다. 결과가 잘리면 next_offset으로 이어서 읽으십시오.",
+        params={
+            "ref": "sha256:로 시작하는 참조",
+            "offset": "읽기 시작할 바이트 위치 (기본 0)",
+            "length": f"읽을 최대 바이트 수 (기본 {DEFAULT_READ_BYTES})"
+        },
+        read_only=True,
+        cache_ttl=300
+    )
+    def resolve_artifact(self, ref: str, offset: int = 0, length: int = DEFAULT_READ_BYTES) -> Dict:
+        result = self.artifact_store.read(ref, offset=offset, length=length)
+        if result is None:
+            return {"status": "error", "message": f"Artifact not found: {ref}"}
+        
+        return {**result, "ref": ref}
 
-    @abstractmethod
-    def get_tool_definitions(self) -> List[Dict]:
-        """Return agent-specific tool definitions"""
-        pass
+    @tool("에이전트의 현재 작업 상태 및 계획을 업데이트합니다.")
+    def update_agent_status(
+        self,
+        in_progress: Optional[List[str]] = None,
+        waiting: Optional[List[str]] = None,
+        blocking_issues: Optional[List[str]] = None,
+        next_steps: Optional[List[str]] = None
+    ) -> Dict:
+        self.update_current_status(
+            in_progress=in_progress or [],
+            waiting=waiting or [],
+            blocking_issues=blocking_issues or [],
+            next_steps=next_steps or []
+        )
+        return {"status": "success", "message": "Agent status updated"}
     
-    def load_current_status(self) -> Dict:
-        """Load current work status from current_status.md"""
-        status_file = self.work_docs_dir / "current_status.md"
+    async def _run_file_batch(self, handler, items: List[Dict], ordered_by_path: bool = False) -> Dict:
+        """Run a file handler over many items in worker threads, at most FILE_BATCH_CONCURRENCY at a time.
         
-        if not status_file.exists():
-            return {
-                "in_progress": [],
-                "waiting": [],
-                "blocking_issues": [],
-                "next_steps": []
-            }
+        Each item gets its own result, so one bad path doesn't fail the batch.
+        With ordered_by_path, items targeting the same file run in the given
+        order (e.g. write then append).
+        """
+        if len(items) > MAX_FILE_BATCH:
+            return {"status": "error", "message": f"At most {MAX_FILE_BATCH} files per call"}
+        
+        semaphore = asyncio.Semaphore(FILE_BATCH_CONCURRENCY)
+        results: List[Optional[Dict]] = [None] * len(items)
+        
+        async def run(index: int, item: Dict):
+            async with semaphore:
+                try:
+                    result = await asyncio.to_thread(handler, **item)
+                except Exception as e:
+                    result = {"status": "error", "message": str(e)}
+            results[index] = {"path": item.get('path'), **result}
+        
+        if ordered_by_path:
+            groups: Dict[str, List[int]] = {}
+            for index, item in enumerate(items):
+                groups.setdefault(str(self._resolve_path(item.get('path', ''))), []).append(index)
+            
+            async def run_group(indexes: List[int]):
+                for index in indexes:
+                    await run(index, items[index])
+            
+            await asyncio.gather(*(run_group(indexes) for indexes in groups.values()))
+        else:
+            await asyncio.gather(*(run(index, item) for index, item in enumerate(items)))
         
-        # Simple parsing - in production, use proper markdown parser
-        content = status_file.read_text(encoding='utf-8')
-        return {"raw_content": content}
+        failed = sum(1 for r in results if r['status'] != "success")
+        return {
+            "status": "success" if not failed else ("partial" if failed < len(items) else "error"),
+            "succeeded": len(items) - failed,
+            "failed": failed,
+            "results": results
+        }
+
+    def _resolve_path(self, path_str: str) -> Path:
+        """Resolve a tool path: absolute as-is, 'data/...' from the project root, else the agent folder"""
+        file_path = Path(path_str)
+        if file_path.is_absolute():
+            return file_path
+        if path_str.startswith("data/"):
+            return self.work_docs_dir.parent.parent / path_str
+        return self.work_docs_dir / file_path
+
+    def load_current_status(self) -> AgentStatus:
+        """Load current work status (in_progress, waiting, blocking_issues, next_steps)"""
+        return self.status_store.load()
     
     def update_current_status(
         self,
@@ -272,27 +394,13 @@ class BaseAgent(ABC):
         blocking_issues: List[str],
         next_steps: List[str]
     ) -> None:
-        """Update current_status.md"""
-        status_file = self.work_docs_dir / "current_status.md"
-        
-        content = f"""# {self.agent_name} 현재 상태
-
-**마지막 업데이트**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## 진행 중인 작업
-{chr(10).join([f'- [ ] {task}' for task in in_progress])}
-
-## 대기 중인 작업
-{chr(10).join([f'{i+1}. {task}' for i, task in enumerate(waiting)])}
-
-## 차단 이슈
-{chr(10).join([f'- {issue}' for issue in blocking_issues])}
-
-## 다음 단계
-{chr(10).join([f'{i+1}. {step}' for i, step in enumerate(next_steps)])}
-"""
-        
-        status_file.write_text(content, encoding='utf-8')
+        """Update current_status.json/.md (written once per turn, see StatusStore)"""
+        self.status_store.update(
+            in_progress=in_progress,
+            waiting=waiting,
+            blocking_issues=blocking_issues,
+            next_steps=next_steps
+        )
     
     def log_work_session(
         self,
@@ -336,41 +444,137 @@ class BaseAgent(ABC):
         log_data["last_updated"] = datetime.now().isoformat()
         
         # Save log
-        log_file.write_text(json.dumps(log_data, ensure_ascii=False, indent=2), encoding='utf-8')
+        atomic_write_text(log_file, json.dumps(log_data, ensure_ascii=False, indent=2))
     
-    def _proto_to_python_value(self, value: Any) -> Any:
-        """Recursively convert proto values to standard Python types"""
-        # Handle dict-like objects (Struct/Map)
-        if hasattr(value, "items"):
-            return {k: self._proto_to_python_value(v) for k, v in value.items()}
-        # Handle list-like objects (Repeated)
-        elif isinstance(value, (list, tuple)):
-            return [self._proto_to_python_value(v) for v in value]
-        # Handle RepeatedComposite/RepeatedScalar which are iterable but not list
-        elif hasattr(value, "__iter__") and not isinstance(value, (str, bytes)):
-            return [self._proto_to_python_value(v) for v in value]
-        # Base case: primitive types
-        return value
-
     def _load_project_resources(self) -> str:
-        """Load project resources from data/project_resources.json"""
-        resource_file = Path("data/project_resources.json")
-        if not resource_file.exists():
-            return "등록된 프로젝트 리소스가 없습니다."
-        
+        """Render shared project resources, re-querying only when the registry version changes"""
         try:
-            data = json.loads(resource_file.read_text(encoding='utf-8'))
-            resources = data.get("resources", {})
+            version = self.resource_registry.version()
+            if self._resources_cache[0] == version:
+                return self._resources_cache[1]
+            
+            resources = self.resource_registry.list_resources()
             if not resources:
-                return "등록된 프로젝트 리소스가 없습니다."
+                text = "등록된 프로젝트 리소스가 없습니다."
+            else:
+                lines = ["**공유 프로젝트 리소스** (파일 생성 시 여기에 자동 등록됨):"]
+                for name, info in resources.items():
+                    lines.append(f"- {name} ({info['type']}): ID={info['id']}, 용도={info.get('purpose') or 'N/A'}")
+                text = "\n".join(lines)
             
-            lines = ["**공유 프로젝트 리소스** (파일 생성 시 여기에 자동 등록됨):"]
-            for name, info in resources.items():
-                lines.append(f"- {name} ({info['type']}): ID={info['id']}, 용도={info.get('purpose', 'N/A')}")
-            return "\n".join(lines)
+            self._resources_cache = (version, text)
+            return text
         except Exception:
             return "프로젝트 리소스를 불러오는 중 오류가 발생했습니다."
 
+    @property
+    def tool_specs(self) -> Dict[str, ToolSpec]:
+        """Every tool this agent exposes by name (agent-specific first), built once"""
+        if self._tool_specs is None:
+            registered = collect_tools(type(self))
+            self._tool_specs = {}
+            for definition in self.get_tool_definitions() + self.get_common_tool_definitions():
+                name = definition['name']
+                self._tool_specs[name] = registered.get(name) or ToolSpec.from_definition(definition)
+            self._function_declarations = [
+                function_declaration(spec.definition()) for spec in self._tool_specs.values()
+            ]
+        return self._tool_specs
+    
+    def tool_policy(self, tool_name: str) -> ToolPolicy:
+        """Execution/caching policy declared for the tool"""
+        spec = self.tool_specs.get(tool_name)
+        return spec.policy if spec else ToolPolicy()
+    
+    def _cache_paths(self, tool_name: str, parameters: Dict) -> List[Path]:
+        """Files/directories a cached result of a common file tool depends on"""
+        if tool_name in ("read_local_file", "search_local_file"):
+            return [self._resolve_path(parameters['path'])]
+        if tool_name == "read_local_files":
+            return [self._resolve_path(item['path']) for item in parameters.get('files', [])]
+        if tool_name == "list_files":
+            return [self._resolve_path(parameters['directory']) if parameters.get('directory') else self.work_docs_dir]
+        return []
+
+    async def _call_tool(self, tool_name: str, parameters: Dict) -> Dict:
+        """Validate and run a tool call through the tool executor, logging it to agent_actions.log.
+        
+        Tools that mutate agent state run one at a time under state_lock.
+        Successful results of tools with a cache_ttl are served from the
+        shared tool cache until they expire or a write invalidates them.
+        """
+        spec = self.tool_specs.get(tool_name)
+        if spec is None:
+            return {"status": "error", "message": f"Unknown tool: {tool_name}"}
+        
+        try:
+            parameters = validate_arguments(spec.parameters, parameters)
+        except ToolArgumentError as e:
+            result = {"status": "error", "message": f"Invalid arguments for {tool_name}: {e}"}
+            self._log_action(tool_name, parameters, ToolExecution(result=result, outcome="error", mode="rejected"))
+            return result
+        
+        policy = spec.policy
+        cacheable = policy.read_only and policy.cache_ttl
+        if cacheable:
+            # Relative paths resolve per agent, so entries are scoped to this agent
+            key = canonical_call_key(tool_name, parameters)
+            cached = tool_cache.get(self.agent_id, tool_name, key)
+            if cached is not None:
+                self._log_action(tool_name, parameters, ToolExecution(result=cached, outcome="success", mode="cache"))
+                return cached
+            paths = self._cache_paths(tool_name, parameters)
+        
+        # A sync method would block the event loop and outlive its deadline, so it runs on a thread
+        offload = policy.blocking or (
+            spec.method is not None and not inspect.iscoroutinefunction(getattr(self, spec.method))
+        )
+        call = lambda: self._invoke(spec, parameters)
+        if tool_name in self.STATE_MUTATING_TOOLS:
+            async with self.state_lock:
+                execution = await tool_executor.run(tool_name, call, policy, offload=offload)
+        else:
+            execution = await tool_executor.run(tool_name, call, policy, offload=offload)
+        
+        if cacheable and execution.result.get('status') == "success":
+            tool_cache.put(self.agent_id, key, execution.result, policy.cache_ttl, paths)
+        self._log_action(tool_name, parameters, execution)
+        return execution.result
+    
+    async def _invoke(self, spec: ToolSpec, parameters: Dict) -> Dict:
+        """Call the tool's method (sync or async), or execute_tool for dict-declared tools"""
+        if spec.method is None:
+            return await self.execute_tool(spec.name, parameters)
+        result = getattr(self, spec.method)(**parameters)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    
+    def _log_fields(self, fields: Dict) -> Dict:
+        """Parameters or result for the action log, large values replaced by artifact references"""
+        if not isinstance(fields, dict):
+            return self.artifact_store.externalize_value(fields, INLINE_MAX_CHARS)
+        return {k: self.artifact_store.externalize_value(v, INLINE_MAX_CHARS) for k, v in fields.items()}
+    
+    def _log_action(self, tool_name: str, parameters: Dict, execution: ToolExecution) -> None:
+        """Append a tool call with its timing to data/logs/agent_actions.log"""
+        action_log_file = self.work_docs_dir.parent.parent / "logs" / "agent_actions.log"
+        action_log_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        log_entry = {
+            "timestamp": datetime.now().isoformat(),
+            "agent_id": self.agent_id,
+            "tool": tool_name,
+            "parameters": self._log_fields(parameters),
+            "result": self._log_fields(execution.result),
+            "outcome": execution.outcome,
+            "mode": execution.mode,
+            "queued_ms": execution.queued_ms,
+            "duration_ms": execution.total_ms
+        }
+        with open(action_log_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(log_entry, ensure_ascii=False, default=str) + "\n")
+
     async def process(
         self,
         user_message: str,
@@ -378,108 +582,82 @@ class BaseAgent(ABC):
         context_package: Optional[Dict] = None
     ) -> str:
         """Process message and generate response (Supports tool calling)"""
+        turn = await self.run_turn(user_message, session_id, context_package)
+        return turn.response
+
+    async def run_turn(
+        self,
+        user_message: str,
+        session_id: str,
+        context_package: Optional[Dict] = None
+    ) -> TurnResult:
+        """Process a message and return the response with tool-loop statistics"""
         
         # Load current status
         current_status = self.load_current_status()
         
-        # Build full prompt with context
-        resources = self._load_project_resources()
-        full_prompt = f"{self.system_prompt}\n\n{resources}\n\n"
-        
-        if context_package:
-            full_prompt += f"""
-**Master Agent로부터 받은 컨텍스트**:
-- 전체 상황: {context_package.get('global_context', {})}
-- 구체적 지침: {context_package.get('instructions', {})}
-- 관련 정보: {context_package.get('related_info', {})}
-- 기대 결과물: {context_package.get('expected_output', {})}
+        # Build full prompt with context, section by section so usage can be attributed
+        sections = {
+            "system_prompt": f"{self.system_prompt}\n\n",
+            "resources": f"{self._load_project_resources()}\n\n",
+            "context_package": "",
+            "current_status": f"""
+**현재 상태**:
+{current_status.to_prompt()}
 
+""",
+            "user_message": f"""**사용자 요청**: {user_message}
 """
+        }
         
-        full_prompt += f"""
-**현재 상태**: {current_status}
-
-**사용자 요청**: {user_message}
-"""
+        # Compact JSON within per-section budgets, skipping what the prompt already says
+        compacted = self.context_compactor.compact(
+            context_package,
+            known_text=sections["system_prompt"] + sections["resources"] + sections["current_status"] + user_message
+        )
+        sections["context_package"] = compacted.text
+        
+        full_prompt = "".join(sections.values())
         
         try:
-            # Get agent-specific tools
-            agent_tools = self.get_tool_definitions()
-            # Get common tools
-            common_tools = self.get_common_tool_definitions()
-            
-            all_tools = agent_tools + common_tools
-            
             # Initialize model with tools if available
-            if all_tools:
+            if self.tool_specs:
                 model = genai.GenerativeModel(
                     'gemini-3-flash-preview',
-                    tools=[{'function_declarations': all_tools}]
+                    tools=[{'function_declarations': self._function_declarations}]
                 )
             else:
                 model = genai.GenerativeModel('gemini-3-flash-preview')
             
-            chat = model.start_chat()
-            response = await chat.send_message_async(full_prompt)
+            loop = ToolLoop(
+                model.start_chat(),
+                self._call_tool,
+                self.tool_loop_limits,
+                # Repeating a side effect is not the same as reusing its result
+                memoizable=lambda name: self.tool_policy(name).read_only,
+                agent_id=self.agent_id
+            )
+            turn = await loop.run(full_prompt)
+            response_text = turn.response
             
-            # Main response processing loop (handle tool calls)
-            for _ in range(5): # Limit of 5 tool calls per turn
-                content = response.candidates[0].content
-                if not any(part.function_call for part in content.parts):
-                    break
-                
-                # Collect all tool calls in the current turn
-                tool_call_tasks = []
-                tool_call_names = []
-                for part in content.parts:
-                    if part.function_call:
-                        fc = part.function_call
-                        tool_call_names.append(fc.name)
-                        params = self._proto_to_python_value(fc.args)
-                        
-                        # Route tool execution
-                        if fc.name in [t['name'] for t in common_tools]:
-                            tool_call_tasks.append(self.execute_common_tool(fc.name, params))
-                        else:
-                            tool_call_tasks.append(self.execute_tool(fc.name, params))
-                
-                if tool_call_tasks:
-                    print(f"🛠️ Agent [{self.agent_id}] executing {len(tool_call_tasks)} tools in parallel: {tool_call_names}")
-                    # Execute all tool calls in parallel
-                    results = await asyncio.gather(*tool_call_tasks)
-                    
-                    tool_results = []
-                    for name, result in zip(tool_call_names, results):
-                        tool_results.append(
-                            genai.protos.Part(
-                                function_response=genai.protos.FunctionResponse(
-                                    name=name,
-                                    response={'result': result}
-                                )
-                            )
-                        )
-                    
-                    # Send results back to model
-                    response = await chat.send_message_async(
-                        genai.protos.Content(parts=tool_results)
-                    )
-            
-            # After loop, extract final response text safely
-            parts = response.candidates[0].content.parts
-            response_text = "".join([part.text for part in parts if hasattr(part, 'text') and part.text])
-            
-            # If no text parts found (e.g. only tool calls left), use a fallback or the raw string
-            if not response_text:
-                if any(part.function_call for part in parts):
-                    response_text = "[도구 호출 완료]"
-                else:
-                    response_text = str(response)
+            if turn.stats is not None:
+                # Tool declarations are sent with every request and count as input too
+                sections["tools"] = json.dumps(self._function_declarations, ensure_ascii=False) if self.tool_specs else ""
+                turn.stats["prompt_sections"] = scale_sections(
+                    section_tokens(sections), turn.stats.get("initial_prompt_tokens")
+                )
+                if compacted.stats:
+                    turn.stats["context_compaction"] = compacted.stats
             
-            # Update history
-            self.conversation_history.append({"role": "user", "content": user_message})
-            self.conversation_history.append({"role": "assistant", "content": response_text})
+            # Update history (both entries together so concurrent turns don't interleave)
+            async with self.state_lock:
+                self.conversation_history.append({"role": "user", "content": user_message})
+                self.conversation_history.append({"role": "assistant", "content": response_text})
             
-            return response_text
+            return turn
             
         except Exception as e:
-            return f"Error processing request: {str(e)}"
+            return TurnResult(response=f"Error processing request: {str(e)}", failed=True)
+        finally:
+            # One status write per turn, however many updates the tools made
+            self.status_store.flush()
@@ -0,0 +1,185 @@
+"""
+Context Compactor - Renders a Master Agent context package into a bounded prompt block
+"""
+
+import json
+import os
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.artifact_store import REF_PREFIX, ArtifactStore
+from core.tokens import estimate_tokens
+
+
+# Package sections rendered into the prompt, in order
+SECTION_LABELS = {
+    "global_context": "전체 상황",
+    "instructions": "구체적 지침",
+    "related_info": "관련 정보",
+    "expected_output": "기대 결과물"
+}
+
+# Strings shorter than this are never deduplicated (labels, ids, dates)
+DEDUPE_MIN_CHARS = 32
+
+# (max string chars, max list items / dict keys) tried in turn until a section fits
+SHRINK_LEVELS = [(400, 20), (200, 10), (100, 5), (50, 3)]
+
+
+@dataclass
+class ContextBudget:
+    """Token budget per package section; 0 disables the limit for that section"""
+    global_context: int = 500
+    instructions: int = 800
+    related_info: int = 1200
+    expected_output: int = 300
+    # Strings at least this long are stored as artifacts and referenced by hash
+    blob_min_chars: int = 2000
+
+    @classmethod
+    def from_env(cls) -> "ContextBudget":
+        """Defaults overridden by CONTEXT_BUDGET_<SECTION> / CONTEXT_BLOB_MIN_CHARS env vars"""
+        budget = cls()
+        for f in fields(cls):
+            env = "CONTEXT_BLOB_MIN_CHARS" if f.name == "blob_min_chars" else f"CONTEXT_BUDGET_{f.name.upper()}"
+            setattr(budget, f.name, int(os.getenv(env, getattr(budget, f.name))))
+        return budget
+
+
+@dataclass
+class CompactedContext:
+    """Prompt block for a context package plus what compaction did to each section"""
+    text: str
+    stats: Dict[str, Dict] = field(default_factory=dict)
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _prune(value: Any) -> Any:
+    """Drop None and empty containers/strings, recursively"""
+    if isinstance(value, dict):
+        pruned = {key: _prune(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if item not in (None, "", {}, [])}
+    if isinstance(value, (list, tuple)):
+        pruned = [_prune(item) for item in value]
+        return [item for item in pruned if item not in (None, "", {}, [])]
+    return value
+
+
+def _shrink(value: Any, max_chars: int, max_items: int) -> Any:
+    """Truncate strings and cap lists/dicts, noting how much was cut"""
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        # Never cut into an artifact reference
+        keep = value.find("]") + 1 if value.startswith(f"[{REF_PREFIX}") else 0
+        return value[:max(keep, max_chars - 1)] + "…"
+    if isinstance(value, dict):
+        items = list(value.items())
+        shrunk = {key: _shrink(item, max_chars, max_items) for key, item in items[:max_items]}
+        if len(items) > max_items:
+            shrunk["…"] = f"+{len(items) - max_items}개 항목 생략"
+        return shrunk
+    if isinstance(value, list):
+        shrunk = [_shrink(item, max_chars, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            shrunk.append(f"…+{len(value) - max_items}개 생략")
+        return shrunk
+    return value
+
+
+class ContextCompactor:
+    """Turns a context package into compact JSON lines that fit their budgets.
+
+    Per section: empty values are dropped; strings the prompt already
+    contains (system prompt, resources, status, the request itself) or
+    that appeared in an earlier section are replaced by a short pointer;
+    long strings go to the artifact store and are inlined as a reference
+    with a preview; a section still over budget is shrunk level by level
+    (shorter strings, fewer items) with the full section kept as an
+    artifact. Agents read artifacts back with resolve_artifact.
+    """
+
+    def __init__(self, artifact_store: ArtifactStore, budget: Optional[ContextBudget] = None):
+        self.artifact_store = artifact_store
+        self.budget = budget or ContextBudget.from_env()
+
+    def compact(self, package: Optional[Dict], known_text: str = "") -> CompactedContext:
+        if not package:
+            return CompactedContext(text="")
+
+        seen: Dict[str, str] = {}
+        lines: List[str] = []
+        stats: Dict[str, Dict] = {}
+        for name, label in SECTION_LABELS.items():
+            raw = package.get(name)
+            section_stats = {"raw_tokens": estimate_tokens(str(raw if raw is not None else {}))}
+            counters = {"deduped": 0, "artifacts": 0}
+
+            value = self._replace_strings(_prune(raw), name, known_text, seen, counters)
+            if value in (None, "", {}, []):
+                stats[name] = {**section_stats, "tokens": 0, **counters, "summarized": False}
+                continue
+
+            rendered, full_ref = self._fit(value, getattr(self.budget, name))
+            if full_ref:
+                label = f"{label} (요약됨, 전체: {full_ref})"
+            line = f"- {label}: {rendered}"
+            lines.append(line)
+            stats[name] = {
+                **section_stats,
+                "tokens": estimate_tokens(line),
+                **counters,
+                "summarized": bool(full_ref)
+            }
+
+        if not lines:
+            return CompactedContext(text="", stats=stats)
+
+        text = "\n**Master Agent로부터 받은 컨텍스트** (JSON, sha256: 참조는 resolve_artifact로 조회):\n"
+        text += "\n".join(lines) + "\n\n"
+        return CompactedContext(text=text, stats=stats)
+
+    def _replace_strings(self, value: Any, path: str, known_text: str, seen: Dict[str, str], counters: Dict) -> Any:
+        """Dedupe and externalize string leaves"""
+        if isinstance(value, dict):
+            return {
+                key: self._replace_strings(item, f"{path}.{key}", known_text, seen, counters)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [
+                self._replace_strings(item, f"{path}[{i}]", known_text, seen, counters)
+                for i, item in enumerate(value)
+            ]
+        if not isinstance(value, str) or len(value) < DEDUPE_MIN_CHARS:
+            return value
+
+        if value in known_text:
+            counters['deduped'] += 1
+            return "(위 프롬프트에 포함됨)"
+        if value in seen:
+            counters['deduped'] += 1
+            return f"(= {seen[value]})"
+        seen[value] = path
+
+        if self.budget.blob_min_chars and len(value) >= self.budget.blob_min_chars:
+            counters['artifacts'] += 1
+            return self.artifact_store.reference(value)
+        return value
+
+    def _fit(self, value: Any, budget: int) -> Tuple[str, Optional[str]]:
+        """Compact JSON within the token budget, and the full section's reference if it had to shrink"""
+        rendered = _compact_json(value)
+        if not budget or estimate_tokens(rendered) <= budget:
+            return rendered, None
+
+        full_ref = self.artifact_store.put(rendered)
+        for max_chars, max_items in SHRINK_LEVELS:
+            rendered = _compact_json(_shrink(value, max_chars, max_items))
+            if estimate_tokens(rendered) <= budget:
+                return rendered, full_ref
+        # Still too big (deeply nested or very wide): hard cut at the budget
+        return rendered[:budget * 3 - 1] + "…", full_ref
@@ -8,6 +8,8 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from core.status_store import read_status
+
 
 class ContextManager:
     """Manages global context and Master Agent context propagation"""
@@ -112,6 +114,7 @@ class ContextManager:
         
         return {
             "current_status": status_content,
+            "status": read_status(agent_dir).to_dict(),
             "work_log": work_log,
             "last_updated": work_log.get('last_updated', '')
         }
@@ -0,0 +1,63 @@
+"""
+DB Migrations - Versioned schema migrations for SQLite databases
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+
+# (version, description, migrate function)
+Migration = Tuple[int, str, Callable[[sqlite3.Connection], None]]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Current schema version stored in PRAGMA user_version"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: List[Migration]) -> int:
+    """Apply pending migrations in order, each in its own transaction.
+
+    The version is tracked in PRAGMA user_version and every applied step
+    is also recorded in schema_migrations for auditing. Migration
+    functions must use conn.execute only (executescript would commit
+    mid-migration). Returns the resulting schema version.
+    """
+    previous_isolation = conn.isolation_level
+    # Manage transactions explicitly so DDL and the version bump commit together
+    conn.isolation_level = None
+
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at DATETIME NOT NULL
+            )
+        """)
+
+        current = get_schema_version(conn)
+        for version, description, migrate in sorted(migrations, key=lambda m: m[0]):
+            if version <= current:
+                continue
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                migrate(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO schema_migrations (version, description, applied_at) VALUES (?, ?, ?)",
+                    (version, description, datetime.now().isoformat())
+                )
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            current = version
+            print(f"🗄️ Applied migration {version}: {description}")
+
+        return current
+    finally:
+        conn.isolation_level = previous_isolation
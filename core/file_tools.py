@@ -0,0 +1,293 @@
+"""
+File Tools - Range reads, in-file search and cached directory listings for the common file tools
+"""
+
+import fnmatch
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+DEFAULT_READ_BYTES = 8192
+MAX_READ_BYTES = 65536
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 1024 * 1024
+
+MAX_LIST_DEPTH = 5
+MAX_LIST_LIMIT = 500
+
+
+def _utf8_boundary(data: bytes, end: int) -> int:
+    """Largest index <= end that does not split a UTF-8 character"""
+    end = min(end, len(data))
+    while 0 < end < len(data) and (data[end] & 0xC0) == 0x80:
+        end -= 1
+    return end
+
+
+class _FileView:
+    """Read-only byte buffer over a file: mmap for large files, bytes for small ones"""
+
+    def __init__(self, path: Path):
+        self.size = path.stat().st_size
+        self._file = open(path, 'rb')
+        if self.size >= MMAP_THRESHOLD:
+            self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.buffer = self._file.read()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self._file.close()
+
+
+def read_file_range(
+    path: Path,
+    offset: int = 0,
+    length: int = DEFAULT_READ_BYTES,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None
+) -> Dict:
+    """Read part of a file by byte range or by (1-based, inclusive) line range.
+
+    Only the requested window is read. The result reports the file's total
+    size and where the next page starts (next_offset / next_line), or None
+    at the end of the file.
+    """
+    length = max(1, min(int(length or DEFAULT_READ_BYTES), MAX_READ_BYTES))
+
+    with _FileView(path) as view:
+        if start_line is not None or end_line is not None:
+            return _read_lines(view, max(1, int(start_line or 1)), end_line, length)
+
+        return _read_range(view.buffer, view.size, offset, length)
+
+
+def read_bytes_range(data: bytes, offset: int = 0, length: int = DEFAULT_READ_BYTES) -> Dict:
+    """read_file_range's byte-window read over an in-memory buffer"""
+    length = max(1, min(int(length or DEFAULT_READ_BYTES), MAX_READ_BYTES))
+    return _read_range(data, len(data), offset, length)
+
+
+def _read_range(buffer, size: int, offset: int, length: int) -> Dict:
+    offset = max(0, int(offset or 0))
+    # Start on a character boundary so the chunk decodes cleanly
+    while offset < size and (buffer[offset] & 0xC0) == 0x80:
+        offset += 1
+
+    chunk = buffer[offset:min(offset + length + 3, size)]
+    if offset + length < size:
+        chunk = chunk[:_utf8_boundary(chunk, length)]
+    end = offset + len(chunk)
+
+    return {
+        "status": "success",
+        "content": chunk.decode('utf-8', errors='replace'),
+        "offset": offset,
+        "length": len(chunk),
+        "total_size": size,
+        "next_offset": end if end < size else None
+    }
+
+
+def _read_lines(view: _FileView, start_line: int, end_line: Optional[int], max_bytes: int) -> Dict:
+    buffer = view.buffer
+
+    # Skip to the first requested line
+    start = 0
+    for _ in range(start_line - 1):
+        newline = buffer.find(b"\n", start)
+        if newline < 0:
+            start = view.size
+            break
+        start = newline + 1
+
+    end = start
+    last_line = start_line - 1
+    truncated = False
+    while end < view.size and (end_line is None or last_line < int(end_line)):
+        newline = buffer.find(b"\n", end)
+        line_end = view.size if newline < 0 else newline + 1
+        if line_end - start > max_bytes:
+            # A single line longer than the budget is returned in part
+            if last_line < start_line:
+                data = buffer[start:start + max_bytes + 3]
+                end = start + _utf8_boundary(data, max_bytes)
+                truncated = True
+            break
+        end = line_end
+        last_line += 1
+
+    return {
+        "status": "success",
+        "content": buffer[start:end].decode('utf-8', errors='replace'),
+        "start_line": start_line,
+        "end_line": start_line if truncated else (last_line if last_line >= start_line else None),
+        "total_size": view.size,
+        "next_line": last_line + 1 if end < view.size and not truncated else None,
+        # Where the rest of a truncated line continues (read it by offset)
+        "next_offset": end if truncated else None
+    }
+
+
+def search_file(
+    path: Path,
+    pattern: str,
+    regex: bool = False,
+    ignore_case: bool = True,
+    context: int = 1,
+    max_matches: int = 20,
+    max_line_chars: int = 300
+) -> Dict:
+    """Grep-style search streamed line by line; returns only the matching windows"""
+    flags = re.IGNORECASE if ignore_case else 0
+    matcher = re.compile(pattern if regex else re.escape(pattern), flags)
+    context = max(0, min(int(context), 10))
+
+    matches = []
+    previous = deque(maxlen=context)
+    pending = []  # matches still collecting trailing context lines
+    total = 0
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for number, text in enumerate(f, start=1):
+            text = text.rstrip("\n")[:max_line_chars]
+
+            for match in pending:
+                match['after'].append(text)
+            pending = [m for m in pending if len(m['after']) < context]
+
+            if matcher.search(text):
+                total += 1
+                if len(matches) < int(max_matches):
+                    match = {"line": number, "text": text, "before": list(previous), "after": []}
+                    matches.append(match)
+                    if context:
+                        pending.append(match)
+                elif not pending:
+                    # Enough matches and their context: stop reading
+                    break
+
+            previous.append(text)
+
+    return {
+        "status": "success",
+        "pattern": pattern,
+        "matches": matches,
+        "truncated": total > len(matches)
+    }
+
+
+class DirectoryListingCache:
+    """Per-directory listings with size/mtime metadata.
+
+    An entry is reused while the directory's own mtime is unchanged and
+    nothing under it was written through the file tools (writes call
+    invalidate(), which also covers in-place edits that don't touch the
+    directory mtime).
+    """
+
+    def __init__(self, max_directories: int = 512):
+        self.max_directories = max_directories
+        self._listings: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def list(self, directory: Path) -> List[Dict]:
+        key = str(directory)
+        mtime = directory.stat().st_mtime_ns
+        with self._lock:
+            cached = self._listings.get(key)
+            if cached and cached[0] == mtime:
+                self._listings.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        entries = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                is_dir = entry.is_dir()
+                entries.append({
+                    "name": entry.name,
+                    "type": "dir" if is_dir else "file",
+                    "size": None if is_dir else stat.st_size,
+                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds')
+                })
+        entries.sort(key=lambda e: e['name'])
+
+        with self._lock:
+            self._listings[key] = (mtime, entries)
+            self._listings.move_to_end(key)
+            while len(self._listings) > self.max_directories:
+                self._listings.popitem(last=False)
+        return entries
+
+    def invalidate(self, path: Path) -> None:
+        """Forget listings of every directory containing `path`"""
+        with self._lock:
+            for parent in Path(path).parents:
+                self._listings.pop(str(parent), None)
+
+
+listing_cache = DirectoryListingCache()
+
+
+def list_directory(
+    root: Path,
+    pattern: Optional[str] = None,
+    depth: int = 1,
+    offset: int = 0,
+    limit: int = 100,
+    include_hidden: bool = False
+) -> Dict:
+    """Walk `root` up to `depth` levels and return one page of entries.
+
+    `pattern` is a glob matched against the entry name or its path
+    relative to root (e.g. '*.md', 'reports/*.json'); directories are
+    still descended into when they don't match.
+    """
+    depth = max(1, min(int(depth or 1), MAX_LIST_DEPTH))
+    offset = max(0, int(offset or 0))
+    limit = max(1, min(int(limit or 100), MAX_LIST_LIMIT))
+
+    matched = []
+    pending = [(root, "", 1)]
+    while pending:
+        directory, prefix, level = pending.pop()
+        for entry in listing_cache.list(directory):
+            if not include_hidden and entry['name'].startswith("."):
+                continue
+            relative = f"{prefix}{entry['name']}"
+            if entry['type'] == "dir" and level < depth:
+                pending.append((directory / entry['name'], f"{relative}/", level + 1))
+            if pattern and not (fnmatch.fnmatch(entry['name'], pattern) or fnmatch.fnmatch(relative, pattern)):
+                continue
+            matched.append({**entry, "path": relative})
+
+    matched.sort(key=lambda e: e['path'])
+    page = matched[offset:offset + limit]
+    return {
+        "status": "success",
+        "directory": str(root),
+        "entries": [
+            {"path": e['path'], **{k: v for k, v in e.items() if k not in ("name", "path") and v is not None}}
+            for e in page
+        ],
+        "total": len(matched),
+        "next_offset": offset + limit if offset + limit < len(matched) else None
+    }
@@ -0,0 +1,67 @@
+"""
+History Archive - Compressed monthly cold storage for old conversation sessions
+"""
+
+import gzip
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional dependency; gzip is always available
+    zstandard = None
+
+
+class HistoryArchive:
+    """Append-only monthly archive files holding one compressed frame per session.
+
+    Each session is written as an independent zstd frame (or gzip member),
+    so a single session can be restored by reading just its byte range
+    instead of decompressing the whole month.
+    """
+
+    def __init__(self, archive_dir: Path, level: int = 10):
+        self.archive_dir = archive_dir
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.level = level
+        self.extension = "zst" if zstandard else "gz"
+        # Appends and the offsets recorded for them must not interleave
+        self._write_lock = threading.Lock()
+
+    def _compress(self, data: bytes) -> bytes:
+        if zstandard:
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=min(self.level, 9))
+
+    @staticmethod
+    def _decompress(file_name: str, data: bytes) -> bytes:
+        if file_name.endswith(".zst"):
+            if not zstandard:
+                raise RuntimeError(f"zstandard is required to read {file_name}")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def write_session(self, month: str, records: List[Dict]) -> Tuple[str, int, int]:
+        """Append a session's records to the month file; returns (file name, offset, length)"""
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        frame = self._compress(payload)
+
+        file_name = f"history-{month}.jsonl.{self.extension}"
+        with self._write_lock, open(self.archive_dir / file_name, "ab") as f:
+            f.write(frame)
+            f.flush()
+            # Taken after the append: in append mode tell() is the real end of file
+            offset = f.tell() - len(frame)
+
+        return file_name, offset, len(frame)
+
+    def read_session(self, file_name: str, offset: int, length: int) -> List[Dict]:
+        """Read one session frame back"""
+        with open(self.archive_dir / file_name, "rb") as f:
+            f.seek(offset)
+            frame = f.read(length)
+
+        payload = self._decompress(file_name, frame).decode("utf-8")
+        return [json.loads(line) for line in payload.splitlines() if line]
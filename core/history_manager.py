@@ -4,58 +4,191 @@ History Manager - SQLite-based conversation history management
 
 import sqlite3
 import json
+import re
+import base64
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+from core.db_migrations import Migration, apply_migrations
+from core.history_archive import HistoryArchive
+from core.tokens import estimate_tokens
+
+
+def _migrate_base_schema(conn: sqlite3.Connection) -> None:
+    # Conversations table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            agent_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            message TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Sessions table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            agent_id TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_active DATETIME DEFAULT CURRENT_TIMESTAMP,
+            metadata TEXT
+        )
+    """)
+    
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_agent 
+        ON conversations(agent_id)
+    """)
+
+
+def _migrate_full_text_search(conn: sqlite3.Connection) -> None:
+    # Full-text index over messages (external content, kept in sync by triggers)
+    fts_exists = conn.execute("""
+        SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'conversations_fts'
+    """).fetchone()
+    
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts
+        USING fts5(message, content='conversations', content_rowid='id', tokenize='unicode61')
+    """)
+    
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+            INSERT INTO conversations_fts(rowid, message) VALUES (new.id, new.message);
+        END
+    """)
+    
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+            INSERT INTO conversations_fts(conversations_fts, rowid, message) VALUES ('delete', old.id, old.message);
+        END
+    """)
+    
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE OF message ON conversations BEGIN
+            INSERT INTO conversations_fts(conversations_fts, rowid, message) VALUES ('delete', old.id, old.message);
+            INSERT INTO conversations_fts(rowid, message) VALUES (new.id, new.message);
+        END
+    """)
+    
+    if not fts_exists:
+        # Index messages written before the search index existed
+        conn.execute("INSERT INTO conversations_fts(conversations_fts) VALUES ('rebuild')")
+
+
+def _migrate_pagination_indexes(conn: sqlite3.Connection) -> None:
+    # (session_id, id) serves both per-session lookups and newest-first paging;
+    # it supersedes the old single-column idx_session
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_conversations_session_id
+        ON conversations(session_id, id)
+    """)
+    conn.execute("DROP INDEX IF EXISTS idx_session")
+    
+    # Session listings page by (last_active, session_id), with or without an agent filter
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sessions_agent_active
+        ON sessions(agent_id, last_active, session_id)
+    """)
+    
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sessions_active
+        ON sessions(last_active, session_id)
+    """)
+
+
+def _migrate_session_counters(conn: sqlite3.Connection) -> None:
+    conn.execute("ALTER TABLE conversations ADD COLUMN tokens INTEGER")
+    conn.execute("ALTER TABLE sessions ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE sessions ADD COLUMN token_total INTEGER NOT NULL DEFAULT 0")
+    
+    # One-time backfill; afterwards save_message maintains the counters incrementally
+    conn.execute("""
+        UPDATE conversations SET tokens = MAX(1, (length(message) + 2) / 3)
+    """)
+    conn.execute("""
+        UPDATE sessions SET
+            message_count = (SELECT COUNT(*) FROM conversations c WHERE c.session_id = sessions.session_id),
+            token_total = (SELECT COALESCE(SUM(c.tokens), 0) FROM conversations c WHERE c.session_id = sessions.session_id)
+    """)
+
+
+def _migrate_archive_index(conn: sqlite3.Connection) -> None:
+    # Sessions moved to cold storage: enough to list them and find their archive frame
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archived_sessions (
+            session_id TEXT PRIMARY KEY,
+            agent_id TEXT NOT NULL,
+            created_at DATETIME,
+            last_active DATETIME,
+            metadata TEXT,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            token_total INTEGER NOT NULL DEFAULT 0,
+            archive_file TEXT NOT NULL,
+            frame_offset INTEGER NOT NULL,
+            frame_length INTEGER NOT NULL,
+            archived_at DATETIME NOT NULL
+        )
+    """)
+
+
+def _migrate_token_usage(conn: sqlite3.Connection) -> None:
+    # One row per agent turn: model-reported usage summed over the tool loop
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS token_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            agent_id TEXT NOT NULL,
+            day DATE NOT NULL,
+            timestamp DATETIME NOT NULL,
+            prompt_tokens INTEGER NOT NULL DEFAULT 0,
+            completion_tokens INTEGER NOT NULL DEFAULT 0,
+            total_tokens INTEGER NOT NULL DEFAULT 0,
+            model_calls INTEGER NOT NULL DEFAULT 0,
+            tool_calls INTEGER NOT NULL DEFAULT 0,
+            stop_reason TEXT,
+            sections TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_token_usage_agent_day ON token_usage(agent_id, day)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_token_usage_session ON token_usage(session_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_token_usage_day ON token_usage(day)")
+
+
+# Append new migrations here; never edit one that has shipped
+MIGRATIONS: List[Migration] = [
+    (1, "base schema", _migrate_base_schema),
+    (2, "full-text search index", _migrate_full_text_search),
+    (3, "pagination indexes", _migrate_pagination_indexes),
+    (4, "session message/token counters", _migrate_session_counters),
+    (5, "archived session index", _migrate_archive_index),
+    (6, "token usage", _migrate_token_usage),
+]
+
+# usage_summary group_by -> grouping column
+USAGE_GROUPS = {"agent": "agent_id", "session": "session_id", "day": "day"}
 
 
 class HistoryManager:
     """Manages conversation history in SQLite database"""
     
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, archive_dir: Optional[Path] = None):
         self.db_path = db_path
+        self.archive = HistoryArchive(archive_dir) if archive_dir else None
+        # The retention loop and the admin endpoint may archive at the same time;
+        # restores take it too so a session is never archived and restored at once
+        self._archive_lock = threading.Lock()
         self._init_db()
     
     def _init_db(self) -> None:
-        """Initialize database schema"""
+        """Initialize or upgrade the database schema"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Conversations table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS conversations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                agent_id TEXT NOT NULL,
-                role TEXT NOT NULL,
-                message TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Sessions table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                agent_id TEXT NOT NULL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                last_active DATETIME DEFAULT CURRENT_TIMESTAMP,
-                metadata TEXT
-            )
-        """)
-        
-        # Indexes
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_session 
-            ON conversations(session_id)
-        """)
-        
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_agent 
-            ON conversations(agent_id)
-        """)
-        
-        conn.commit()
+        apply_migrations(conn, MIGRATIONS)
         conn.close()
     
     def save_message(
@@ -63,22 +196,32 @@ class HistoryManager:
         session_id: str,
         agent_id: str,
         role: str,
-        message: str
+        message: str,
+        tokens: Optional[int] = None
     ) -> None:
         """Save a message to history"""
+        # Bring an archived session back first so its counters and metadata carry on
+        self._restore_if_archived(session_id)
+        if tokens is None:
+            tokens = estimate_tokens(message)
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
-            INSERT INTO conversations (session_id, agent_id, role, message)
-            VALUES (?, ?, ?, ?)
-        """, (session_id, agent_id, role, message))
+            INSERT INTO conversations (session_id, agent_id, role, message, tokens)
+            VALUES (?, ?, ?, ?, ?)
+        """, (session_id, agent_id, role, message, tokens))
         
-        # Update session last_active
+        # Update only the activity columns so created_at and metadata survive
         cursor.execute("""
-            INSERT OR REPLACE INTO sessions (session_id, agent_id, last_active)
-            VALUES (?, ?, ?)
-        """, (session_id, agent_id, datetime.now()))
+            INSERT INTO sessions (session_id, agent_id, last_active, message_count, token_total)
+            VALUES (?, ?, ?, 1, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                last_active = excluded.last_active,
+                message_count = message_count + 1,
+                token_total = token_total + excluded.token_total
+        """, (session_id, agent_id, datetime.now(), tokens))
         
         conn.commit()
         conn.close()
@@ -86,40 +229,74 @@ class HistoryManager:
     def load_history(
         self,
         session_id: str,
-        limit: int = 50
+        limit: int = 50,
+        before_id: Optional[int] = None
     ) -> List[Dict]:
         """Load conversation history for a session"""
+        return [
+            {"role": message["role"], "parts": message["parts"]}
+            for message in self.load_history_page(session_id, limit, before_id)["history"]
+        ]
+    
+    def load_history_page(
+        self,
+        session_id: str,
+        limit: int = 50,
+        before_id: Optional[int] = None
+    ) -> Dict:
+        """Load one page of history, newest page first; pass next_cursor as before_id for older messages"""
+        self._restore_if_archived(session_id)
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT role, message, timestamp
-            FROM conversations
-            WHERE session_id = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (session_id, limit))
+        if before_id is not None:
+            cursor.execute("""
+                SELECT id, role, message, timestamp
+                FROM conversations
+                WHERE session_id = ? AND id < ?
+                ORDER BY id DESC
+                LIMIT ?
+            """, (session_id, before_id, limit + 1))
+        else:
+            cursor.execute("""
+                SELECT id, role, message, timestamp
+                FROM conversations
+                WHERE session_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+            """, (session_id, limit + 1))
         
         rows = cursor.fetchall()
         conn.close()
         
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
         # Convert to Gemini format (reversed for chronological order)
         history = []
-        for role, message, timestamp in reversed(rows):
+        for message_id, role, message, timestamp in reversed(rows):
             history.append({
+                "id": message_id,
                 "role": role,
-                "parts": [message]
+                "parts": [message],
+                "timestamp": timestamp
             })
         
-        return history
+        return {
+            "history": history,
+            "next_cursor": history[0]["id"] if has_more else None
+        }
     
     def get_session_info(self, session_id: str) -> Optional[Dict]:
         """Get session information"""
+        self._restore_if_archived(session_id)
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute("""
-            SELECT agent_id, created_at, last_active, metadata
+            SELECT agent_id, created_at, last_active, metadata, message_count, token_total
             FROM sessions
             WHERE session_id = ?
         """, (session_id,))
@@ -134,37 +311,444 @@ class HistoryManager:
             "agent_id": row[0],
             "created_at": row[1],
             "last_active": row[2],
-            "metadata": json.loads(row[3]) if row[3] else {}
+            "metadata": json.loads(row[3]) if row[3] else {},
+            "message_count": row[4],
+            "token_total": row[5]
         }
     
-    def list_sessions(self, agent_id: Optional[str] = None) -> List[Dict]:
-        """List all sessions, optionally filtered by agent"""
+    @staticmethod
+    def _encode_cursor(last_active: str, session_id: str) -> str:
+        raw = json.dumps([last_active, session_id], ensure_ascii=False).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> List[str]:
+        try:
+            last_active, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        return [last_active, session_id]
+    
+    def list_sessions(
+        self,
+        agent_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Dict:
+        """List sessions, most recently active first, one keyset page at a time"""
+        clauses = []
+        params: List = []
+        if agent_id:
+            clauses.append("agent_id = ?")
+            params.append(agent_id)
+        if cursor:
+            clauses.append("(last_active, session_id) < (?, ?)")
+            params.extend(self._decode_cursor(cursor))
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        conn = sqlite3.connect(self.db_path)
+        db_cursor = conn.cursor()
+        
+        db_cursor.execute(f"""
+            SELECT session_id, agent_id, created_at, last_active, message_count, token_total
+            FROM sessions
+            {where}
+            ORDER BY last_active DESC, session_id DESC
+            LIMIT ?
+        """, (*params, limit + 1))
+        
+        rows = db_cursor.fetchall()
+        conn.close()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        return {
+            "sessions": [
+                {
+                    "session_id": row[0],
+                    "agent_id": row[1],
+                    "created_at": row[2],
+                    "last_active": row[3],
+                    "message_count": row[4],
+                    "token_total": row[5]
+                }
+                for row in rows
+            ],
+            "next_cursor": self._encode_cursor(rows[-1][3], rows[-1][0]) if has_more else None
+        }
+    
+    def load_user_messages(
+        self,
+        exclude_agents: Optional[List[str]] = None,
+        limit: int = 5000
+    ) -> List[Dict]:
+        """Most recent user messages with the agent that handled them"""
+        exclude_agents = exclude_agents or []
+        placeholders = ", ".join("?" for _ in exclude_agents)
+        exclude = f"AND agent_id NOT IN ({placeholders})" if exclude_agents else ""
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        cursor.execute(f"""
+            SELECT agent_id, message
+            FROM conversations
+            WHERE role = 'user' {exclude}
+            ORDER BY id DESC
+            LIMIT ?
+        """, (*exclude_agents, limit))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [{"agent_id": row[0], "message": row[1]} for row in rows]
+    
+    @staticmethod
+    def _build_match_query(query: str) -> str:
+        """Turn free text into an FTS5 query: every term must match, as a prefix.
+        
+        Prefix terms let '예산' find '예산을', '예산안' and so on, which the
+        unicode61 tokenizer would otherwise treat as different words.
+        """
+        terms = re.findall(r"\w+", query)
+        return " ".join(f'"{term}"*' for term in terms)
+    
+    def search(
+        self,
+        query: str,
+        agent_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+        sort: str = "rank"
+    ) -> Dict:
+        """Full-text search over messages.
+        
+        sort='rank' orders by BM25 relevance; sort='recent' walks the index
+        newest-first and stops at the page boundary, which stays fast even
+        when a term matches a large share of all messages.
+        """
+        match = self._build_match_query(query)
+        if not match:
+            return {"results": [], "next_offset": None}
+        
+        clauses = ["conversations_fts MATCH ?"]
+        params: List = [match]
         if agent_id:
-            cursor.execute("""
-                SELECT session_id, agent_id, created_at, last_active
-                FROM sessions
-                WHERE agent_id = ?
-                ORDER BY last_active DESC
-            """, (agent_id,))
-        else:
-            cursor.execute("""
-                SELECT session_id, agent_id, created_at, last_active
-                FROM sessions
-                ORDER BY last_active DESC
-            """)
+            clauses.append("c.agent_id = ?")
+            params.append(agent_id)
+        if session_id:
+            clauses.append("c.session_id = ?")
+            params.append(session_id)
+        if since:
+            clauses.append("c.timestamp >= ?")
+            params.append(self._utc_bound(since))
+        if until:
+            clauses.append("c.timestamp < ?")
+            params.append(self._utc_bound(until))
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # Fetch one extra row to know whether another page exists
+        cursor.execute(f"""
+            SELECT c.id, c.session_id, c.agent_id, c.role, c.timestamp,
+                   snippet(conversations_fts, 0, '[', ']', '…', 24),
+                   bm25(conversations_fts) AS score
+            FROM conversations_fts
+            JOIN conversations c ON c.id = conversations_fts.rowid
+            WHERE {' AND '.join(clauses)}
+            ORDER BY {"conversations_fts.rowid DESC" if sort == "recent" else "score"}
+            LIMIT ? OFFSET ?
+        """, (*params, limit + 1, offset))
         
         rows = cursor.fetchall()
         conn.close()
         
-        return [
+        results = [
             {
-                "session_id": row[0],
-                "agent_id": row[1],
-                "created_at": row[2],
-                "last_active": row[3]
+                "id": row[0],
+                "session_id": row[1],
+                "agent_id": row[2],
+                "role": row[3],
+                "timestamp": row[4],
+                "snippet": row[5],
+                "score": round(-row[6], 4)
             }
-            for row in rows
+            for row in rows[:limit]
         ]
+        
+        return {
+            "results": results,
+            "next_offset": offset + limit if len(rows) > limit else None
+        }
+    
+    @staticmethod
+    def _utc_bound(value: str) -> str:
+        """ISO date/time (server local time unless it has an offset) as a stored UTC timestamp.
+        
+        Message timestamps come from SQLite's CURRENT_TIMESTAMP, which is UTC
+        in 'YYYY-MM-DD HH:MM:SS' form.
+        """
+        try:
+            moment = datetime.fromisoformat(value.strip())
+        except ValueError:
+            raise ValueError(f"Invalid ISO date/time: {value!r}")
+        # astimezone() reads a naive value as local time
+        return moment.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    
+    def archive_sessions(self, older_than_days: int, batch_size: int = 500) -> Dict:
+        """Move sessions inactive for longer than the given age into compressed archive files"""
+        if not self.archive:
+            raise RuntimeError("No archive directory configured")
+        
+        with self._archive_lock:
+            result = self._archive_sessions(older_than_days, batch_size)
+        if result['sessions_archived']:
+            self.compact()
+        return result
+    
+    def _archive_sessions(self, older_than_days: int, batch_size: int) -> Dict:
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        archived = messages = 0
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        while True:
+            cursor.execute("""
+                SELECT session_id, agent_id, created_at, last_active, metadata, message_count, token_total
+                FROM sessions
+                WHERE last_active < ?
+                ORDER BY last_active
+                LIMIT ?
+            """, (cutoff, batch_size))
+            sessions = cursor.fetchall()
+            if not sessions:
+                break
+            
+            for session_id, agent_id, created_at, last_active, metadata, message_count, token_total in sessions:
+                cursor.execute("""
+                    SELECT id, agent_id, role, message, timestamp, tokens
+                    FROM conversations
+                    WHERE session_id = ?
+                    ORDER BY id
+                """, (session_id,))
+                records = [
+                    {"id": r[0], "agent_id": r[1], "role": r[2], "message": r[3], "timestamp": r[4], "tokens": r[5]}
+                    for r in cursor.fetchall()
+                ]
+                
+                # Write the frame first; a crash before the commit below only leaves an unreferenced frame
+                month = str(last_active)[:7]
+                archive_file, offset, length = self.archive.write_session(month, records)
+                
+                cursor.execute("""
+                    INSERT OR REPLACE INTO archived_sessions
+                        (session_id, agent_id, created_at, last_active, metadata, message_count, token_total,
+                         archive_file, frame_offset, frame_length, archived_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (session_id, agent_id, created_at, last_active, metadata, message_count, token_total,
+                      archive_file, offset, length, datetime.now()))
+                cursor.execute("DELETE FROM conversations WHERE session_id = ?", (session_id,))
+                cursor.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                conn.commit()
+                
+                archived += 1
+                messages += len(records)
+        
+        conn.close()
+        
+        return {"sessions_archived": archived, "messages_archived": messages, "cutoff": cutoff.isoformat()}
+    
+    def _restore_if_archived(self, session_id: str) -> bool:
+        """Lazily move an archived session back into the hot tables"""
+        if not self.archive:
+            return False
+        
+        with self._archive_lock:
+            return self._restore_session(session_id)
+    
+    def _restore_session(self, session_id: str) -> bool:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT agent_id, created_at, last_active, metadata, message_count, token_total,
+                   archive_file, frame_offset, frame_length
+            FROM archived_sessions
+            WHERE session_id = ?
+        """, (session_id,))
+        row = cursor.fetchone()
+        if not row:
+            conn.close()
+            return False
+        
+        records = self.archive.read_session(row[6], row[7], row[8])
+        
+        # Original ids are kept; AUTOINCREMENT never reuses them
+        cursor.executemany("""
+            INSERT OR IGNORE INTO conversations (id, session_id, agent_id, role, message, timestamp, tokens)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (r["id"], session_id, r["agent_id"], r["role"], r["message"], r["timestamp"], r["tokens"])
+            for r in records
+        ])
+        # Merge into a row created while the session was archived instead of dropping the archived counters
+        cursor.execute("""
+            INSERT INTO sessions
+                (session_id, agent_id, created_at, last_active, metadata, message_count, token_total)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                created_at = MIN(created_at, excluded.created_at),
+                last_active = MAX(last_active, excluded.last_active),
+                metadata = COALESCE(excluded.metadata, metadata),
+                message_count = message_count + excluded.message_count,
+                token_total = token_total + excluded.token_total
+        """, (session_id, *row[:6]))
+        cursor.execute("DELETE FROM archived_sessions WHERE session_id = ?", (session_id,))
+        
+        conn.commit()
+        conn.close()
+        return True
+    
+    def compact(self) -> None:
+        """Return pages freed by archiving to the filesystem.
+        
+        The first call switches the database to incremental auto-vacuum,
+        which needs one full VACUUM; later calls are incremental.
+        """
+        conn = sqlite3.connect(self.db_path)
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        else:
+            # Stepping the pragma to completion frees every free page
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+        conn.close()
+    
+    def record_usage(
+        self,
+        session_id: str,
+        agent_id: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        model_calls: int = 1,
+        tool_calls: int = 0,
+        stop_reason: Optional[str] = None,
+        sections: Optional[Dict[str, int]] = None
+    ) -> None:
+        """Persist the token usage of one agent turn"""
+        now = datetime.now()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            INSERT INTO token_usage
+                (session_id, agent_id, day, timestamp, prompt_tokens, completion_tokens, total_tokens,
+                 model_calls, tool_calls, stop_reason, sections)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (session_id, agent_id, now.date().isoformat(), now, prompt_tokens, completion_tokens,
+              prompt_tokens + completion_tokens, model_calls, tool_calls, stop_reason,
+              json.dumps(sections, ensure_ascii=False) if sections else None))
+        conn.commit()
+        conn.close()
+    
+    def usage_summary(
+        self,
+        group_by: str = "agent",
+        agent_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        since: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict:
+        """Token usage per agent, session or day (largest first; days newest first).
+        
+        Each row also carries the average prompt tokens per turn spent on
+        each prompt section, to show where input size comes from.
+        """
+        column = USAGE_GROUPS.get(group_by)
+        if column is None:
+            raise ValueError(f"group_by must be one of {sorted(USAGE_GROUPS)}")
+        
+        where, params = [], []
+        if agent_id:
+            where.append("agent_id = ?")
+            params.append(agent_id)
+        if session_id:
+            where.append("session_id = ?")
+            params.append(session_id)
+        if since:
+            where.append("day >= ?")
+            params.append(since)
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        order_sql = "group_key DESC" if group_by == "day" else "total DESC, group_key"
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {column} AS group_key, COUNT(*), SUM(prompt_tokens), SUM(completion_tokens),
+                   SUM(total_tokens) AS total, SUM(model_calls), SUM(tool_calls), MAX(timestamp)
+            FROM token_usage
+            {where_sql}
+            GROUP BY group_key
+            ORDER BY {order_sql}
+            LIMIT ?
+        """, (*params, limit))
+        groups = cursor.fetchall()
+        
+        # Section totals of the returned groups, in one pass over the JSON columns
+        section_totals: Dict[str, Dict[str, int]] = {}
+        if groups:
+            keys = [group[0] for group in groups]
+            section_where = [*where, "sections IS NOT NULL", f"{column} IN ({', '.join('?' for _ in keys)})"]
+            cursor.execute(f"""
+                SELECT {column} AS group_key, section.key, SUM(section.value)
+                FROM token_usage, json_each(token_usage.sections) AS section
+                WHERE {' AND '.join(section_where)}
+                GROUP BY group_key, section.key
+            """, (*params, *keys))
+            for key, name, tokens in cursor.fetchall():
+                section_totals.setdefault(key, {})[name] = tokens
+        
+        rows = []
+        for key, turns, prompt, completion, total, model_calls, tool_calls, last_seen in groups:
+            rows.append({
+                group_by: key,
+                "turns": turns,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "total_tokens": total,
+                "model_calls": model_calls,
+                "tool_calls": tool_calls,
+                "last_seen": last_seen,
+                "avg_prompt_sections": {
+                    name: round(tokens / turns)
+                    for name, tokens in sorted(section_totals.get(key, {}).items(), key=lambda i: -i[1])
+                }
+            })
+        
+        cursor.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(completion_tokens), 0),
+                   COALESCE(SUM(total_tokens), 0)
+            FROM token_usage {where_sql}
+        """, params)
+        turns, prompt, completion, total = cursor.fetchone()
+        conn.close()
+        
+        return {
+            "group_by": group_by,
+            "totals": {"turns": turns, "prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": total},
+            "rows": rows
+        }
+    
+    def archive_stats(self) -> Dict:
+        """Hot vs archived session counts"""
+        conn = sqlite3.connect(self.db_path)
+        hot = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        archived = conn.execute("SELECT COUNT(*) FROM archived_sessions").fetchone()[0]
+        conn.close()
+        return {"hot_sessions": hot, "archived_sessions": archived}
@@ -0,0 +1,424 @@
+"""
+Job Queue - Durable SQLite-backed queue and worker pool for long-running agent tasks
+"""
+
+import asyncio
+import json
+import sqlite3
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+FINISHED_STATUSES = ("succeeded", "failed")
+
+# Job whose turn is running in the current task; delegations made during
+# the turn are submitted as its children
+current_job_id: ContextVar[Optional[str]] = ContextVar("current_job_id", default=None)
+
+
+class JobQueue:
+    """Persists agent jobs in SQLite so they survive server restarts"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self) -> None:
+        """Initialize database schema"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        # WAL lets status polls read while a worker is writing
+        cursor.execute("PRAGMA journal_mode=WAL")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                agent_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                message TEXT NOT NULL,
+                context_package TEXT,
+                webhook_url TEXT,
+                parent_job_id TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at DATETIME NOT NULL,
+                started_at DATETIME,
+                finished_at DATETIME
+            )
+        """)
+
+        # Databases created before child jobs were tracked
+        columns = [row["name"] for row in cursor.execute("PRAGMA table_info(jobs)")]
+        if "parent_job_id" not in columns:
+            cursor.execute("ALTER TABLE jobs ADD COLUMN parent_job_id TEXT")
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_status
+            ON jobs(status)
+        """)
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_agent
+            ON jobs(agent_id, status)
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def _row_to_job(self, row: sqlite3.Row, include_result: bool = True) -> Dict:
+        job = {
+            "job_id": row["job_id"],
+            "agent_id": row["agent_id"],
+            "session_id": row["session_id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "webhook_url": row["webhook_url"],
+            "parent_job_id": row["parent_job_id"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "error": row["error"]
+        }
+        if include_result:
+            job["message"] = row["message"]
+            job["context_package"] = json.loads(row["context_package"]) if row["context_package"] else None
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
+
+    def submit(
+        self,
+        agent_id: str,
+        message: str,
+        session_id: str,
+        context_package: Optional[Dict] = None,
+        webhook_url: Optional[str] = None,
+        parent_job_id: Optional[str] = None
+    ) -> Dict:
+        """Enqueue a new job and return its record.
+
+        parent_job_id marks a job something else is waiting on (a delegating
+        job or a workflow); the worker pool runs those in their own lane.
+        """
+        job_id = f"job-{uuid.uuid4().hex}"
+
+        conn = self._connect()
+        conn.execute("""
+            INSERT INTO jobs (job_id, agent_id, session_id, message, context_package, webhook_url, parent_job_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            job_id,
+            agent_id,
+            session_id,
+            message,
+            json.dumps(context_package, ensure_ascii=False) if context_package else None,
+            webhook_url,
+            parent_job_id,
+            datetime.now().isoformat()
+        ))
+        conn.commit()
+        conn.close()
+
+        return self.get(job_id)
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[Dict]:
+        """Get a job by ID"""
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        conn.close()
+
+        if not row:
+            return None
+        return self._row_to_job(row, include_result)
+
+    def list_jobs(
+        self,
+        agent_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """List most recent jobs, optionally filtered by agent and status"""
+        clauses = []
+        params: List = []
+        if agent_id:
+            clauses.append("agent_id = ?")
+            params.append(agent_id)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+
+        conn = self._connect()
+        rows = conn.execute(f"""
+            SELECT * FROM jobs
+            {where}
+            ORDER BY rowid DESC
+            LIMIT ?
+        """, params).fetchall()
+        conn.close()
+
+        return [self._row_to_job(row, include_result=False) for row in rows]
+
+    def claim_next(self, busy_agents: Optional[List[str]] = None, children: Optional[bool] = None) -> Optional[Dict]:
+        """Atomically move the oldest queued job of a non-busy agent to 'running'.
+
+        children=True claims only child jobs, False only top-level ones, None either.
+        """
+        busy_agents = busy_agents or []
+        exclude = ""
+        if busy_agents:
+            exclude = f"AND agent_id NOT IN ({', '.join('?' for _ in busy_agents)})"
+        if children is not None:
+            exclude += f" AND parent_job_id IS {'NOT ' if children else ''}NULL"
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(f"""
+                SELECT job_id FROM jobs
+                WHERE status = 'queued' {exclude}
+                ORDER BY rowid
+                LIMIT 1
+            """, busy_agents).fetchone()
+
+            if not row:
+                conn.rollback()
+                return None
+
+            conn.execute("""
+                UPDATE jobs
+                SET status = 'running', started_at = ?, attempts = attempts + 1
+                WHERE job_id = ?
+            """, (datetime.now().isoformat(), row["job_id"]))
+            conn.commit()
+
+            job = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+            return self._row_to_job(job)
+        finally:
+            conn.close()
+
+    def complete(self, job_id: str, result: Dict) -> None:
+        """Mark a job as succeeded and store its result"""
+        conn = self._connect()
+        conn.execute("""
+            UPDATE jobs
+            SET status = 'succeeded', result = ?, error = NULL, finished_at = ?
+            WHERE job_id = ?
+        """, (json.dumps(result, ensure_ascii=False), datetime.now().isoformat(), job_id))
+        conn.commit()
+        conn.close()
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job as failed"""
+        conn = self._connect()
+        conn.execute("""
+            UPDATE jobs
+            SET status = 'failed', error = ?, finished_at = ?
+            WHERE job_id = ?
+        """, (error, datetime.now().isoformat(), job_id))
+        conn.commit()
+        conn.close()
+
+    def requeue_interrupted(self) -> Tuple[int, int]:
+        """Return jobs left 'running' by a previous process to the queue.
+
+        A child whose parent is re-queued too (or whose parent is a workflow,
+        which resumes its nodes itself) is failed instead: the parent
+        delegates again, so re-running the child would do the work twice.
+        Returns (re-queued, failed) counts.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        orphaned = conn.execute("""
+            UPDATE jobs
+            SET status = 'failed', error = 'interrupted', finished_at = ?
+            WHERE status = 'running'
+            AND parent_job_id IS NOT NULL
+            AND (
+                parent_job_id IN (SELECT job_id FROM jobs WHERE status = 'running')
+                OR parent_job_id NOT IN (SELECT job_id FROM jobs)
+            )
+        """, (datetime.now().isoformat(),)).rowcount
+        cursor = conn.execute("""
+            UPDATE jobs
+            SET status = 'queued', started_at = NULL
+            WHERE status = 'running'
+        """)
+        count = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return count, orphaned
+
+
+class JobWorkerPool:
+    """Runs queued jobs with a global worker limit and per-agent concurrency limits.
+
+    Child jobs (those with a parent_job_id) run in a separate lane of
+    max_child_workers slots, so parents holding every worker slot while
+    they wait on their children can't starve them.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        runner: Callable[[Dict], Awaitable[Dict]],
+        max_workers: int = 4,
+        default_agent_concurrency: int = 2,
+        agent_concurrency: Optional[Dict[str, int]] = None,
+        poll_interval: float = 1.0,
+        max_child_workers: Optional[int] = None
+    ):
+        self.queue = queue
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_child_workers = max_workers if max_child_workers is None else max_child_workers
+        self.default_agent_concurrency = default_agent_concurrency
+        self.agent_concurrency = agent_concurrency or {}
+        self.poll_interval = poll_interval
+
+        self._running: Dict[str, int] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._child_jobs = 0
+        # Webhook deliveries, which no longer hold a worker slot
+        self._deliveries: Set[asyncio.Task] = set()
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def agent_limit(self, agent_id: str) -> int:
+        return self.agent_concurrency.get(agent_id, self.default_agent_concurrency)
+
+    async def start(self) -> None:
+        """Recover interrupted jobs and start dispatching"""
+        recovered, orphaned = self.queue.requeue_interrupted()
+        if recovered:
+            print(f"♻️ Re-queued {recovered} interrupted job(s)")
+        if orphaned:
+            print(f"♻️ Failed {orphaned} interrupted child job(s); their parents run again")
+
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self) -> None:
+        """Stop dispatching; running jobs are cancelled and re-queued on next start"""
+        if self._dispatcher:
+            self._dispatcher.cancel()
+        tasks = [*self._tasks.values(), *self._deliveries]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+
+    def notify(self) -> None:
+        """Wake the dispatcher after a job was submitted"""
+        if self._wakeup:
+            self._wakeup.set()
+
+    def stats(self) -> Dict:
+        return {
+            "active_jobs": len(self._tasks),
+            "max_workers": self.max_workers,
+            "child_jobs": self._child_jobs,
+            "max_child_workers": self.max_child_workers,
+            "pending_webhooks": len(self._deliveries),
+            "running_per_agent": {a: n for a, n in self._running.items() if n}
+        }
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Wait until a job finishes (or timeout) and return its latest record"""
+        job = self.queue.get(job_id)
+        if not job or job["status"] in FINISHED_STATUSES:
+            return job
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(job_id, []).append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters = self._waiters.get(job_id, [])
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters:
+                self._waiters.pop(job_id, None)
+
+        return self.queue.get(job_id)
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            self._claim(children=False)
+            self._claim(children=True)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _claim(self, children: bool) -> None:
+        """Start queued jobs of one lane while it has free slots"""
+        while True:
+            if children:
+                if self._child_jobs >= self.max_child_workers:
+                    return
+            elif len(self._tasks) - self._child_jobs >= self.max_workers:
+                return
+            busy = [a for a, n in self._running.items() if n >= self.agent_limit(a)]
+            job = self.queue.claim_next(busy, children=children)
+            if not job:
+                return
+
+            agent_id = job["agent_id"]
+            self._running[agent_id] = self._running.get(agent_id, 0) + 1
+            if children:
+                self._child_jobs += 1
+            self._tasks[job["job_id"]] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: Dict) -> None:
+        job_id = job["job_id"]
+        # Each job runs in its own task, so this doesn't leak into other jobs
+        current_job_id.set(job_id)
+        try:
+            result = await self.runner(job)
+            self.queue.complete(job_id, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.queue.fail(job_id, str(e))
+        finally:
+            self._running[job["agent_id"]] -= 1
+            if job["parent_job_id"]:
+                self._child_jobs -= 1
+            self._tasks.pop(job_id, None)
+            self.notify()
+
+        for future in self._waiters.get(job_id, []):
+            if not future.done():
+                future.set_result(True)
+
+        finished = self.queue.get(job_id)
+        if finished and finished.get("webhook_url"):
+            delivery = asyncio.create_task(self._send_webhook(finished))
+            self._deliveries.add(delivery)
+            delivery.add_done_callback(self._deliveries.discard)
+
+    async def _send_webhook(self, job: Dict) -> None:
+        import httpx
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                await client.post(job["webhook_url"], json=job)
+        except Exception as e:
+            print(f"⚠️ Webhook delivery failed for {job['job_id']}: {str(e)}")
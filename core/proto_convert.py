@@ -0,0 +1,91 @@
+"""
+Proto Convert - Function-call arguments from Gemini protos to plain Python values
+"""
+
+from typing import Any, Callable, Dict
+
+from google.protobuf import struct_pb2
+from proto.marshal.collections.maps import MapComposite
+from proto.marshal.collections.repeated import Repeated, RepeatedComposite
+
+
+def _value(value: struct_pb2.Value) -> Any:
+    # Ordered by how often each kind shows up in tool arguments
+    kind = value.WhichOneof('kind')
+    if kind == "string_value":
+        return value.string_value
+    if kind == "number_value":
+        return value.number_value
+    if kind == "list_value":
+        return [_value(item) for item in value.list_value.values]
+    if kind == "struct_value":
+        return {key: _value(item) for key, item in value.struct_value.fields.items()}
+    if kind == "bool_value":
+        return value.bool_value
+    return None
+
+
+def struct_to_dict(struct: struct_pb2.Struct) -> Dict:
+    """Plain dict from a protobuf Struct (numbers come back as floats)"""
+    return {key: _value(item) for key, item in struct.fields.items()}
+
+
+def function_call_args(function_call) -> Dict:
+    """Arguments of a model function call as a plain dict.
+
+    proto-plus wraps FunctionCall.args in MapComposite/RepeatedComposite
+    views that re-marshal every element on access; reading the underlying
+    protobuf Struct directly skips that layer. Anything that isn't a
+    proto-plus message (raw protobuf, test doubles) goes through to_python.
+    """
+    try:
+        message = type(function_call).pb(function_call)
+    except (AttributeError, TypeError):
+        return to_python(function_call.args) or {}
+    return struct_to_dict(message.args)
+
+
+def _mapping(value) -> Dict:
+    return {key: to_python(item) for key, item in value.items()}
+
+
+def _sequence(value) -> list:
+    return [to_python(item) for item in value]
+
+
+def _identity(value):
+    return value
+
+
+# Concrete type -> converter; types not listed are classified on first sight
+_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    bytes: _identity,
+    type(None): _identity,
+    dict: _mapping,
+    list: _sequence,
+    tuple: _sequence,
+    MapComposite: _mapping,
+    RepeatedComposite: _sequence,
+    Repeated: _sequence,
+    struct_pb2.Struct: struct_to_dict,
+    struct_pb2.ListValue: lambda value: [_value(item) for item in value.values],
+    struct_pb2.Value: _value
+}
+
+
+def to_python(value: Any) -> Any:
+    """Recursively convert proto-plus/protobuf containers to dicts and lists"""
+    convert = _CONVERTERS.get(type(value))
+    if convert is None:
+        if hasattr(value, "items"):
+            convert = _mapping
+        elif hasattr(value, "__iter__") and not isinstance(value, (str, bytes)):
+            convert = _sequence
+        else:
+            convert = _identity
+        _CONVERTERS[type(value)] = convert
+    return convert(value)
@@ -0,0 +1,177 @@
+"""
+Resource Registry - Shared project resources (sheets, docs, slides) backed by SQLite
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class ResourceRegistry:
+    """Name -> resource map shared by all agents.
+
+    Every write is a single atomic statement, so concurrent tool calls
+    (in this process or another) cannot lose each other's updates the
+    way the old read-modify-write of project_resources.json did. A
+    version counter is bumped with each change so readers can cache
+    whatever they render from the registry.
+    """
+
+    def __init__(self, db_path: Path, legacy_json: Optional[Path] = None):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+        if legacy_json:
+            self._import_legacy(legacy_json)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS resources (
+                name TEXT PRIMARY KEY,
+                resource_id TEXT NOT NULL,
+                type TEXT NOT NULL,
+                purpose TEXT NOT NULL DEFAULT '',
+                registered_by TEXT,
+                updated_at DATETIME NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS registry_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        conn.execute("INSERT OR IGNORE INTO registry_meta (key, value) VALUES ('version', 0)")
+        conn.commit()
+        conn.close()
+
+    def _import_legacy(self, legacy_json: Path):
+        """One-time import of data/project_resources.json; the file is left in place"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            imported = conn.execute(
+                "SELECT value FROM registry_meta WHERE key = 'legacy_imported'"
+            ).fetchone()
+            if imported or not legacy_json.exists():
+                conn.rollback()
+                return
+
+            try:
+                resources = json.loads(legacy_json.read_text(encoding='utf-8')).get("resources", {})
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"⚠️ Could not import {legacy_json}: {str(e)}")
+                resources = {}
+
+            for name, info in resources.items():
+                conn.execute("""
+                    INSERT OR IGNORE INTO resources (name, resource_id, type, purpose, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (
+                    name, str(info.get('id', '')), info.get('type', 'other'),
+                    info.get('purpose', ''), info.get('updated_at') or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                ))
+            conn.execute("INSERT INTO registry_meta (key, value) VALUES ('legacy_imported', 1)")
+            conn.execute("UPDATE registry_meta SET value = value + 1 WHERE key = 'version'")
+            conn.commit()
+            if resources:
+                print(f"📦 Imported {len(resources)} resource(s) from {legacy_json.name}")
+        finally:
+            conn.close()
+
+    def version(self) -> int:
+        """Counter bumped on every change"""
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM registry_meta WHERE key = 'version'").fetchone()
+        conn.close()
+        return row[0]
+
+    def register(
+        self,
+        name: str,
+        resource_id: str,
+        resource_type: str,
+        purpose: str = "",
+        registered_by: Optional[str] = None
+    ) -> int:
+        """Insert or replace a resource; returns the new registry version"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT INTO resources (name, resource_id, type, purpose, registered_by, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        resource_id = excluded.resource_id,
+                        type = excluded.type,
+                        purpose = excluded.purpose,
+                        registered_by = excluded.registered_by,
+                        updated_at = excluded.updated_at
+                """, (name, resource_id, resource_type, purpose or "", registered_by,
+                      datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+                return self._bump(conn)
+        finally:
+            conn.close()
+
+    def remove(self, name: str) -> bool:
+        """Delete a resource by name; False if it was not registered"""
+        conn = self._connect()
+        try:
+            with conn:
+                deleted = conn.execute("DELETE FROM resources WHERE name = ?", (name,)).rowcount
+                if deleted:
+                    self._bump(conn)
+            return bool(deleted)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection) -> int:
+        conn.execute("UPDATE registry_meta SET value = value + 1 WHERE key = 'version'")
+        return conn.execute("SELECT value FROM registry_meta WHERE key = 'version'").fetchone()[0]
+
+    def get(self, name: str) -> Optional[Dict]:
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM resources WHERE name = ?", (name,)).fetchone()
+        conn.close()
+        return self._row_to_dict(row) if row else None
+
+    def list_resources(self) -> Dict[str, Dict]:
+        """All resources keyed by name, in the same shape as the legacy JSON file"""
+        conn = self._connect()
+        rows = conn.execute("SELECT * FROM resources ORDER BY name").fetchall()
+        conn.close()
+        return {row['name']: self._row_to_dict(row) for row in rows}
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        return {
+            "id": row['resource_id'],
+            "type": row['type'],
+            "purpose": row['purpose'],
+            "registered_by": row['registered_by'],
+            "updated_at": row['updated_at']
+        }
+
+
+_registries: Dict[Path, ResourceRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_resource_registry(data_dir: Path) -> ResourceRegistry:
+    """Shared registry for a data directory (data/project_resources.db)"""
+    db_path = (data_dir / "project_resources.db").resolve()
+    with _registries_lock:
+        if db_path not in _registries:
+            _registries[db_path] = ResourceRegistry(db_path, legacy_json=db_path.with_suffix(".json"))
+        return _registries[db_path]
@@ -0,0 +1,255 @@
+"""
+Agent Router - Keyword-based fast routing that skips the master LLM hop
+"""
+
+import json
+import math
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.base_agent import BaseAgent
+
+
+# Weight of a term depending on which part of the agent profile it came from
+FIELD_WEIGHTS = {
+    "keywords": 3.0,
+    "job_category": 1.5,
+    "role": 1.0,
+    "responsibilities": 1.0
+}
+
+STOPWORDS = {
+    "and", "or", "the", "of", "for", "to", "in", "on", "a", "an", "with", "by", "as", "at",
+    "및", "등", "관련", "업무", "관리", "담당"
+}
+
+MIN_TERM_LENGTH = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (Unicode-aware, so Hangul words are kept intact)"""
+    return [t for t in re.findall(r"\w+", text.lower()) if len(t) >= MIN_TERM_LENGTH and t not in STOPWORDS]
+
+
+def agent_profile(agent: BaseAgent) -> Dict[str, List[str]]:
+    """Routing-relevant text of an agent, grouped by profile field"""
+    return {
+        "keywords": list(agent.keywords or []),
+        "job_category": [agent.job_category] if agent.job_category and agent.job_category != "common" else [],
+        "role": [agent.role, agent.agent_name],
+        "responsibilities": list(agent.scope.get('responsibilities', []))
+    }
+
+
+def load_routing_samples(
+    action_log_file: Path,
+    history_samples: Optional[List[Tuple[str, str]]] = None,
+    limit: int = 5000
+) -> List[Tuple[str, str]]:
+    """Labelled (message, agent_id) pairs from logged sessions.
+
+    The master's delegate_task calls in the action log record which agent
+    it picked for each task; messages sent straight to sub-agents (from
+    history.db) are labelled with the agent that handled them.
+    """
+    samples: List[Tuple[str, str]] = []
+    if action_log_file.exists():
+        with open(action_log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get('tool') != "delegate_task":
+                    continue
+                params = entry.get('parameters') or {}
+                if params.get('task_description') and params.get('target_agent'):
+                    samples.append((params['task_description'], params['target_agent']))
+
+    samples.extend(history_samples or [])
+
+    # Delegated tasks also appear in history; count each pair once
+    unique = list(dict.fromkeys(samples))
+    return unique[-limit:]
+
+
+class KeywordRouter:
+    """Inverted index over agent keywords, roles and responsibilities"""
+
+    def __init__(
+        self,
+        min_score: float = 4.0,
+        min_margin: float = 2.0,
+        excluded_agents: Iterable[str] = ()
+    ):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.excluded_agents = set(excluded_agents)
+        # term -> {agent_id: field weight}
+        self._index: Dict[str, Dict[str, float]] = {}
+        self._agent_terms: Dict[str, List[str]] = {}
+
+    @property
+    def agent_ids(self) -> List[str]:
+        return list(self._agent_terms)
+
+    def add_agent(self, agent: BaseAgent) -> None:
+        """Index (or re-index) an agent"""
+        if agent.agent_id in self.excluded_agents:
+            return
+        self.remove_agent(agent.agent_id)
+
+        weights: Dict[str, float] = {}
+        for field, texts in agent_profile(agent).items():
+            for text in texts:
+                for term in tokenize(text):
+                    weights[term] = max(weights.get(term, 0.0), FIELD_WEIGHTS[field])
+
+        for term, weight in weights.items():
+            self._index.setdefault(term, {})[agent.agent_id] = weight
+        self._agent_terms[agent.agent_id] = list(weights)
+
+    def remove_agent(self, agent_id: str) -> None:
+        for term in self._agent_terms.pop(agent_id, []):
+            postings = self._index.get(term, {})
+            postings.pop(agent_id, None)
+            if not postings:
+                self._index.pop(term, None)
+
+    def _lookup(self, token: str) -> Optional[str]:
+        """Longest indexed term that equals or prefixes the token.
+
+        Prefix matching lets Korean words with particles attached
+        (e.g. '예산을', '일정이') hit the bare keyword.
+        """
+        for end in range(len(token), MIN_TERM_LENGTH - 1, -1):
+            if token[:end] in self._index:
+                return token[:end]
+        return None
+
+    def score(self, message: str) -> List[Dict]:
+        """Score every agent against a message, best first"""
+        agent_count = max(len(self._agent_terms), 1)
+        normalizer = math.log(1 + agent_count)
+        scores: Dict[str, float] = {}
+        matched: Dict[str, List[str]] = {}
+
+        for token in set(tokenize(message)):
+            term = self._lookup(token)
+            if not term:
+                continue
+            postings = self._index[term]
+            # Terms shared by many agents discriminate less
+            idf = math.log(1 + agent_count / len(postings)) / normalizer
+            for agent_id, weight in postings.items():
+                scores[agent_id] = scores.get(agent_id, 0.0) + weight * idf
+                matched.setdefault(agent_id, []).append(term)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [
+            {"agent_id": agent_id, "score": round(score, 3), "matched": sorted(matched[agent_id])}
+            for agent_id, score in ranked
+        ]
+
+    def route(self, message: str) -> Dict:
+        """Decide whether a message can skip the master and go straight to a sub-agent"""
+        candidates = self.score(message)
+        best = candidates[0]['score'] if candidates else 0.0
+        runner_up = candidates[1]['score'] if len(candidates) > 1 else 0.0
+        confident = best >= self.min_score and (best - runner_up) >= self.min_margin
+
+        return {
+            "agent_id": candidates[0]['agent_id'] if confident else None,
+            "confident": confident,
+            "score": best,
+            "margin": round(best - runner_up, 3),
+            "candidates": candidates[:5]
+        }
+
+    def evaluate(self, samples: List[Tuple[str, str]]) -> Dict:
+        """Offline evaluation against (message, expected_agent_id) pairs"""
+        return evaluate_routing(self.route, samples, self.agent_ids)
+
+
+def evaluate_routing(
+    route: Callable[[str], Dict],
+    samples: List[Tuple[str, str]],
+    agent_ids: Iterable[str]
+) -> Dict:
+    """Replay labelled messages through a routing function.
+
+    `route` must return a decision with 'agent_id' (None when it would
+    fall back to the master) and ranked 'candidates'.
+    """
+    known = set(agent_ids)
+    total = routed = correct = top1_correct = 0
+    errors = []
+
+    for message, expected in samples:
+        if expected not in known:
+            continue
+        total += 1
+        decision = route(message)
+        candidates = decision.get('candidates') or []
+        if candidates and candidates[0]['agent_id'] == expected:
+            top1_correct += 1
+        if decision['agent_id']:
+            routed += 1
+            if decision['agent_id'] == expected:
+                correct += 1
+            elif len(errors) < 20:
+                errors.append({"message": message[:200], "expected": expected, "routed_to": decision['agent_id']})
+
+    return {
+        "samples": total,
+        "routed": routed,
+        "correct": correct,
+        # Share of fast-routed messages that went to the right agent
+        "precision": round(correct / routed, 4) if routed else None,
+        # Share of all messages that would skip the master hop
+        "coverage": round(routed / total, 4) if total else None,
+        "top1_accuracy": round(top1_correct / total, 4) if total else None,
+        "misroutes": errors
+    }
+
+
+class RoutingMetrics:
+    """Counters for fast-routing decisions and the latency they save"""
+
+    def __init__(self):
+        self.direct = 0
+        self.fallback = 0
+        self._direct_seconds = 0.0
+        self._fallback_seconds = 0.0
+        self.last_evaluation: Optional[Dict] = None
+        self.started_at = time.time()
+
+    def record(self, routed: bool, seconds: float) -> None:
+        if routed:
+            self.direct += 1
+            self._direct_seconds += seconds
+        else:
+            self.fallback += 1
+            self._fallback_seconds += seconds
+
+    def snapshot(self) -> Dict:
+        avg_direct = self._direct_seconds / self.direct if self.direct else None
+        avg_fallback = self._fallback_seconds / self.fallback if self.fallback else None
+        saved = None
+        if avg_direct is not None and avg_fallback is not None:
+            # Estimated wall time saved by not going through the master turn
+            saved = round(max(avg_fallback - avg_direct, 0.0) * self.direct, 3)
+
+        total = self.direct + self.fallback
+        return {
+            "requests": total,
+            "direct": self.direct,
+            "fallback": self.fallback,
+            "direct_ratio": round(self.direct / total, 4) if total else None,
+            "avg_direct_seconds": round(avg_direct, 3) if avg_direct is not None else None,
+            "avg_fallback_seconds": round(avg_fallback, 3) if avg_fallback is not None else None,
+            "estimated_seconds_saved": saved,
+            "last_evaluation": self.last_evaluation
+        }
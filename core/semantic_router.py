@@ -0,0 +1,134 @@
+"""
+Semantic Router - Offline character n-gram TF-IDF index for agent selection
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.base_agent import BaseAgent
+from core.router import agent_profile, evaluate_routing
+
+
+def char_ngrams(text: str, min_n: int = 2, max_n: int = 4) -> Counter:
+    """Character n-grams taken inside word boundaries.
+
+    Hangul syllables are single characters, so 2-4 grams capture Korean
+    stems regardless of attached particles, and English words get
+    sub-word overlap (e.g. 'budget' / 'budgeting') for free.
+    """
+    grams: Counter = Counter()
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f" {word} "
+        for n in range(min_n, max_n + 1):
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+def agent_document(agent: BaseAgent) -> str:
+    """Persona and responsibilities text that the agent's system prompt is built from"""
+    return "\n".join(text for texts in agent_profile(agent).values() for text in texts if text)
+
+
+class SemanticRouter:
+    """Cosine top-k agent matching over a dense NumPy TF-IDF matrix"""
+
+    def __init__(self, min_score: float = 0.25, min_margin: float = 0.05, excluded_agents=()):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.excluded_agents = set(excluded_agents)
+
+        self._vocab: Dict[str, int] = {}
+        self._agent_ids: List[str] = []
+        # Raw term counts (agents x vocabulary); weights are derived from this
+        self._counts = np.zeros((0, 0), dtype=np.float32)
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    @property
+    def agent_ids(self) -> List[str]:
+        return list(self._agent_ids)
+
+    def add_agent(self, agent: BaseAgent) -> None:
+        """Vectorize one agent and fold it into the index without re-vectorizing the others"""
+        if agent.agent_id in self.excluded_agents:
+            return
+
+        grams = char_ngrams(agent_document(agent))
+        new_terms = [g for g in grams if g not in self._vocab]
+        for gram in new_terms:
+            self._vocab[gram] = len(self._vocab)
+        if new_terms:
+            self._counts = np.pad(self._counts, ((0, 0), (0, len(new_terms))))
+
+        row = np.zeros(len(self._vocab), dtype=np.float32)
+        row[[self._vocab[g] for g in grams]] = list(grams.values())
+
+        if agent.agent_id in self._agent_ids:
+            self._counts[self._agent_ids.index(agent.agent_id)] = row
+        else:
+            self._agent_ids.append(agent.agent_id)
+            self._counts = np.vstack([self._counts, row]) if self._counts.size else row[np.newaxis, :]
+
+        self._reweight()
+
+    def _reweight(self) -> None:
+        """Recompute IDF and the normalized TF-IDF matrix from raw counts"""
+        n_agents = self._counts.shape[0]
+        df = np.count_nonzero(self._counts, axis=0)
+        self._idf = (np.log((1 + n_agents) / (1 + df)) + 1).astype(np.float32)
+
+        tf = np.log1p(self._counts)
+        weighted = tf * self._idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._matrix = weighted / norms
+
+    def _vectorize(self, text: str) -> Optional[np.ndarray]:
+        grams = char_ngrams(text)
+        known = [(self._vocab[g], count) for g, count in grams.items() if g in self._vocab]
+        if not known:
+            return None
+
+        vector = np.zeros(len(self._vocab), dtype=np.float32)
+        indices, counts = zip(*known)
+        vector[list(indices)] = np.log1p(np.array(counts, dtype=np.float32))
+        vector *= self._idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def query(self, message: str, k: int = 3) -> List[Dict]:
+        """Top-k agents by cosine similarity, best first"""
+        if not self._agent_ids:
+            return []
+        vector = self._vectorize(message)
+        if vector is None:
+            return []
+
+        scores = self._matrix @ vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{"agent_id": self._agent_ids[i], "score": round(float(scores[i]), 4)} for i in top]
+
+    def route(self, message: str, k: int = 3) -> Dict:
+        """Confident single-agent decision plus the top-k candidates"""
+        candidates = self.query(message, max(k, 2))
+        best = candidates[0]['score'] if candidates else 0.0
+        runner_up = candidates[1]['score'] if len(candidates) > 1 else 0.0
+        confident = best >= self.min_score and (best - runner_up) >= self.min_margin
+
+        return {
+            "agent_id": candidates[0]['agent_id'] if confident else None,
+            "confident": confident,
+            "score": best,
+            "margin": round(best - runner_up, 4),
+            "candidates": candidates[:k]
+        }
+
+    def evaluate(self, samples: List[Tuple[str, str]]) -> Dict:
+        """Offline evaluation against (message, expected_agent_id) pairs"""
+        return evaluate_routing(self.route, samples, self._agent_ids)
@@ -0,0 +1,81 @@
+"""
+Status Board - In-memory snapshot of every agent's status, kept current by write events
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from core.base_agent import BaseAgent
+from core.status_store import AgentStatus
+
+
+class StatusBoard:
+    """Aggregated agent status served without touching work_docs.
+
+    Each agent's StatusStore notifies the board when it persists a new
+    status, and completed turns are recorded as they finish. Every change
+    bumps a version, which doubles as the ETag and lets clients ask for
+    only the agents that changed since the version they last saw.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        # Distinguishes ETags across server restarts
+        self._epoch = os.urandom(4).hex()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def etag(self) -> str:
+        return f'"{self._epoch}-{self._version}"'
+
+    def watch(self, agent: BaseAgent) -> None:
+        """Seed an agent's entry and subscribe to its status writes"""
+        self.publish(agent.agent_id, agent.load_current_status(), agent_name=agent.agent_name)
+        agent.status_store.listeners.append(
+            lambda status, agent_id=agent.agent_id: self.publish(agent_id, status)
+        )
+
+    def publish(self, agent_id: str, status: AgentStatus, agent_name: Optional[str] = None) -> None:
+        with self._lock:
+            entry = self._entries.setdefault(agent_id, {
+                "agent_id": agent_id,
+                "agent_name": agent_name or agent_id,
+                "turns": 0,
+                "last_turn_at": None
+            })
+            if agent_name:
+                entry['agent_name'] = agent_name
+            entry['status'] = status.to_dict()
+            self._bump(entry)
+
+    def record_turn(self, agent_id: str) -> None:
+        """Note a completed turn for an agent"""
+        with self._lock:
+            entry = self._entries.get(agent_id)
+            if not entry:
+                return
+            entry['turns'] += 1
+            entry['last_turn_at'] = datetime.now().isoformat(timespec='seconds')
+            self._bump(entry)
+
+    def _bump(self, entry: Dict) -> None:
+        self._version += 1
+        entry['version'] = self._version
+
+    def snapshot(self, since: int = 0) -> Dict:
+        """Entries changed after version `since` (all of them when 0)"""
+        with self._lock:
+            agents = [dict(e) for e in self._entries.values() if e['version'] > since]
+            return {
+                "version": self._version,
+                "etag": self.etag,
+                "total": len(self._entries),
+                "agents": sorted(agents, key=lambda e: e['agent_id'])
+            }
@@ -0,0 +1,270 @@
+"""
+Status Store - Atomic, debounced persistence of an agent's current status
+"""
+
+import asyncio
+import json
+import os
+import re
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+STATUS_FIELDS = ("in_progress", "waiting", "blocking_issues", "next_steps")
+
+# current_status.md section headings, in file order
+SECTION_TITLES = {
+    "in_progress": "진행 중인 작업",
+    "waiting": "대기 중인 작업",
+    "blocking_issues": "차단 이슈",
+    "next_steps": "다음 단계"
+}
+
+# Short labels used in the prompt section
+PROMPT_LABELS = {
+    "in_progress": "진행",
+    "waiting": "대기",
+    "blocking_issues": "차단",
+    "next_steps": "다음"
+}
+
+
+def atomic_write_text(path: Path, content: str) -> None:
+    """Write through a temp file in the same directory and rename it over the target.
+
+    Readers see either the old or the new file, never a partial write.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+@dataclass
+class AgentStatus:
+    """An agent's current work status"""
+    in_progress: List[str] = field(default_factory=list)
+    waiting: List[str] = field(default_factory=list)
+    blocking_issues: List[str] = field(default_factory=list)
+    next_steps: List[str] = field(default_factory=list)
+    updated_at: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AgentStatus":
+        return cls(
+            **{name: [str(item) for item in data.get(name) or []] for name in STATUS_FIELDS},
+            updated_at=data.get('updated_at')
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    def to_json(self) -> str:
+        """Compact form stored in current_status.json (empty fields omitted)"""
+        data = {k: v for k, v in asdict(self).items() if v}
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    def is_empty(self) -> bool:
+        return not any(getattr(self, name) for name in STATUS_FIELDS)
+
+    def to_markdown(self, agent_name: str) -> str:
+        """Human-readable current_status.md"""
+        updated_at = (self.updated_at or datetime.now().isoformat()).replace('T', ' ')[:19]
+        return f"""# {agent_name} 현재 상태
+
+**마지막 업데이트**: {updated_at}
+
+## 진행 중인 작업
+{chr(10).join([f'- [ ] {task}' for task in self.in_progress])}
+
+## 대기 중인 작업
+{chr(10).join([f'{i+1}. {task}' for i, task in enumerate(self.waiting)])}
+
+## 차단 이슈
+{chr(10).join([f'- {issue}' for issue in self.blocking_issues])}
+
+## 다음 단계
+{chr(10).join([f'{i+1}. {step}' for i, step in enumerate(self.next_steps)])}
+"""
+
+    def to_prompt(self, max_chars: int = 800, max_items: int = 5, max_item_chars: int = 120) -> str:
+        """One line per non-empty field, capped so a long status can't crowd out the request"""
+        if self.is_empty():
+            return "없음"
+
+        lines = []
+        for name in STATUS_FIELDS:
+            items = getattr(self, name)
+            if not items:
+                continue
+            shown = [_truncate(item, max_item_chars) for item in items[:max_items]]
+            more = f" (+{len(items) - max_items})" if len(items) > max_items else ""
+            lines.append(f"- {PROMPT_LABELS[name]}: {'; '.join(shown)}{more}")
+        if self.updated_at:
+            lines.append(f"- 갱신: {self.updated_at.replace('T', ' ')[:16]}")
+
+        return _truncate("\n".join(lines), max_chars)
+
+
+def parse_status_markdown(content: str) -> AgentStatus:
+    """Recover structured fields from a current_status.md written before the JSON sidecar existed"""
+    status = AgentStatus()
+    titles = {title: name for name, title in SECTION_TITLES.items()}
+    section: Optional[str] = None
+
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith("## "):
+            section = titles.get(line[3:].strip())
+            continue
+        if line.startswith("**마지막 업데이트**:"):
+            status.updated_at = line.split(":", 1)[1].strip()
+            continue
+        if not section or not line:
+            continue
+        item = re.sub(r"^(- \[[ xX]\] |- |\d+\. )", "", line).strip()
+        if item:
+            getattr(status, section).append(item)
+
+    return status
+
+
+def read_status(agent_dir: Path) -> AgentStatus:
+    """Persisted status of an agent directory (JSON sidecar, else legacy markdown)"""
+    json_file = agent_dir / "current_status.json"
+    if json_file.exists():
+        try:
+            return AgentStatus.from_dict(json.loads(json_file.read_text(encoding='utf-8')))
+        except (json.JSONDecodeError, OSError):
+            pass
+
+    markdown_file = agent_dir / "current_status.md"
+    if markdown_file.exists():
+        return parse_status_markdown(markdown_file.read_text(encoding='utf-8'))
+
+    return AgentStatus()
+
+
+def load_all_statuses(work_docs_dir: Path) -> Dict[str, AgentStatus]:
+    """Status of every agent under work_docs, keyed by agent id"""
+    return {
+        agent_dir.name: read_status(agent_dir)
+        for agent_dir in sorted(work_docs_dir.iterdir())
+        if agent_dir.is_dir()
+    }
+
+
+class StatusStore:
+    """current_status.json (structured) plus current_status.md (for humans).
+
+    Updates are buffered and written once per debounce window, or when
+    flush() is called at the end of a turn, so a burst of
+    update_agent_status calls produces a single pair of writes. The
+    window's timer runs on `loop` (by default the loop running when the
+    store is created), since update() is usually called from a tool
+    worker thread whose own loop is discarded after the call. Without a
+    loop every update is written immediately.
+    """
+
+    def __init__(
+        self,
+        agent_dir: Path,
+        agent_name: str,
+        flush_delay: float = 0.5,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
+        self.agent_dir = agent_dir
+        self.agent_name = agent_name
+        self.flush_delay = flush_delay
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+        self.loop = loop
+        self.json_file = agent_dir / "current_status.json"
+        self.markdown_file = agent_dir / "current_status.md"
+
+        self._pending: Optional[AgentStatus] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock = threading.Lock()
+        self.writes = 0
+        # Called with the new AgentStatus after each write
+        self.listeners: List[Callable[[AgentStatus], None]] = []
+
+    def update(
+        self,
+        in_progress: List[str],
+        waiting: List[str],
+        blocking_issues: List[str],
+        next_steps: List[str]
+    ) -> None:
+        status = AgentStatus(
+            in_progress=list(in_progress),
+            waiting=list(waiting),
+            blocking_issues=list(blocking_issues),
+            next_steps=list(next_steps),
+            updated_at=datetime.now().isoformat(timespec='seconds')
+        )
+
+        with self._lock:
+            self._pending = status
+            timer_set = self._timer is not None
+
+        if self.loop is None or self.loop.is_closed():
+            self.flush()
+        elif not timer_set:
+            # Safe from any thread; arming on the store's loop keeps the timer alive
+            self.loop.call_soon_threadsafe(self._arm)
+
+    def _arm(self) -> None:
+        """Start the debounce timer (on the store's loop) unless one is running"""
+        with self._lock:
+            if self._pending is not None and self._timer is None:
+                self._timer = self.loop.call_later(self.flush_delay, self.flush)
+
+    def flush(self) -> bool:
+        """Write the pending status, if any; returns True when something was written"""
+        with self._lock:
+            if self._timer:
+                # A timer that fires after this flush finds nothing pending
+                if not self.loop.is_closed():
+                    self.loop.call_soon_threadsafe(self._timer.cancel)
+                self._timer = None
+            status, self._pending = self._pending, None
+            if status is None:
+                return False
+
+            # JSON first: it is the source of truth for load()
+            atomic_write_text(self.json_file, status.to_json())
+            atomic_write_text(self.markdown_file, status.to_markdown(self.agent_name))
+            self.writes += 1
+
+        for listener in self.listeners:
+            listener(status)
+        return True
+
+    def load(self) -> AgentStatus:
+        """Latest status, including an update that has not been flushed yet"""
+        with self._lock:
+            if self._pending is not None:
+                return self._pending
+        return read_status(self.agent_dir)
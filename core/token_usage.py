@@ -0,0 +1,90 @@
+"""
+Token Usage - Prompt section sizing, cost estimates and oversized-section alerts
+"""
+
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from core.tokens import estimate_tokens
+
+
+# Sections that are expected to be large; never alerted on
+ALERT_EXEMPT_SECTIONS = {"user_message"}
+
+
+def section_tokens(sections: Dict[str, str]) -> Dict[str, int]:
+    """Estimated tokens per prompt section (empty sections omitted)"""
+    return {name: estimate_tokens(text) for name, text in sections.items() if text}
+
+
+def scale_sections(estimates: Dict[str, int], prompt_tokens: Optional[int]) -> Dict[str, int]:
+    """Spread the model-reported prompt size over the sections by their estimated share"""
+    estimated = sum(estimates.values())
+    if not prompt_tokens or not estimated:
+        return dict(estimates)
+    return {name: round(prompt_tokens * count / estimated) for name, count in estimates.items()}
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """USD estimate from TOKEN_COST_*_PER_MTOK; None when no prices are configured"""
+    input_price = float(os.getenv("TOKEN_COST_INPUT_PER_MTOK", 0))
+    output_price = float(os.getenv("TOKEN_COST_OUTPUT_PER_MTOK", 0))
+    if not input_price and not output_price:
+        return None
+    return round((prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000, 6)
+
+
+class UsageMonitor:
+    """Flags turns whose input is dominated by one prompt section.
+
+    A section (other than the user's own request) taking more than
+    `ratio` of a prompt of at least `min_tokens` is recorded as an alert;
+    the most recent alerts and per-section counts are kept for /api/v1/usage.
+    """
+
+    def __init__(self, ratio: float = 0.5, min_tokens: int = 2000, max_alerts: int = 100):
+        self.ratio = ratio
+        self.min_tokens = min_tokens
+        self._alerts: deque = deque(maxlen=max_alerts)
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def check(self, agent_id: str, session_id: str, sections: Dict[str, int]) -> List[Dict]:
+        total = sum(sections.values())
+        if total < self.min_tokens:
+            return []
+
+        alerts = []
+        for name, tokens in sections.items():
+            share = tokens / total
+            if name in ALERT_EXEMPT_SECTIONS or share <= self.ratio:
+                continue
+            alert = {
+                "timestamp": datetime.now().isoformat(timespec='seconds'),
+                "agent_id": agent_id,
+                "session_id": session_id,
+                "section": name,
+                "tokens": tokens,
+                "prompt_tokens": total,
+                "share": round(share, 3)
+            }
+            print(f"⚠️ Prompt section '{name}' is {share:.0%} of {agent_id}'s input ({tokens}/{total} tokens)")
+            alerts.append(alert)
+
+        with self._lock:
+            for alert in alerts:
+                self._alerts.append(alert)
+                self._counts[alert['section']] = self._counts.get(alert['section'], 0) + 1
+        return alerts
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "ratio": self.ratio,
+                "min_tokens": self.min_tokens,
+                "counts": dict(self._counts),
+                "recent": list(self._alerts)
+            }
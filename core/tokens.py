@@ -0,0 +1,8 @@
+"""
+Tokens - Shared token estimate for history, usage accounting and context compaction
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate used when the model did not report usage"""
+    return max(1, (len(text) + 2) // 3)
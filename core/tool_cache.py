@@ -0,0 +1,99 @@
+"""
+Tool Cache - Cross-turn cache for read-only tool results
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+class ToolResultCache:
+    """LRU of tool results keyed on (scope, canonical call key).
+
+    Each entry remembers the paths it was built from along with their
+    mtimes. An entry is dropped when its TTL passes, when one of those
+    paths changed on disk, or when invalidate() reports a write to the
+    path or anything beneath it (directory listings).
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # tool name -> [hits, misses]
+        self._per_tool: Dict[str, List[int]] = {}
+
+    def get(self, scope: str, tool_name: str, key: str) -> Optional[Dict]:
+        if not self.max_entries:
+            return None
+        with self._lock:
+            counters = self._per_tool.setdefault(tool_name, [0, 0])
+            entry = self._entries.get((scope, key))
+            if entry:
+                expires_at, paths, result = entry
+                if time.monotonic() < expires_at and all(_mtime(p) == m for p, m in paths):
+                    self._entries.move_to_end((scope, key))
+                    self.hits += 1
+                    counters[0] += 1
+                    return result
+                del self._entries[(scope, key)]
+            self.misses += 1
+            counters[1] += 1
+            return None
+
+    def put(self, scope: str, key: str, result: Dict, ttl: float, paths: Iterable[Path] = ()) -> None:
+        if not self.max_entries or ttl <= 0:
+            return
+        stamped = tuple((Path(p), _mtime(Path(p))) for p in paths)
+        with self._lock:
+            self._entries[(scope, key)] = (time.monotonic() + ttl, stamped, result)
+            self._entries.move_to_end((scope, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: Path) -> int:
+        """Drop entries built from `path` or from a directory containing it"""
+        path = Path(path)
+        affected = {path, *path.parents}
+        with self._lock:
+            stale = [k for k, (_, paths, _) in self._entries.items() if any(p in affected for p, _ in paths)]
+            for k in stale:
+                del self._entries[k]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "invalidations": self.invalidations,
+                "tools": {
+                    name: {"hits": hits, "misses": misses}
+                    for name, (hits, misses) in sorted(self._per_tool.items())
+                }
+            }
+
+
+tool_cache = ToolResultCache(max_entries=int(os.getenv("TOOL_CACHE_MAX_ENTRIES", 512)))
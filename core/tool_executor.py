@@ -0,0 +1,201 @@
+"""
+Tool Executor - Deadlines, concurrency limits and thread offloading for tool calls
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# Tool definition keys that describe execution policy; not part of the
+# function declaration sent to the model
+POLICY_KEYS = ("read_only", "cache_ttl", "timeout", "blocking", "max_concurrency")
+
+
+@dataclass(frozen=True)
+class ToolPolicy:
+    """How a tool may be run and its results reused.
+
+    read_only tools have no side effects, so identical calls within a turn
+    share one result; with a cache_ttl (seconds) the result is also reused
+    across turns (see core.tool_cache). timeout overrides the executor's
+    default deadline, and max_concurrency caps how many calls of the tool
+    run at once. Sync tools always run on a worker thread; blocking sends
+    an async tool that makes sync SDK calls (such as the Google APIs)
+    there too. Tools that don't declare read_only are treated as
+    side-effecting.
+    """
+    read_only: bool = False
+    cache_ttl: float = 0
+    timeout: Optional[float] = None
+    blocking: bool = False
+    max_concurrency: int = 0
+
+    @classmethod
+    def of(cls, tool: Dict) -> "ToolPolicy":
+        return cls(
+            read_only=bool(tool.get('read_only')),
+            cache_ttl=float(tool.get('cache_ttl') or 0),
+            timeout=tool.get('timeout'),
+            blocking=bool(tool.get('blocking')),
+            max_concurrency=int(tool.get('max_concurrency') or 0)
+        )
+
+
+def function_declaration(tool: Dict) -> Dict:
+    """Tool definition without the policy keys"""
+    return {k: v for k, v in tool.items() if k not in POLICY_KEYS}
+
+
+@dataclass
+class ToolExecution:
+    """Result of one tool call and where its time went"""
+    result: Dict
+    outcome: str  # success | error | timeout
+    mode: str  # async | thread | cache | rejected
+    queued_ms: float = 0.0
+    run_ms: float = 0.0
+
+    @property
+    def total_ms(self) -> float:
+        return self.queued_ms + self.run_ms
+
+
+class ToolExecutor:
+    """Runs tool calls under a deadline.
+
+    Async tools run on the event loop and are cancelled at their next await
+    when the deadline passes. Sync tools, and tools run with offload, run
+    on a worker thread in their own event loop; on timeout the turn moves
+    on immediately and the thread's task is cancelled at its next await (a
+    sync call already in progress finishes in the background, its result
+    discarded). Errors and timeouts come back as tool results rather than
+    failing the turn.
+    """
+
+    def __init__(self, default_timeout: float = 60.0, thread_workers: int = 8):
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="tool")
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # tool name -> counters
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    async def run(
+        self,
+        tool_name: str,
+        call: Callable[[], Awaitable[Dict]],
+        policy: Optional[ToolPolicy] = None,
+        offload: Optional[bool] = None
+    ) -> ToolExecution:
+        """Run the call; offload defaults to the policy's blocking flag"""
+        policy = policy or ToolPolicy()
+        timeout = policy.timeout if policy.timeout is not None else self.default_timeout
+        if offload is None:
+            offload = policy.blocking
+        mode = "thread" if offload else "async"
+
+        queued_at = time.perf_counter()
+        semaphore = self._semaphore(tool_name, policy.max_concurrency)
+        if semaphore:
+            await semaphore.acquire()
+        started = time.perf_counter()
+
+        try:
+            coro = self._offload(call) if offload else call()
+            result = await asyncio.wait_for(coro, timeout=timeout or None)
+            outcome = "error" if isinstance(result, dict) and result.get('status') == "error" else "success"
+        except asyncio.TimeoutError:
+            print(f"⏱️ Tool {tool_name} timed out after {timeout}s")
+            result = {"status": "timeout", "message": f"Tool '{tool_name}' did not finish within {timeout}s and was cancelled"}
+            outcome = "timeout"
+        except Exception as e:
+            result = {"status": "error", "message": str(e)}
+            outcome = "error"
+        finally:
+            if semaphore:
+                semaphore.release()
+
+        execution = ToolExecution(
+            result=result,
+            outcome=outcome,
+            mode=mode,
+            queued_ms=round((started - queued_at) * 1000, 2),
+            run_ms=round((time.perf_counter() - started) * 1000, 2)
+        )
+        self._record(tool_name, execution)
+        return execution
+
+    async def _offload(self, call: Callable[[], Awaitable[Dict]]) -> Any:
+        """Run the call in a worker thread with its own event loop"""
+        abandoned = threading.Event()
+        handle: Dict[str, Callable[[], None]] = {}
+
+        def target():
+            if abandoned.is_set():
+                return None
+            loop = asyncio.new_event_loop()
+            try:
+                task = loop.create_task(call())
+                handle['cancel'] = lambda: loop.call_soon_threadsafe(task.cancel)
+                return loop.run_until_complete(task)
+            finally:
+                loop.close()
+
+        future = asyncio.get_running_loop().run_in_executor(self._pool, target)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # Deadline or turn cancelled: stop the tool at its next await
+            abandoned.set()
+            if 'cancel' in handle:
+                try:
+                    handle['cancel']()
+                except RuntimeError:
+                    pass  # loop already finished
+            raise
+
+    def _semaphore(self, tool_name: str, limit: int) -> Optional[asyncio.Semaphore]:
+        if limit <= 0:
+            return None
+        semaphore = self._semaphores.get(tool_name)
+        if semaphore is None:
+            semaphore = self._semaphores[tool_name] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _record(self, tool_name: str, execution: ToolExecution) -> None:
+        stats = self._stats.setdefault(tool_name, {
+            "calls": 0, "errors": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0, "queued_ms": 0.0
+        })
+        stats['calls'] += 1
+        if execution.outcome == "error":
+            stats['errors'] += 1
+        elif execution.outcome == "timeout":
+            stats['timeouts'] += 1
+        stats['total_ms'] += execution.total_ms
+        stats['queued_ms'] += execution.queued_ms
+        stats['max_ms'] = max(stats['max_ms'], execution.total_ms)
+
+    def stats(self) -> Dict:
+        return {
+            "default_timeout": self.default_timeout,
+            "tools": {
+                name: {
+                    **{k: round(v, 2) if isinstance(v, float) else v for k, v in s.items()},
+                    "avg_ms": round(s['total_ms'] / s['calls'], 2)
+                }
+                for name, s in sorted(self._stats.items())
+            }
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+tool_executor = ToolExecutor(
+    default_timeout=float(os.getenv("TOOL_TIMEOUT", 60)),
+    thread_workers=int(os.getenv("TOOL_THREAD_WORKERS", 8))
+)
@@ -0,0 +1,254 @@
+"""
+Tool Loop - Budgeted model <-> tool iteration for a single agent turn
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import google.generativeai as genai
+
+from core.proto_convert import function_call_args
+
+
+# Reply used when the model still wants tools after the budget is spent
+BUDGET_EXHAUSTED_RESULT = {
+    "status": "budget_exhausted",
+    "message": "이번 턴의 도구 사용 한도에 도달했습니다. 더 이상 도구를 호출하지 말고 지금까지의 결과로 최종 답변을 작성하십시오."
+}
+
+
+@dataclass
+class ToolLoopLimits:
+    """Per-turn budget; any limit set to None/0 is disabled"""
+    max_iterations: int = 5
+    max_tool_calls: int = 20
+    max_tokens: Optional[int] = None
+    max_seconds: Optional[float] = 120.0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict] = None) -> "ToolLoopLimits":
+        """Defaults from TOOL_LOOP_* env vars, overridden by an agent's `tool_loop` config"""
+        limits = cls(
+            max_iterations=int(os.getenv("TOOL_LOOP_MAX_ITERATIONS", cls.max_iterations)),
+            max_tool_calls=int(os.getenv("TOOL_LOOP_MAX_TOOL_CALLS", cls.max_tool_calls)),
+            max_tokens=int(os.getenv("TOOL_LOOP_MAX_TOKENS", 0)) or None,
+            max_seconds=float(os.getenv("TOOL_LOOP_MAX_SECONDS", cls.max_seconds)) or None
+        )
+        known = {f.name for f in fields(cls)}
+        for key, value in (config or {}).items():
+            if key in known:
+                setattr(limits, key, value)
+        return limits
+
+
+@dataclass
+class TurnResult:
+    """Response text of a turn plus its tool-loop statistics"""
+    response: str
+    stats: Optional[Dict] = None
+    # The turn raised; response holds the error text shown to the user
+    failed: bool = False
+
+
+@dataclass
+class _LoopState:
+    started: float = field(default_factory=time.perf_counter)
+    iterations: int = 0
+    tool_calls: int = 0
+    memo_hits: int = 0
+    model_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Prompt size of the first send: the assembled turn prompt on its own
+    initial_prompt_tokens: int = 0
+    tools: List[List[str]] = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+def canonical_call_key(name: str, params: Dict) -> str:
+    """Stable key for a tool call regardless of argument order"""
+    return f"{name}:{json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)}"
+
+
+class ToolLoop:
+    """Drives one chat turn: send, run requested tools, send results back.
+
+    Stops when the model answers in text or a budget runs out. Identical
+    calls within the turn are served from a memo (for tools `memoizable`
+    accepts), and an iteration that repeats the previous one exactly
+    (same calls, same results) ends the loop early. When a limit stops
+    the loop, the model gets one last chance to answer from what it has
+    instead of the turn ending in a bare placeholder.
+    """
+
+    def __init__(
+        self,
+        chat,
+        execute: Callable[[str, Dict], Awaitable[Dict]],
+        limits: ToolLoopLimits,
+        parse_args: Callable[[Any], Dict] = function_call_args,
+        memoizable: Callable[[str], bool] = lambda name: True,
+        agent_id: str = ""
+    ):
+        self.chat = chat
+        self.execute = execute
+        self.limits = limits
+        self.parse_args = parse_args
+        self.memoizable = memoizable
+        self.agent_id = agent_id
+
+    async def run(self, prompt) -> TurnResult:
+        state = _LoopState()
+        memo: Dict[str, Dict] = {}
+        previous_round = None
+        stop_reason = "completed"
+
+        response = await self._send(prompt, state)
+        while True:
+            calls = self._function_calls(response)
+            if not calls:
+                break
+
+            exhausted = self._exhausted(state, len(calls))
+            if exhausted:
+                stop_reason = exhausted
+                response = await self._wrap_up(calls, state)
+                break
+
+            names = [fc.name for fc in calls]
+            params_list = [self.parse_args(fc) for fc in calls]
+            keys = [canonical_call_key(name, params) for name, params in zip(names, params_list)]
+
+            # Run each distinct call once; duplicates (within this round or
+            # earlier in the turn) reuse the memoized result
+            results: List[Optional[Dict]] = [None] * len(calls)
+            to_run = []
+            first_index: Dict[str, int] = {}
+            duplicates: Dict[int, int] = {}
+            for index, (name, key) in enumerate(zip(names, keys)):
+                if self.memoizable(name):
+                    if key in memo:
+                        results[index] = memo[key]
+                        state.memo_hits += 1
+                        continue
+                    if key in first_index:
+                        duplicates[index] = first_index[key]
+                        state.memo_hits += 1
+                        continue
+                    first_index[key] = index
+                to_run.append(index)
+
+            if to_run:
+                print(f"🛠️ Agent [{self.agent_id}] executing {len(to_run)} tools in parallel: {[names[i] for i in to_run]}")
+                outputs = await asyncio.gather(*(self.execute(names[i], params_list[i]) for i in to_run))
+                # A state change can make earlier results stale
+                mutated = any(not self.memoizable(names[i]) for i in to_run)
+                if mutated:
+                    memo.clear()
+                for index, output in zip(to_run, outputs):
+                    results[index] = output
+                    if not mutated and self.memoizable(names[index]):
+                        memo[keys[index]] = output
+            for index, original in duplicates.items():
+                results[index] = results[original]
+
+            round_results = [
+                (key, json.dumps(result, sort_keys=True, ensure_ascii=False, default=str))
+                for key, result in zip(keys, results)
+            ]
+
+            state.iterations += 1
+            state.tool_calls += len(calls)
+            state.tools.append(names)
+
+            if round_results == previous_round:
+                # Same calls, same results as last round: the model is stuck
+                stop_reason = "no_progress"
+                response = await self._wrap_up(calls, state)
+                break
+            previous_round = round_results
+
+            response = await self._send(
+                genai.protos.Content(parts=[
+                    genai.protos.Part(function_response=genai.protos.FunctionResponse(
+                        name=name, response={'result': json.loads(result_json)}
+                    ))
+                    for name, (_, result_json) in zip(names, round_results)
+                ]),
+                state
+            )
+
+        text = self._text(response)
+        if not text:
+            text = f"[도구 호출 중단: {stop_reason}]" if stop_reason != "completed" else "[도구 호출 완료]"
+
+        return TurnResult(response=text, stats={
+            "iterations": state.iterations,
+            "tool_calls": state.tool_calls,
+            "memo_hits": state.memo_hits,
+            "model_calls": state.model_calls,
+            "initial_prompt_tokens": state.initial_prompt_tokens,
+            "prompt_tokens": state.prompt_tokens,
+            "completion_tokens": state.completion_tokens,
+            "total_tokens": state.total_tokens,
+            "seconds": round(state.elapsed, 3),
+            "stop_reason": stop_reason,
+            "tools": state.tools
+        })
+
+    def _exhausted(self, state: _LoopState, next_calls: int) -> Optional[str]:
+        """Name of the first budget this round would exceed, if any"""
+        limits = self.limits
+        if limits.max_iterations and state.iterations >= limits.max_iterations:
+            return "max_iterations"
+        if limits.max_tool_calls and state.tool_calls + next_calls > limits.max_tool_calls:
+            return "max_tool_calls"
+        if limits.max_tokens and state.total_tokens >= limits.max_tokens:
+            return "max_tokens"
+        if limits.max_seconds and state.elapsed >= limits.max_seconds:
+            return "max_seconds"
+        return None
+
+    async def _wrap_up(self, calls, state: _LoopState):
+        """Decline the pending calls and ask for a final answer"""
+        return await self._send(
+            genai.protos.Content(parts=[
+                genai.protos.Part(function_response=genai.protos.FunctionResponse(
+                    name=fc.name, response={'result': BUDGET_EXHAUSTED_RESULT}
+                ))
+                for fc in calls
+            ]),
+            state
+        )
+
+    async def _send(self, content, state: _LoopState):
+        response = await self.chat.send_message_async(content)
+        state.model_calls += 1
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            prompt_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+            if state.model_calls == 1:
+                state.initial_prompt_tokens = prompt_tokens
+            state.prompt_tokens += prompt_tokens
+            state.completion_tokens += getattr(usage, 'candidates_token_count', 0) or 0
+        return response
+
+    @staticmethod
+    def _function_calls(response) -> List:
+        return [part.function_call for part in response.candidates[0].content.parts if part.function_call]
+
+    @staticmethod
+    def _text(response) -> str:
+        parts = response.candidates[0].content.parts
+        return "".join([part.text for part in parts if hasattr(part, 'text') and part.text])
@@ -0,0 +1,237 @@
+"""
+Tool Registry - Decorator-declared agent tools with generated schemas and argument validation
+"""
+
+import inspect
+import math
+import typing
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from core.tool_executor import POLICY_KEYS, ToolPolicy
+
+
+class ToolArgumentError(ValueError):
+    """Raised when a tool call's arguments don't match the tool's schema"""
+
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", dict: "object", list: "array"}
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """A tool as the runtime sees it: declaration, policy and handler method"""
+    name: str
+    description: str
+    parameters: Dict = field(default_factory=lambda: {"type": "object", "properties": {}})
+    policy: ToolPolicy = ToolPolicy()
+    # Name of the agent method that implements the tool; None for tools
+    # declared as plain dicts and dispatched through execute_tool()
+    method: Optional[str] = None
+
+    @classmethod
+    def from_definition(cls, definition: Dict) -> "ToolSpec":
+        return cls(
+            name=definition['name'],
+            description=definition.get('description', ""),
+            parameters=definition.get('parameters') or {"type": "object", "properties": {}},
+            policy=ToolPolicy.of(definition)
+        )
+
+    def definition(self) -> Dict:
+        """Tool definition dict, including the policy keys that are set"""
+        policy = {key: getattr(self.policy, key) for key in POLICY_KEYS if getattr(self.policy, key)}
+        # A timeout of 0 (no deadline) is meaningful too
+        if self.policy.timeout is not None:
+            policy['timeout'] = self.policy.timeout
+        return {"name": self.name, **policy, "description": self.description, "parameters": self.parameters}
+
+
+def _json_schema(annotation: Any) -> Dict:
+    """JSON schema for a parameter annotation (str, int, Optional[X], List[X], Dict, ...)"""
+    if annotation is inspect.Parameter.empty or annotation is Any:
+        return {}
+
+    origin = typing.get_origin(annotation)
+    if origin is Union:
+        # Optional[X] -> X
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        return _json_schema(args[0]) if len(args) == 1 else {}
+    if origin in (list, List):
+        args = typing.get_args(annotation)
+        schema = {"type": "array"}
+        if args and _json_schema(args[0]):
+            schema['items'] = _json_schema(args[0])
+        return schema
+    if origin in (dict, Dict):
+        return {"type": "object"}
+
+    json_type = _JSON_TYPES.get(annotation)
+    return {"type": json_type} if json_type else {}
+
+
+def tool(
+    description: str,
+    params: Optional[Dict[str, Union[str, Dict]]] = None,
+    name: Optional[str] = None,
+    **policy
+) -> Callable:
+    """Declare an agent method as a tool.
+
+    The parameter schema is generated from the method signature: annotations
+    give the JSON types and parameters without a default are required.
+    `params` maps a parameter to its description, or to a schema dict for
+    shapes an annotation can't express (enums, arrays of objects); the
+    generated type is filled in when the dict has none. Remaining keyword
+    arguments are ToolPolicy fields (read_only, cache_ttl, timeout, ...).
+
+        @tool("일정 확인", params={"date": "조회할 날짜"}, read_only=True)
+        def check_schedule(self, date: Optional[str] = None) -> Dict:
+            ...
+    """
+    unknown = set(policy) - set(POLICY_KEYS)
+    if unknown:
+        raise TypeError(f"Unknown tool policy keys: {sorted(unknown)}")
+    params = params or {}
+
+    def decorate(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        properties: Dict[str, Dict] = {}
+        required: List[str] = []
+        for parameter in list(signature.parameters.values())[1:]:
+            extra = params.get(parameter.name, {})
+            if isinstance(extra, str):
+                extra = {"description": extra}
+            properties[parameter.name] = {**_json_schema(parameter.annotation), **extra}
+            if parameter.default is inspect.Parameter.empty:
+                required.append(parameter.name)
+
+        schema: Dict[str, Any] = {"type": "object", "properties": properties}
+        if required:
+            schema['required'] = required
+
+        func.__tool_spec__ = ToolSpec(
+            name=name or func.__name__,
+            description=description,
+            parameters=schema,
+            policy=ToolPolicy(**policy),
+            method=func.__name__
+        )
+        return func
+
+    return decorate
+
+
+_class_tools: Dict[type, Dict[str, ToolSpec]] = {}
+
+
+def collect_tools(cls: type) -> Dict[str, ToolSpec]:
+    """Decorated tools of a class and its bases, in declaration order (bases first)"""
+    tools = _class_tools.get(cls)
+    if tools is None:
+        tools = {}
+        for klass in reversed(cls.__mro__):
+            for attribute in vars(klass).values():
+                spec = getattr(attribute, '__tool_spec__', None)
+                if spec:
+                    tools[spec.name] = spec
+        _class_tools[cls] = tools
+    return tools
+
+
+def validate_arguments(schema: Dict, arguments: Dict) -> Dict:
+    """Check arguments against a tool's parameter schema, coercing where the intent is clear.
+
+    Scalars are converted to the declared primitive type (numbers to
+    strings, numeric strings to numbers, whole-number floats to int since
+    function-call numbers arrive as protobuf floats, "true"/"false" to
+    booleans) and fields the schema doesn't declare are dropped with a
+    warning. Raises ToolArgumentError naming the first field that is
+    missing while required or cannot be converted.
+    """
+    return _validate(schema, arguments if arguments is not None else {}, "")
+
+
+def _number(value: str) -> Union[int, float, None]:
+    """int or float parsed from a numeric string, else None"""
+    text = value.strip().replace(",", "")
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _coerce(expected: Optional[str], value: Any, label: str) -> Any:
+    """Scalar value converted to a primitive JSON type"""
+    if expected == "string":
+        if isinstance(value, str):
+            return value
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        if isinstance(value, (int, float)):
+            return str(value)
+        raise ToolArgumentError(f"{label} must be a string")
+
+    if expected in ("integer", "number"):
+        number = value
+        if isinstance(value, str):
+            number = _number(value)
+        if number is None or isinstance(number, bool) or not isinstance(number, (int, float)):
+            raise ToolArgumentError(f"{label} must be {'an integer' if expected == 'integer' else 'a number'}")
+        if expected == "integer" and isinstance(number, float):
+            if not number.is_integer():
+                raise ToolArgumentError(f"{label} must be an integer")
+            number = int(number)
+        return number
+
+    if expected == "boolean":
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+            return value.strip().lower() == "true"
+        raise ToolArgumentError(f"{label} must be a boolean")
+
+    return value
+
+
+def _validate(schema: Dict, value: Any, where: str) -> Any:
+    label = where or "arguments"
+    expected = schema.get('type')
+
+    if expected == "object" or (expected is None and 'properties' in schema):
+        if not isinstance(value, dict):
+            raise ToolArgumentError(f"{label} must be an object")
+        properties = schema.get('properties')
+        if properties is None:
+            return value
+        for key in schema.get('required', []):
+            if value.get(key) is None:
+                raise ToolArgumentError(f"missing required field '{where + '.' if where else ''}{key}'")
+        checked = {}
+        for key, item in value.items():
+            if key not in properties:
+                print(f"⚠️ Ignoring unknown tool argument '{where + '.' if where else ''}{key}'")
+                continue
+            if item is None:
+                continue
+            checked[key] = _validate(properties[key], item, f"{where + '.' if where else ''}{key}")
+        return checked
+
+    if expected == "array":
+        if not isinstance(value, (list, tuple)):
+            raise ToolArgumentError(f"{label} must be an array")
+        items = schema.get('items')
+        return [_validate(items, item, f"{label}[{i}]") if items else item for i, item in enumerate(value)]
+
+    value = _coerce(expected, value, label)
+
+    if 'enum' in schema and value not in schema['enum']:
+        raise ToolArgumentError(f"{label} must be one of {schema['enum']}")
+    return value
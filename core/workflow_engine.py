@@ -0,0 +1,389 @@
+"""
+Workflow Engine - Dependency-aware DAG execution of sub-agent tasks
+"""
+
+import asyncio
+import json
+import sqlite3
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.context_manager import ContextManager
+
+
+NODE_FINISHED = ("succeeded", "failed", "skipped")
+
+
+class WorkflowValidationError(ValueError):
+    """Raised when a workflow definition is not a valid DAG"""
+
+
+def validate_workflow_nodes(nodes: List[Dict]) -> List[str]:
+    """Validate node definitions and return node IDs in topological order"""
+    if not nodes:
+        raise WorkflowValidationError("Workflow must contain at least one node")
+    if not all(isinstance(node, dict) for node in nodes):
+        raise WorkflowValidationError("Every node must be an object")
+
+    ids = [node.get('id') for node in nodes]
+    if not all(isinstance(node_id, str) and node_id for node_id in ids):
+        raise WorkflowValidationError("Every node requires a string 'id'")
+    if len(set(ids)) != len(ids):
+        raise WorkflowValidationError("Node IDs must be unique")
+
+    indegree = {node_id: 0 for node_id in ids}
+    downstream: Dict[str, List[str]] = {node_id: [] for node_id in ids}
+    for node in nodes:
+        if not all(isinstance(node.get(key), str) and node[key] for key in ('agent_id', 'task')):
+            raise WorkflowValidationError(f"Node '{node['id']}' requires string 'agent_id' and 'task'")
+        depends_on = node.get('depends_on', [])
+        # A bare string would otherwise be read one character at a time
+        if not isinstance(depends_on, list) or not all(isinstance(dep, str) for dep in depends_on):
+            raise WorkflowValidationError(f"Node '{node['id']}' 'depends_on' must be a list of node IDs")
+        for key in ('instructions', 'expected_output'):
+            if node.get(key) is not None and not isinstance(node[key], dict):
+                raise WorkflowValidationError(f"Node '{node['id']}' '{key}' must be an object")
+        max_retries = node.get('max_retries')
+        if max_retries is not None and (not isinstance(max_retries, int) or isinstance(max_retries, bool) or max_retries < 0):
+            raise WorkflowValidationError(f"Node '{node['id']}' 'max_retries' must be a non-negative integer")
+        for dep in depends_on:
+            if dep not in indegree:
+                raise WorkflowValidationError(f"Node '{node['id']}' depends on unknown node '{dep}'")
+            indegree[node['id']] += 1
+            downstream[dep].append(node['id'])
+
+    # Kahn's algorithm
+    order = []
+    ready = [node_id for node_id, degree in indegree.items() if degree == 0]
+    while ready:
+        node_id = ready.pop()
+        order.append(node_id)
+        for child in downstream[node_id]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+
+    if len(order) != len(ids):
+        raise WorkflowValidationError("Workflow contains a dependency cycle")
+    return order
+
+
+class WorkflowEngine:
+    """Runs master-submitted task DAGs, executing independent branches in parallel"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        context_manager: ContextManager,
+        dispatch: Callable[[str, str, Dict], Awaitable[str]],
+        default_max_retries: int = 1
+    ):
+        self.db_path = db_path
+        self.context_manager = context_manager
+        self.dispatch = dispatch
+        self.default_max_retries = default_max_retries
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self) -> None:
+        """Initialize database schema"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS workflows (
+                workflow_id TEXT PRIMARY KEY,
+                name TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                global_context TEXT,
+                created_at DATETIME NOT NULL,
+                started_at DATETIME,
+                finished_at DATETIME
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS workflow_nodes (
+                workflow_id TEXT NOT NULL,
+                node_id TEXT NOT NULL,
+                agent_id TEXT NOT NULL,
+                task TEXT NOT NULL,
+                depends_on TEXT NOT NULL,
+                instructions TEXT,
+                expected_output TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_retries INTEGER NOT NULL DEFAULT 0,
+                started_at DATETIME,
+                finished_at DATETIME,
+                PRIMARY KEY (workflow_id, node_id)
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def create(self, nodes: List[Dict], name: Optional[str] = None, global_context: Optional[Dict] = None) -> str:
+        """Validate and persist a new workflow; returns its ID"""
+        validate_workflow_nodes(nodes)
+        workflow_id = f"wf-{uuid.uuid4().hex[:16]}"
+
+        conn = self._connect()
+        conn.execute("""
+            INSERT INTO workflows (workflow_id, name, global_context, created_at)
+            VALUES (?, ?, ?, ?)
+        """, (workflow_id, name, json.dumps(global_context or {}, ensure_ascii=False), datetime.now().isoformat()))
+
+        conn.executemany("""
+            INSERT INTO workflow_nodes
+                (workflow_id, node_id, agent_id, task, depends_on, instructions, expected_output, max_retries)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                workflow_id,
+                node['id'],
+                node['agent_id'],
+                node['task'],
+                json.dumps(node.get('depends_on', [])),
+                json.dumps(node.get('instructions', {}), ensure_ascii=False),
+                json.dumps(node.get('expected_output', {}), ensure_ascii=False),
+                node.get('max_retries', self.default_max_retries)
+            )
+            for node in nodes
+        ])
+        conn.commit()
+        conn.close()
+
+        return workflow_id
+
+    def get(self, workflow_id: str) -> Optional[Dict]:
+        """Get workflow with all node states"""
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM workflows WHERE workflow_id = ?", (workflow_id,)).fetchone()
+        if not row:
+            conn.close()
+            return None
+
+        node_rows = conn.execute("""
+            SELECT * FROM workflow_nodes WHERE workflow_id = ? ORDER BY rowid
+        """, (workflow_id,)).fetchall()
+        conn.close()
+
+        return {
+            "workflow_id": row["workflow_id"],
+            "name": row["name"],
+            "status": row["status"],
+            "global_context": json.loads(row["global_context"] or "{}"),
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "nodes": [
+                {
+                    "id": n["node_id"],
+                    "agent_id": n["agent_id"],
+                    "task": n["task"],
+                    "depends_on": json.loads(n["depends_on"]),
+                    "instructions": json.loads(n["instructions"] or "{}"),
+                    "expected_output": json.loads(n["expected_output"] or "{}"),
+                    "status": n["status"],
+                    "result": n["result"],
+                    "error": n["error"],
+                    "attempts": n["attempts"],
+                    "max_retries": n["max_retries"],
+                    "started_at": n["started_at"],
+                    "finished_at": n["finished_at"]
+                }
+                for n in node_rows
+            ]
+        }
+
+    def _set_workflow(self, workflow_id: str, **fields) -> None:
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        conn = self._connect()
+        conn.execute(f"UPDATE workflows SET {assignments} WHERE workflow_id = ?", (*fields.values(), workflow_id))
+        conn.commit()
+        conn.close()
+
+    def _set_node(self, workflow_id: str, node_id: str, **fields) -> None:
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        conn = self._connect()
+        conn.execute(
+            f"UPDATE workflow_nodes SET {assignments} WHERE workflow_id = ? AND node_id = ?",
+            (*fields.values(), workflow_id, node_id)
+        )
+        conn.commit()
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def start(self, workflow_id: str) -> None:
+        """Run a workflow in the background"""
+        if workflow_id in self._tasks and not self._tasks[workflow_id].done():
+            return
+        self._tasks[workflow_id] = asyncio.create_task(self.run(workflow_id))
+
+    async def wait(self, workflow_id: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Wait for a running workflow to finish (or timeout) and return its state"""
+        task = self._tasks.get(workflow_id)
+        if task and not task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.get(workflow_id)
+
+    def retry(self, workflow_id: str, node_ids: Optional[List[str]] = None) -> None:
+        """Reset failed (or the given) nodes plus their skipped descendants and re-run"""
+        workflow = self.get(workflow_id)
+        if not workflow:
+            raise KeyError(workflow_id)
+        unknown = sorted(set(node_ids or []) - {n['id'] for n in workflow['nodes']})
+        if unknown:
+            raise WorkflowValidationError(f"Workflow '{workflow_id}' has no node(s) {', '.join(unknown)}")
+        if workflow_id in self._tasks and not self._tasks[workflow_id].done():
+            raise RuntimeError(f"Workflow '{workflow_id}' is still running")
+
+        targets = set(node_ids or [n['id'] for n in workflow['nodes'] if n['status'] == "failed"])
+        for node in workflow['nodes']:
+            if node['id'] in targets or node['status'] == "skipped":
+                self._set_node(workflow_id, node['id'], status="pending", error=None, attempts=0)
+
+        self.start(workflow_id)
+
+    def resume_incomplete(self) -> int:
+        """Restart workflows that were running when the server stopped"""
+        conn = self._connect()
+        rows = conn.execute("SELECT workflow_id FROM workflows WHERE status = 'running'").fetchall()
+        conn.execute("""
+            UPDATE workflow_nodes SET status = 'pending'
+            WHERE status = 'running'
+            AND workflow_id IN (SELECT workflow_id FROM workflows WHERE status = 'running')
+        """)
+        conn.commit()
+        conn.close()
+
+        for row in rows:
+            self.start(row["workflow_id"])
+        return len(rows)
+
+    async def run(self, workflow_id: str) -> Dict:
+        """Execute all runnable nodes; independent branches run concurrently"""
+        workflow = self.get(workflow_id)
+        nodes = {n['id']: n for n in workflow['nodes']}
+        downstream: Dict[str, List[str]] = {node_id: [] for node_id in nodes}
+        for node in nodes.values():
+            for dep in node['depends_on']:
+                downstream[dep].append(node['id'])
+
+        self._set_workflow(workflow_id, status="running", started_at=datetime.now().isoformat(), finished_at=None)
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            await self._run_loop(workflow, nodes, downstream, running)
+        except Exception as e:
+            # Don't leave the workflow 'running' with nothing driving it
+            print(f"❌ Workflow {workflow_id} aborted: {str(e)}")
+            for task in running:
+                task.cancel()
+            for node_id, node in nodes.items():
+                if node['status'] == "running":
+                    self._set_node(workflow_id, node_id, status="failed", error=f"Workflow aborted: {str(e)}")
+            self._set_workflow(workflow_id, status="failed", finished_at=datetime.now().isoformat())
+            return self.get(workflow_id)
+
+        final_status = "succeeded" if all(n['status'] == "succeeded" for n in nodes.values()) else "failed"
+        self._set_workflow(workflow_id, status=final_status, finished_at=datetime.now().isoformat())
+        return self.get(workflow_id)
+
+    async def _run_loop(
+        self,
+        workflow: Dict,
+        nodes: Dict[str, Dict],
+        downstream: Dict[str, List[str]],
+        running: Dict[asyncio.Task, str]
+    ) -> None:
+        """Start nodes as their dependencies finish until none are left to run"""
+        workflow_id = workflow['workflow_id']
+        while True:
+            for node_id, node in nodes.items():
+                if node['status'] != "pending":
+                    continue
+                dep_states = [nodes[dep]['status'] for dep in node['depends_on']]
+                if any(state in ("failed", "skipped") for state in dep_states):
+                    node['status'] = "skipped"
+                    self._set_node(workflow_id, node_id, status="skipped")
+                elif all(state == "succeeded" for state in dep_states):
+                    node['status'] = "running"
+                    task = asyncio.create_task(
+                        self._run_node(workflow, node, nodes, downstream[node_id])
+                    )
+                    running[task] = node_id
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node_id = running.pop(task)
+                nodes[node_id].update(task.result())
+
+    async def _run_node(self, workflow: Dict, node: Dict, nodes: Dict[str, Dict], children: List[str]) -> Dict:
+        workflow_id = workflow['workflow_id']
+        context_package = self.context_manager.create_context_package(
+            target_agent=node['agent_id'],
+            task_id=f"{workflow_id}:{node['id']}",
+            task_description=node['task'],
+            global_context=workflow['global_context'],
+            instructions=node['instructions'],
+            related_info={
+                "upstream_results": {
+                    dep: {"agent_id": nodes[dep]['agent_id'], "result": nodes[dep]['result']}
+                    for dep in node['depends_on']
+                }
+            },
+            expected_output=node['expected_output'],
+            collaboration={
+                "workflow_id": workflow_id,
+                "depends_on": node['depends_on'],
+                "downstream": children
+            }
+        )
+
+        attempts = node['attempts']
+        error = None
+        while attempts <= node['max_retries']:
+            attempts += 1
+            self._set_node(
+                workflow_id, node['id'],
+                status="running", attempts=attempts, started_at=datetime.now().isoformat()
+            )
+            try:
+                result = await self.dispatch(node['agent_id'], node['task'], context_package)
+                self._set_node(
+                    workflow_id, node['id'],
+                    status="succeeded", result=result, error=None, finished_at=datetime.now().isoformat()
+                )
+                return {"status": "succeeded", "result": result, "error": None, "attempts": attempts}
+            except Exception as e:
+                error = str(e)
+                print(f"⚠️ Workflow {workflow_id} node '{node['id']}' attempt {attempts} failed: {error}")
+
+        self._set_node(
+            workflow_id, node['id'],
+            status="failed", error=error, finished_at=datetime.now().isoformat()
+        )
+        return {"status": "failed", "error": error, "attempts": attempts}
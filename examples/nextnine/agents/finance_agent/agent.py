@@ -14,6 +14,7 @@ class FinanceAgent(BaseAgent):
         return [
             {
                 "name": "check_budget",
+                "read_only": True,
                 "description": "현재 예산 사용률 확인",
                 "parameters": {
                     "type": "object",
@@ -2,110 +2,242 @@
 Master Agent - Project orchestration and agent coordination
 """
 
+import asyncio
+import os
+
+import httpx
+
+from core.artifact_store import INLINE_MAX_CHARS
 from core.base_agent import BaseAgent
-from typing import Dict, List
+from core.job_queue import current_job_id
+from core.status_store import load_all_statuses
+from core.tool_registry import tool
+from typing import Dict, List, Optional
 
 
 class MasterAgent(BaseAgent):
     """Master Agent for project orchestration"""
     
-    def get_tool_definitions(self) -> List[Dict]:
-        """Master Agent specific tools"""
-        return [
-            {
-                "name": "delegate_task",
-                "description": "다른 에이전트에게 작업 위임",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "target_agent": {"type": "string", "description": "대상 에이전트 ID"},
-                        "task_description": {"type": "string", "description": "작업 설명"},
-                        "context": {"type": "object", "description": "컨텍스트 정보"}
-                    },
-                    "required": ["target_agent", "task_description"]
-                }
-            },
-            {
-                "name": "generate_report",
-                "description": "프로젝트 리포트 생성",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "report_type": {"type": "string", "enum": ["daily", "weekly", "monthly"]},
-                        "include_agents": {"type": "array", "items": {"type": "string"}}
-                    },
-                    "required": ["report_type"]
-                }
-            },
-            {
-                "name": "approve_decision",
-                "description": "주요 의사결정 승인",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "decision": {"type": "string", "description": "의사결정 내용"},
-                        "approved": {"type": "boolean"},
-                        "notes": {"type": "string"}
-                    },
-                    "required": ["decision", "approved"]
-                }
-            },
-            {
-                "name": "create_context_package",
-                "description": "서브 에이전트에게 전달할 컨텍스트 패키지 생성",
-                "parameters": {
+    def _api_base_url(self) -> str:
+        host = os.getenv("MCP_HOST", "localhost")
+        port = os.getenv("MCP_PORT", "8000")
+        return f"http://{host}:{port}/api/v1"
+
+    # Delegation tools wait up to DELEGATION_TIMEOUT themselves, so the
+    # executor's default deadline is disabled for them (timeout=0)
+    @tool(
+        "다른 에이전트에게 작업 위임",
+        params={
+            "target_agent": "대상 에이전트 ID",
+            "task_description": "작업 설명",
+            "context": "컨텍스트 정보"
+        },
+        timeout=0
+    )
+    async def delegate_task(self, target_agent: str, task_description: str, context: Optional[Dict] = None) -> Dict:
+        base_url = self._api_base_url()
+        try:
+            print(f"👑 Master Delegating to [{target_agent}]: {task_description[:50]}...")
+            
+            # Submit as a background job and poll with short requests instead of
+            # holding one connection open for the whole sub-agent turn
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                response = await client.post(
+                    f"{base_url}/jobs",
+                    json={
+                        "agent_id": target_agent,
+                        # The task stays inline: the sub-agent's history, search index and
+                        # routing evaluation read it. Large context values travel as
+                        # artifact references (same data dir)
+                        "message": task_description,
+                        "context_package": {
+                            key: self.artifact_store.externalize_value(value, INLINE_MAX_CHARS)
+                            for key, value in (context or {}).items()
+                        },
+                        # Runs in the child lane when this turn is itself a job waiting on it
+                        "parent_job_id": current_job_id.get()
+                    }
+                )
+                response.raise_for_status()
+                job_id = response.json()['job_id']
+                
+                deadline = asyncio.get_running_loop().time() + float(os.getenv("DELEGATION_TIMEOUT", 600))
+                while True:
+                    result = await self._fetch_job_result(client, base_url, job_id, wait=20)
+                    if result['status'] != "pending":
+                        return {**result, "agent_id": target_agent}
+                    if asyncio.get_running_loop().time() >= deadline:
+                        return {
+                            "status": "pending",
+                            "agent_id": target_agent,
+                            "job_id": job_id,
+                            "message": "작업이 아직 진행 중입니다. get_job_result로 결과를 확인하세요."
+                        }
+        except Exception as e:
+            return {"status": "error", "message": f"Delegation failed: {str(e)}"}
+
+    @tool(
+        "delegate_task가 시간 내에 끝나지 않아 반환한 job_id의 진행 상태 및 결과 조회",
+        params={"job_id": "작업 ID"}
+    )
+    async def get_job_result(self, job_id: str) -> Dict:
+        try:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                return await self._fetch_job_result(client, self._api_base_url(), job_id, wait=10)
+        except Exception as e:
+            return {"status": "error", "message": f"Job lookup failed: {str(e)}"}
+
+    @tool(
+        "의존 관계가 있는 여러 작업을 DAG로 한 번에 위임합니다. 의존성이 없는 작업은 병렬로 실행되고, 선행 작업 결과는 후속 작업의 컨텍스트로 자동 전달됩니다.",
+        params={
+            "name": "워크플로우 이름",
+            "global_context": "모든 작업에 공유할 전체 상황",
+            "nodes": {
+                "items": {
                     "type": "object",
                     "properties": {
-                        "target_agent": {"type": "string"},
-                        "global_context": {"type": "object"},
+                        "id": {"type": "string", "description": "작업 노드 ID"},
+                        "agent_id": {"type": "string", "description": "대상 에이전트 ID"},
+                        "task": {"type": "string", "description": "작업 설명"},
+                        "depends_on": {"type": "array", "items": {"type": "string"}, "description": "선행 노드 ID 목록"},
                         "instructions": {"type": "object"},
                         "expected_output": {"type": "object"}
                     },
-                    "required": ["target_agent", "instructions"]
-                }
+                    "required": ["id", "agent_id", "task"]
+                },
+                "description": "작업 노드 목록"
             }
-        ]
-
-    async def execute_tool(self, tool_name: str, parameters: Dict) -> Dict:
-        """Execute Master Agent specific tools"""
-        import httpx
-        import os
-        
-        host = os.getenv("MCP_HOST", "localhost")
-        port = os.getenv("MCP_PORT", "8000")
-        base_url = f"http://{host}:{port}/api/v1"
+        },
+        timeout=0
+    )
+    async def submit_workflow(self, nodes: List[Dict], name: Optional[str] = None, global_context: Optional[Dict] = None) -> Dict:
+        base_url = self._api_base_url()
+        try:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                response = await client.post(
+                    f"{base_url}/workflows",
+                    json={
+                        "name": name,
+                        "global_context": global_context or {},
+                        "nodes": nodes
+                    }
+                )
+                if response.status_code in (400, 404):
+                    return {"status": "error", "message": response.json().get('detail')}
+                response.raise_for_status()
+                workflow_id = response.json()['workflow_id']
+                print(f"👑 Master submitted workflow [{workflow_id}] with {len(nodes)} tasks")
+                return await self._await_workflow(client, base_url, workflow_id)
+        except Exception as e:
+            return {"status": "error", "message": f"Workflow submission failed: {str(e)}"}
 
-        if tool_name == "delegate_task":
-            try:
-                target_agent = parameters['target_agent']
-                task_description = parameters['task_description']
-                context = parameters.get('context', {})
-                
-                print(f"👑 Master Delegating to [{target_agent}]: {task_description[:50]}...")
-                
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    response = await client.post(
-                        f"{base_url}/agent/invoke",
-                        json={
-                            "agent_id": target_agent,
-                            "message": task_description,
-                            "context_package": context
-                        }
-                    )
+    @tool(
+        "워크플로우 진행 상태 조회. retry_failed가 true이면 실패한 노드만 다시 실행합니다.",
+        timeout=0
+    )
+    async def get_workflow_status(self, workflow_id: str, retry_failed: bool = False) -> Dict:
+        base_url = self._api_base_url()
+        try:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                if retry_failed:
+                    response = await client.post(f"{base_url}/workflows/{workflow_id}/retry", json={})
                     response.raise_for_status()
-                    result = response.json()
-                    return {"status": "success", "agent_id": target_agent, "response": result['response']}
-            except Exception as e:
-                return {"status": "error", "message": f"Delegation failed: {str(e)}"}
+                    return await self._await_workflow(client, base_url, workflow_id)
+                response = await client.get(f"{base_url}/workflows/{workflow_id}")
+                response.raise_for_status()
+                return self._summarize_workflow(response.json())
+        except Exception as e:
+            return {"status": "error", "message": f"Workflow lookup failed: {str(e)}"}
 
-        elif tool_name == "generate_report":
-            # This is a mock internal report generator
-            return {"status": "success", "message": f"{parameters['report_type']} 리포트가 생성 대기 중입니다."}
+    @tool(
+        "모든(또는 지정한) 서브 에이전트의 현재 작업 상태(진행/대기/차단/다음 단계)를 한 번에 조회",
+        params={
+            "agent_ids": "조회할 에이전트 ID (생략 시 전체)",
+            "blocked_only": "차단 이슈가 있는 에이전트만 조회"
+        },
+        read_only=True
+    )
+    def get_team_status(self, agent_ids: Optional[List[str]] = None, blocked_only: bool = False) -> Dict:
+        wanted = set(agent_ids or [])
+        statuses = {
+            agent_id: status
+            for agent_id, status in load_all_statuses(self.work_docs_dir.parent).items()
+            if agent_id != self.agent_id and (not wanted or agent_id in wanted)
+            and not (blocked_only and not status.blocking_issues)
+        }
+        return {
+            "status": "success",
+            "agents": {
+                agent_id: {k: v for k, v in status.to_dict().items() if v}
+                for agent_id, status in statuses.items()
+                if not status.is_empty()
+            },
+            "idle": sorted(agent_id for agent_id, status in statuses.items() if status.is_empty())
+        }
 
-        elif tool_name == "approve_decision":
-            return {"status": "success", "decision": parameters['decision'], "approved": parameters['approved']}
+    @tool("프로젝트 리포트 생성", params={"report_type": {"enum": ["daily", "weekly", "monthly"]}})
+    def generate_report(self, report_type: str, include_agents: Optional[List[str]] = None) -> Dict:
+        # This is a mock internal report generator
+        return {"status": "success", "message": f"{report_type} 리포트가 생성 대기 중입니다."}
 
-        elif tool_name == "create_context_package":
-            return {"status": "success", "package": parameters}
+    @tool("주요 의사결정 승인", params={"decision": "의사결정 내용"})
+    def approve_decision(self, decision: str, approved: bool, notes: Optional[str] = None) -> Dict:
+        return {"status": "success", "decision": decision, "approved": approved}
 
-        return {"status": "not_implemented", "tool": tool_name}
+    @tool("서브 에이전트에게 전달할 컨텍스트 패키지 생성")
+    def create_context_package(
+        self,
+        target_agent: str,
+        instructions: Dict,
+        global_context: Optional[Dict] = None,
+        expected_output: Optional[Dict] = None
+    ) -> Dict:
+        package = {
+            "target_agent": target_agent,
+            "global_context": global_context,
+            "instructions": instructions,
+            "expected_output": expected_output
+        }
+        return {"status": "success", "package": {k: v for k, v in package.items() if v is not None}}
+
+    async def _fetch_job_result(self, client, base_url: str, job_id: str, wait: float) -> Dict:
+        """Long-poll a job result; returns status 'pending' while the job is still running"""
+        response = await client.get(f"{base_url}/jobs/{job_id}/result", params={"wait": wait})
+        if response.status_code == 409:
+            return {"status": "pending", "job_id": job_id}
+        if response.status_code == 500:
+            return {"status": "error", "job_id": job_id, "message": response.json().get('detail')}
+        response.raise_for_status()
+        return {
+            "status": "success",
+            "job_id": job_id,
+            "response": self.artifact_store.externalize(response.json()['response'], INLINE_MAX_CHARS)
+        }
+
+    async def _await_workflow(self, client, base_url: str, workflow_id: str) -> Dict:
+        """Long-poll a workflow until it finishes or DELEGATION_TIMEOUT elapses"""
+        deadline = asyncio.get_running_loop().time() + float(os.getenv("DELEGATION_TIMEOUT", 600))
+        while True:
+            response = await client.get(f"{base_url}/workflows/{workflow_id}", params={"wait": 20})
+            response.raise_for_status()
+            workflow = response.json()
+            if workflow['status'] != "running" or asyncio.get_running_loop().time() >= deadline:
+                return self._summarize_workflow(workflow)
+
+    def _summarize_workflow(self, workflow: Dict) -> Dict:
+        """Keep only what the model needs from a workflow record"""
+        return {
+            "status": "pending" if workflow['status'] == "running" else workflow['status'],
+            "workflow_id": workflow['workflow_id'],
+            "nodes": [
+                {
+                    "id": node['id'],
+                    "agent_id": node['agent_id'],
+                    "status": node['status'],
+                    **({"result": self.artifact_store.externalize_value(node['result'], INLINE_MAX_CHARS)}
+                       if node['status'] == "succeeded" else {}),
+                    **({"error": node['error']} if node['error'] else {})
+                }
+                for node in workflow['nodes']
+            ]
+        }
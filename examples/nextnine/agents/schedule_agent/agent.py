@@ -28,6 +28,7 @@ class ScheduleAgent(BaseAgent):
             },
             {
                 "name": "check_schedule",
+                "read_only": True,
                 "description": "일정 확인",
                 "parameters": {
                     "type": "object",
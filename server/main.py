@@ -4,20 +4,36 @@ FastAPI MCP Server - Main entry point
 
 import os
 import sys
+import json
+import time
+import asyncio
 from pathlib import Path
 
 # Add parent directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import Optional, Dict
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, List
 from dotenv import load_dotenv
 import uvicorn
 
 from core.agent_loader import AgentLoader
 from core.history_manager import HistoryManager
+from core.artifact_store import ArtifactStore, get_artifact_store
 from core.context_manager import ContextManager
+from core.job_queue import JobQueue, JobWorkerPool, FINISHED_STATUSES
+from core.workflow_engine import WorkflowEngine, WorkflowValidationError
+from core.router import KeywordRouter, RoutingMetrics, evaluate_routing, load_routing_samples
+from core.semantic_router import SemanticRouter
+from core.agent_actor import ActorSystem, MailboxFullError
+from core.status_board import StatusBoard
+from core.tool_cache import tool_cache
+from core.tool_executor import tool_executor
+from core.tool_loop import TurnResult
+from core.token_usage import UsageMonitor, estimate_cost
+from core.action_index import ActionLogIndex, open_action_index
 
 # Load environment variables
 load_dotenv()
@@ -32,7 +48,25 @@ app = FastAPI(
 # Global instances
 agent_loader: Optional[AgentLoader] = None
 history_manager: Optional[HistoryManager] = None
+artifact_store: Optional[ArtifactStore] = None
 context_manager: Optional[ContextManager] = None
+job_queue: Optional[JobQueue] = None
+job_pool: Optional[JobWorkerPool] = None
+actor_system: Optional[ActorSystem] = None
+status_board = StatusBoard()
+workflow_engine: Optional[WorkflowEngine] = None
+retention_task: Optional[asyncio.Task] = None
+action_index: Optional[ActionLogIndex] = None
+action_index_task: Optional[asyncio.Task] = None
+keyword_router: Optional[KeywordRouter] = None
+semantic_router: Optional[SemanticRouter] = None
+routing_metrics = RoutingMetrics()
+usage_monitor = UsageMonitor(
+    ratio=float(os.getenv("PROMPT_SECTION_ALERT_RATIO", 0.5)),
+    min_tokens=int(os.getenv("PROMPT_SECTION_ALERT_MIN_TOKENS", 2000))
+)
+
+MASTER_AGENT_ID = os.getenv("MASTER_AGENT_ID", "master_agent")
 
 
 class AgentRequest(BaseModel):
@@ -41,6 +75,7 @@ class AgentRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
     context_package: Optional[Dict] = None
+    auto_route: Optional[bool] = None
 
 
 class AgentResponse(BaseModel):
@@ -50,12 +85,43 @@ class AgentResponse(BaseModel):
     session_id: str
     response: str
     status: str = "success"
+    routed_from: Optional[str] = None
+    loop_stats: Optional[Dict] = None
+
+
+class RouteRequest(BaseModel):
+    """Request model for routing preview"""
+    message: str
+    # Capped again at the number of loaded agents
+    k: int = Field(3, ge=1, le=50)
+
+
+class JobRequest(BaseModel):
+    """Request model for asynchronous job submission"""
+    agent_id: str
+    message: str
+    session_id: Optional[str] = None
+    context_package: Optional[Dict] = None
+    webhook_url: Optional[str] = None
+    parent_job_id: Optional[str] = None
+
+
+class WorkflowRequest(BaseModel):
+    """Request model for workflow (task DAG) submission"""
+    name: Optional[str] = None
+    global_context: Optional[Dict] = None
+    nodes: List[Dict]
+
+
+class WorkflowRetryRequest(BaseModel):
+    """Request model for retrying workflow nodes"""
+    node_ids: Optional[List[str]] = None
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize agents and managers on startup"""
-    global agent_loader, history_manager, context_manager
+    global agent_loader, history_manager, artifact_store, context_manager, job_queue, job_pool, actor_system, workflow_engine, keyword_router, semantic_router, retention_task, action_index, action_index_task
     
     print("🚀 Starting MCP Multi-Agent Server...")
     
@@ -63,6 +129,7 @@ async def startup_event():
     base_dir = Path(__file__).parent.parent
     config_path = base_dir / "agentconfig.json"
     db_path = base_dir / "data" / "history.db"
+    jobs_db_path = base_dir / "data" / "jobs.db"
     work_docs_dir = base_dir / "data" / "work_docs"
     
     # Ensure directories exist
@@ -75,7 +142,8 @@ async def startup_event():
         print("⚠️  Warning: GEMINI_API_KEY not set in environment")
     
     # Initialize managers
-    history_manager = HistoryManager(db_path)
+    artifact_store = get_artifact_store(base_dir / "data")
+    history_manager = HistoryManager(db_path, archive_dir=base_dir / "data" / "archive")
     context_manager = ContextManager(work_docs_dir)
     
     # Load agents
@@ -86,6 +154,169 @@ async def startup_event():
     except Exception as e:
         print(f"❌ Failed to load agents: {str(e)}")
         raise
+    
+    # Build fast-routing index
+    keyword_router = KeywordRouter(
+        min_score=float(os.getenv("FAST_ROUTING_MIN_SCORE", 4.0)),
+        min_margin=float(os.getenv("FAST_ROUTING_MIN_MARGIN", 2.0)),
+        excluded_agents=[MASTER_AGENT_ID]
+    )
+    semantic_router = SemanticRouter(
+        min_score=float(os.getenv("SEMANTIC_ROUTING_MIN_SCORE", 0.25)),
+        min_margin=float(os.getenv("SEMANTIC_ROUTING_MIN_MARGIN", 0.05)),
+        excluded_agents=[MASTER_AGENT_ID]
+    )
+    for agent in agent_loader.agents.values():
+        keyword_router.add_agent(agent)
+        semantic_router.add_agent(agent)
+        status_board.watch(agent)
+    
+    # Each agent processes its turns from a bounded mailbox
+    actor_system = ActorSystem(
+        default_concurrency=int(os.getenv("AGENT_MAX_CONCURRENCY", 2)),
+        default_mailbox_size=int(os.getenv("AGENT_MAILBOX_SIZE", 32)),
+        agent_settings={
+            a['id']: {k: a[k] for k in ('max_concurrency', 'mailbox_size') if k in a}
+            for a in agent_loader.config.get('agents', [])
+        }
+    )
+    
+    # Start job workers
+    job_queue = JobQueue(jobs_db_path)
+    job_pool = JobWorkerPool(
+        job_queue,
+        _run_job,
+        max_workers=int(os.getenv("JOB_WORKERS", 4)),
+        default_agent_concurrency=int(os.getenv("JOB_AGENT_CONCURRENCY", 2)),
+        max_child_workers=int(os.getenv("JOB_CHILD_WORKERS", os.getenv("JOB_WORKERS", 4))),
+        agent_concurrency={
+            a['id']: a['job_concurrency']
+            for a in agent_loader.config.get('agents', [])
+            if 'job_concurrency' in a
+        }
+    )
+    await job_pool.start()
+    
+    # Workflows share the job database and run their nodes as jobs
+    workflow_engine = WorkflowEngine(
+        jobs_db_path,
+        context_manager,
+        _dispatch_workflow_node,
+        default_max_retries=int(os.getenv("WORKFLOW_NODE_RETRIES", 1))
+    )
+    resumed = workflow_engine.resume_incomplete()
+    if resumed:
+        print(f"♻️ Resumed {resumed} workflow(s)")
+    
+    # Periodically move old sessions to cold storage
+    if int(os.getenv("HISTORY_RETENTION_DAYS", 90)) > 0:
+        retention_task = asyncio.create_task(_retention_loop())
+    
+    # Tail agent_actions.log into data/action_index.db for tool analytics
+    action_index = open_action_index(base_dir / "data")
+    action_index_task = asyncio.create_task(_action_index_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers"""
+    if retention_task:
+        retention_task.cancel()
+    if action_index_task:
+        action_index_task.cancel()
+    if job_pool:
+        await job_pool.stop()
+    if actor_system:
+        await actor_system.stop()
+    tool_executor.shutdown()
+
+
+async def _retention_loop():
+    """Archive sessions older than HISTORY_RETENTION_DAYS every HISTORY_RETENTION_INTERVAL seconds"""
+    retention_days = int(os.getenv("HISTORY_RETENTION_DAYS", 90))
+    interval = int(os.getenv("HISTORY_RETENTION_INTERVAL", 3600))
+    while True:
+        try:
+            # SQLite and compression work stays off the event loop
+            result = await asyncio.to_thread(history_manager.archive_sessions, retention_days)
+            if result['sessions_archived']:
+                print(f"🧊 Archived {result['sessions_archived']} session(s), {result['messages_archived']} message(s)")
+        except Exception as e:
+            print(f"⚠️ History retention failed: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+async def _action_index_loop():
+    """Index new agent_actions.log lines every ACTION_INDEX_INTERVAL seconds"""
+    interval = int(os.getenv("ACTION_INDEX_INTERVAL", 60))
+    while True:
+        try:
+            result = await asyncio.to_thread(action_index.ingest)
+            if result['skipped']:
+                print(f"⚠️ Skipped {result['skipped']} malformed action log line(s)")
+        except Exception as e:
+            print(f"⚠️ Action log indexing failed: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+async def _run_agent(
+    agent,
+    message: str,
+    session_id: str,
+    context_package: Optional[Dict] = None,
+    wait_for_slot: bool = True
+) -> TurnResult:
+    """Process a message through the agent's mailbox and record the exchange in history"""
+    turn = await actor_system.actor_for(agent).ask(
+        message,
+        session_id,
+        context_package,
+        wait_for_slot=wait_for_slot
+    )
+    
+    # Save to history, with the model-reported usage when there is one
+    # (the whole turn's input on the user message, its output on the reply)
+    if history_manager:
+        stats = turn.stats or {}
+        history_manager.save_message(session_id, agent.agent_id, "user", message, tokens=stats.get('prompt_tokens') or None)
+        history_manager.save_message(session_id, agent.agent_id, "model", turn.response, tokens=stats.get('completion_tokens') or None)
+    
+    if turn.stats:
+        sections = turn.stats.get('prompt_sections') or {}
+        usage_monitor.check(agent.agent_id, session_id, sections)
+        if history_manager:
+            history_manager.record_usage(
+                session_id,
+                agent.agent_id,
+                turn.stats['prompt_tokens'],
+                turn.stats['completion_tokens'],
+                model_calls=turn.stats.get('model_calls', 0),
+                tool_calls=turn.stats['tool_calls'],
+                stop_reason=turn.stats['stop_reason'],
+                sections=sections
+            )
+    
+    status_board.record_turn(agent.agent_id)
+    return turn
+
+
+async def _run_job(job: Dict) -> Dict:
+    """Job worker entry point"""
+    agent = agent_loader.get_agent(job['agent_id']) if agent_loader else None
+    if not agent:
+        raise ValueError(f"Agent '{job['agent_id']}' not found")
+    
+    turn = await _run_agent(agent, job['message'], job['session_id'], job['context_package'])
+    # Fail the job so callers (workflow nodes, delegations) see an error, not its text as a result
+    if turn.failed:
+        raise RuntimeError(turn.response)
+    return {
+        "agent_id": agent.agent_id,
+        "agent_name": agent.agent_name,
+        "session_id": job['session_id'],
+        "response": turn.response,
+        "loop_stats": turn.stats
+    }
 
 
 @app.get("/")
@@ -111,6 +342,138 @@ async def list_agents():
     }
 
 
+@app.get("/api/v1/agents/status")
+async def get_all_agent_status(request: Request, since: int = 0):
+    """Aggregated status of every agent.
+    
+    Served from memory; send If-None-Match with the last ETag to get 304
+    when nothing changed, or `since` with the last version to receive
+    only the agents that changed.
+    """
+    if request.headers.get("if-none-match") == status_board.etag:
+        return Response(status_code=304, headers={"ETag": status_board.etag})
+    
+    snapshot = status_board.snapshot(since)
+    return JSONResponse(snapshot, headers={"ETag": snapshot['etag']})
+
+
+@app.get("/api/v1/agents/queues")
+async def get_agent_queues():
+    """Mailbox depth and in-flight turns per agent"""
+    if not actor_system:
+        raise HTTPException(status_code=500, detail="Actor system not initialized")
+    
+    return {"queues": actor_system.stats()}
+
+
+@app.get("/api/v1/tools/cache")
+async def get_tool_cache_stats():
+    """Hit/miss counters of the cross-turn tool result cache"""
+    return tool_cache.stats()
+
+
+@app.get("/api/v1/tools/stats")
+async def get_tool_stats():
+    """Per-tool call counts, errors, timeouts and latency"""
+    return tool_executor.stats()
+
+
+@app.get("/api/v1/actions/summary")
+async def get_action_summary(
+    group_by: str = "tool",
+    agent_id: Optional[str] = None,
+    tool: Optional[str] = None,
+    outcome: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    sort: str = "p95_ms",
+    limit: int = 50
+):
+    """Tool call counts, error rates and latency percentiles from the indexed action log.
+    
+    since/until take an ISO date or a relative age such as 7d or 12h.
+    """
+    if not action_index:
+        raise HTTPException(status_code=500, detail="Action index not initialized")
+    
+    try:
+        # Catch up with the log first so the answer includes the latest calls
+        await asyncio.to_thread(action_index.ingest)
+        return await asyncio.to_thread(
+            action_index.summary, group_by, agent_id, tool, outcome, since, until, sort, min(limit, 500)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/v1/actions")
+async def get_actions(
+    agent_id: Optional[str] = None,
+    tool: Optional[str] = None,
+    outcome: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    sort: str = "recent",
+    limit: int = 50
+):
+    """Individual tool calls from the indexed action log (sort: recent | slowest)"""
+    if not action_index:
+        raise HTTPException(status_code=500, detail="Action index not initialized")
+    
+    try:
+        await asyncio.to_thread(action_index.ingest)
+        calls = await asyncio.to_thread(
+            action_index.calls, agent_id, tool, outcome, since, until, sort, min(limit, 500)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"calls": calls, "count": len(calls)}
+
+
+@app.get("/api/v1/artifacts")
+async def get_artifact_stats():
+    """Blob count, stored size and dedupe counters of the artifact store"""
+    if not artifact_store:
+        raise HTTPException(status_code=500, detail="Artifact store not initialized")
+    
+    return artifact_store.stats()
+
+
+@app.get("/api/v1/artifacts/{ref}")
+async def get_artifact(ref: str, offset: int = 0, length: int = 65536):
+    """Read an artifact referenced as sha256:<hex> in history, logs or tool results"""
+    if not artifact_store:
+        raise HTTPException(status_code=500, detail="Artifact store not initialized")
+    
+    result = artifact_store.read(ref, offset=offset, length=length)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Artifact '{ref}' not found")
+    return result
+
+
+@app.get("/api/v1/usage")
+async def get_token_usage(
+    group_by: str = "agent",
+    agent_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = 50
+):
+    """Token usage per agent, session or day, with oversized prompt section alerts"""
+    if not history_manager:
+        raise HTTPException(status_code=500, detail="History manager not initialized")
+    
+    try:
+        summary = history_manager.usage_summary(group_by, agent_id, session_id, since, min(limit, 500))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    for entry in [summary['totals'], *summary['rows']]:
+        entry['estimated_cost_usd'] = estimate_cost(entry['prompt_tokens'], entry['completion_tokens'])
+    summary['alerts'] = usage_monitor.snapshot()
+    return summary
+
+
 @app.post("/api/v1/admin/register_agent")
 async def register_agent(agent_config: Dict):
     """Register a new agent at runtime"""
@@ -119,6 +482,11 @@ async def register_agent(agent_config: Dict):
     
     try:
         agent = agent_loader.add_agent_dynamic(agent_config)
+        if keyword_router:
+            keyword_router.add_agent(agent)
+        if semantic_router:
+            semantic_router.add_agent(agent)
+        status_board.watch(agent)
         return {
             "status": "success",
             "message": f"Agent {agent.agent_name} registered successfully",
@@ -148,26 +516,35 @@ async def invoke_agent(request: AgentRequest):
     # Generate session ID if not provided
     session_id = request.session_id or f"session-{os.urandom(8).hex()}"
     
+    # Pre-LLM routing: obvious requests to the master go straight to the sub-agent
+    fast_route = _should_fast_route(request)
+    routed_from = None
+    if fast_route:
+        decision = _route_message(request.message)
+        target = agent_loader.get_agent(decision['agent_id']) if decision['agent_id'] else None
+        if target:
+            print(f"⚡ Fast-routed to [{target.agent_id}] via {decision['method']}")
+            routed_from = agent.agent_id
+            agent = target
+    
     try:
-        # Process message
-        response = await agent.process(
-            user_message=request.message,
-            session_id=session_id,
-            context_package=request.context_package
-        )
-        
-        # Save to history
-        if history_manager:
-            history_manager.save_message(session_id, request.agent_id, "user", request.message)
-            history_manager.save_message(session_id, request.agent_id, "model", response)
+        started = time.perf_counter()
+        # Interactive callers get backpressure instead of waiting behind a full mailbox
+        turn = await _run_agent(agent, request.message, session_id, request.context_package, wait_for_slot=False)
+        if fast_route:
+            routing_metrics.record(routed_from is not None, time.perf_counter() - started)
         
         return AgentResponse(
-            agent_id=request.agent_id,
+            agent_id=agent.agent_id,
             agent_name=agent.agent_name,
             session_id=session_id,
-            response=response
+            response=turn.response,
+            routed_from=routed_from,
+            loop_stats=turn.stats
         )
         
+    except MailboxFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -175,6 +552,271 @@ async def invoke_agent(request: AgentRequest):
         )
 
 
+def _route_message(message: str, k: int = 3) -> Dict:
+    """Keyword match first; fall back to the semantic index when keywords are inconclusive"""
+    keyword = keyword_router.route(message)
+    semantic = semantic_router.route(message, k) if semantic_router else None
+    
+    if keyword['agent_id']:
+        agent_id, method = keyword['agent_id'], "keyword"
+    elif semantic and semantic['agent_id']:
+        agent_id, method = semantic['agent_id'], "semantic"
+    else:
+        agent_id, method = None, None
+    
+    return {"agent_id": agent_id, "method": method, "keyword": keyword, "semantic": semantic}
+
+
+def _should_fast_route(request: AgentRequest) -> bool:
+    """Only user-facing requests to the master are candidates for fast routing"""
+    if not keyword_router or request.agent_id != MASTER_AGENT_ID or request.context_package:
+        return False
+    if request.auto_route is not None:
+        return request.auto_route
+    return os.getenv("FAST_ROUTING_ENABLED", "true").lower() == "true"
+
+
+async def _dispatch_workflow_node(agent_id: str, message: str, context_package: Dict) -> str:
+    """Run a workflow node through the job queue so per-agent limits apply"""
+    job = job_queue.submit(
+        agent_id=agent_id,
+        message=message,
+        session_id=f"session-{os.urandom(8).hex()}",
+        context_package=context_package,
+        # The workflow waits on its nodes, so they run in the child lane
+        parent_job_id=context_package.get('collaboration', {}).get('workflow_id')
+    )
+    job_pool.notify()
+    
+    job_id = job['job_id']
+    while True:
+        job = await job_pool.wait(job_id, timeout=60)
+        if job is None:
+            raise RuntimeError(f"Job '{job_id}' disappeared from the job queue")
+        if job['status'] == "succeeded":
+            return job['result']['response']
+        if job['status'] == "failed":
+            raise RuntimeError(job['error'])
+
+
+@app.post("/api/v1/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """Submit an agent invocation to run in the background"""
+    if not agent_loader or not job_queue:
+        raise HTTPException(status_code=500, detail="Job queue not initialized")
+    
+    if not agent_loader.get_agent(request.agent_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Agent '{request.agent_id}' not found"
+        )
+    
+    session_id = request.session_id or f"session-{os.urandom(8).hex()}"
+    job = job_queue.submit(
+        agent_id=request.agent_id,
+        message=request.message,
+        session_id=session_id,
+        context_package=request.context_package,
+        webhook_url=request.webhook_url,
+        parent_job_id=request.parent_job_id
+    )
+    job_pool.notify()
+    
+    return {
+        "job_id": job['job_id'],
+        "agent_id": job['agent_id'],
+        "session_id": session_id,
+        "status": job['status']
+    }
+
+
+@app.get("/api/v1/jobs")
+async def list_jobs(agent_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
+    """List recent jobs"""
+    if not job_queue:
+        raise HTTPException(status_code=500, detail="Job queue not initialized")
+    
+    jobs = job_queue.list_jobs(agent_id, status, limit)
+    return {
+        "jobs": jobs,
+        "total": len(jobs),
+        "workers": job_pool.stats()
+    }
+
+
+@app.get("/api/v1/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Get job status"""
+    if not job_queue:
+        raise HTTPException(status_code=500, detail="Job queue not initialized")
+    
+    job = job_queue.get(job_id, include_result=False)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+
+@app.get("/api/v1/jobs/{job_id}/result")
+async def get_job_result(job_id: str, wait: float = 0):
+    """Get job result, optionally waiting up to `wait` seconds for completion"""
+    if not job_queue:
+        raise HTTPException(status_code=500, detail="Job queue not initialized")
+    
+    job = await job_pool.wait(job_id, timeout=min(wait, 60)) if wait > 0 else job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    
+    if job['status'] == "failed":
+        raise HTTPException(status_code=500, detail=f"Job failed: {job['error']}")
+    if job['status'] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    
+    return job['result']
+
+
+@app.get("/api/v1/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-Sent Events stream that emits status changes until the job finishes"""
+    if not job_queue:
+        raise HTTPException(status_code=500, detail="Job queue not initialized")
+    
+    job = job_queue.get(job_id, include_result=False)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    
+    async def event_stream():
+        last_status = None
+        while True:
+            current = await job_pool.wait(job_id, timeout=15)
+            if current['status'] != last_status:
+                last_status = current['status']
+                event = "completed" if last_status in FINISHED_STATUSES else "status"
+                payload = {k: v for k, v in current.items() if k not in ("message", "context_package")}
+                yield f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+            else:
+                # Keep-alive comment for proxies
+                yield ": keep-alive\n\n"
+            
+            if last_status in FINISHED_STATUSES:
+                break
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.post("/api/v1/workflows", status_code=202)
+async def submit_workflow(request: WorkflowRequest):
+    """Submit a DAG of sub-agent tasks; independent nodes run in parallel"""
+    if not workflow_engine:
+        raise HTTPException(status_code=500, detail="Workflow engine not initialized")
+    
+    unknown = [n.get('agent_id') for n in request.nodes if not agent_loader.get_agent(n.get('agent_id') or "")]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown agents: {unknown}")
+    
+    try:
+        workflow_id = workflow_engine.create(request.nodes, request.name, request.global_context)
+    except WorkflowValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    workflow_engine.start(workflow_id)
+    return {"workflow_id": workflow_id, "status": "running"}
+
+
+@app.get("/api/v1/workflows/{workflow_id}")
+async def get_workflow(workflow_id: str, wait: float = 0):
+    """Get workflow and node states, optionally waiting up to `wait` seconds for completion"""
+    if not workflow_engine:
+        raise HTTPException(status_code=500, detail="Workflow engine not initialized")
+    
+    workflow = await workflow_engine.wait(workflow_id, timeout=min(wait, 60)) if wait > 0 else workflow_engine.get(workflow_id)
+    if not workflow:
+        raise HTTPException(status_code=404, detail=f"Workflow '{workflow_id}' not found")
+    return workflow
+
+
+@app.post("/api/v1/workflows/{workflow_id}/retry", status_code=202)
+async def retry_workflow(workflow_id: str, request: WorkflowRetryRequest):
+    """Re-run failed (or selected) nodes; succeeded nodes keep their results"""
+    if not workflow_engine:
+        raise HTTPException(status_code=500, detail="Workflow engine not initialized")
+    
+    try:
+        workflow_engine.retry(workflow_id, request.node_ids)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Workflow '{workflow_id}' not found")
+    except WorkflowValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    return {"workflow_id": workflow_id, "status": "running"}
+
+
+@app.post("/api/v1/route")
+async def preview_route(request: RouteRequest):
+    """Preview which agent a message would be dispatched to, without running it"""
+    if not keyword_router:
+        raise HTTPException(status_code=500, detail="Router not initialized")
+    
+    decision = _route_message(request.message, min(request.k, max(1, len(keyword_router.agent_ids))))
+    return {
+        "agent_id": decision['agent_id'] or MASTER_AGENT_ID,
+        "method": decision['method'] or "master",
+        "keyword": decision['keyword'],
+        "semantic": decision['semantic']
+    }
+
+
+@app.get("/api/v1/routing/metrics")
+async def get_routing_metrics():
+    """Fast-routing decision counters and estimated latency savings"""
+    if not keyword_router:
+        raise HTTPException(status_code=500, detail="Router not initialized")
+    
+    return {
+        "thresholds": {"min_score": keyword_router.min_score, "min_margin": keyword_router.min_margin},
+        "indexed_agents": len(keyword_router.agent_ids),
+        "metrics": routing_metrics.snapshot()
+    }
+
+
+@app.get("/api/v1/routing/evaluate")
+async def evaluate_routing_accuracy(limit: int = 5000):
+    """Replay logged sessions through the fast router and report its accuracy"""
+    if not keyword_router:
+        raise HTTPException(status_code=500, detail="Router not initialized")
+    
+    history_samples = []
+    if history_manager:
+        history_samples = [
+            (m['message'], m['agent_id'])
+            for m in history_manager.load_user_messages(exclude_agents=[MASTER_AGENT_ID], limit=limit)
+        ]
+    action_log_file = Path(__file__).parent.parent / "data" / "logs" / "agent_actions.log"
+    samples = load_routing_samples(action_log_file, history_samples, limit)
+    
+    evaluation = {"keyword": keyword_router.evaluate(samples)}
+    # Without the embedding index only the keyword stage can be scored
+    if semantic_router:
+        evaluation["semantic"] = semantic_router.evaluate(samples)
+    evaluation["combined"] = evaluate_routing(
+        lambda message: _combined_decision(_route_message(message)),
+        samples,
+        keyword_router.agent_ids
+    )
+    routing_metrics.last_evaluation = {
+        name: {k: v for k, v in result.items() if k != "misroutes"}
+        for name, result in evaluation.items()
+    }
+    return evaluation
+
+
+def _combined_decision(decision: Dict) -> Dict:
+    """Shape a _route_message result like a single router decision"""
+    source = decision['keyword'] if decision['method'] == "keyword" or not decision['semantic'] else decision['semantic']
+    return {"agent_id": decision['agent_id'], "candidates": source['candidates']}
+
+
 @app.get("/api/v1/agent/{agent_id}/status")
 async def get_agent_status(agent_id: str):
     """Get agent's current status from work_docs"""
@@ -183,9 +825,11 @@ async def get_agent_status(agent_id: str):
     
     try:
         context = context_manager.load_agent_context(agent_id)
+        queue = actor_system.stats(agent_id) if actor_system else []
         return {
             "agent_id": agent_id,
-            "context": context
+            "context": context,
+            "queue": queue[0] if queue else None
         }
     except Exception as e:
         raise HTTPException(
@@ -195,32 +839,83 @@ async def get_agent_status(agent_id: str):
 
 
 @app.get("/api/v1/sessions")
-async def list_sessions(agent_id: Optional[str] = None):
-    """List conversation sessions"""
+async def list_sessions(agent_id: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None):
+    """List conversation sessions, most recent first (pass next_cursor to get the next page)"""
     if not history_manager:
         raise HTTPException(status_code=500, detail="History manager not initialized")
     
-    sessions = history_manager.list_sessions(agent_id)
+    try:
+        page = history_manager.list_sessions(agent_id, min(limit, 500), cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     return {
-        "sessions": sessions,
-        "total": len(sessions)
+        "sessions": page['sessions'],
+        "count": len(page['sessions']),
+        "next_cursor": page['next_cursor']
     }
 
 
 @app.get("/api/v1/session/{session_id}/history")
-async def get_session_history(session_id: str, limit: int = 50):
-    """Get conversation history for a session"""
+async def get_session_history(session_id: str, limit: int = 50, before: Optional[int] = None):
+    """Get conversation history for a session (pass next_cursor as `before` for older messages)"""
     if not history_manager:
         raise HTTPException(status_code=500, detail="History manager not initialized")
     
-    history = history_manager.load_history(session_id, limit)
+    page = history_manager.load_history_page(session_id, min(limit, 500), before)
     session_info = history_manager.get_session_info(session_id)
     
     return {
         "session_id": session_id,
         "session_info": session_info,
-        "history": history,
-        "message_count": len(history)
+        "history": page['history'],
+        "message_count": len(page['history']),
+        "next_cursor": page['next_cursor']
+    }
+
+
+@app.post("/api/v1/admin/history/archive")
+async def archive_history(older_than_days: Optional[int] = None):
+    """Archive sessions inactive for longer than `older_than_days` (default HISTORY_RETENTION_DAYS) now"""
+    if not history_manager:
+        raise HTTPException(status_code=500, detail="History manager not initialized")
+    
+    if older_than_days is None:
+        older_than_days = int(os.getenv("HISTORY_RETENTION_DAYS", 90))
+    result = await asyncio.to_thread(history_manager.archive_sessions, older_than_days)
+    return {**result, **history_manager.archive_stats()}
+
+
+@app.get("/api/v1/history/search")
+async def search_history(
+    q: str,
+    agent_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    sort: str = "rank"
+):
+    """Full-text search over conversation history (sort: rank | recent).
+    
+    since/until are ISO dates or times in server local time unless they
+    carry an offset; result timestamps are UTC.
+    """
+    if not history_manager:
+        raise HTTPException(status_code=500, detail="History manager not initialized")
+    if sort not in ("rank", "recent"):
+        raise HTTPException(status_code=400, detail="sort must be 'rank' or 'recent'")
+    
+    try:
+        result = history_manager.search(q, agent_id, session_id, since, until, min(limit, 100), offset, sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "query": q,
+        "results": result['results'],
+        "count": len(result['results']),
+        "next_offset": result['next_offset']
     }
 
 
@@ -99,6 +99,207 @@ def test_directories():
     return all_exist
 
 
+def test_history_query_plans():
+    """Test that history queries are served by indexes (no full scans or sorts)"""
+    print("🧪 Testing history query plans...")
+    
+    import sqlite3
+    import tempfile
+    
+    from core.history_manager import HistoryManager
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "history.db"
+        manager = HistoryManager(db_path)
+        for i in range(200):
+            manager.save_message(f"session-{i % 20}", f"agent-{i % 4}", "user", f"message {i}")
+        
+        # Record the SQL the manager actually runs
+        statements = []
+        original_connect = sqlite3.connect
+        
+        def tracing_connect(*args, **kwargs):
+            conn = original_connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+        
+        sqlite3.connect = tracing_connect
+        try:
+            manager.load_history("session-3", limit=5)
+            page = manager.load_history_page("session-3", limit=5)
+            manager.load_history_page("session-3", limit=5, before_id=page['next_cursor'])
+            first = manager.list_sessions(limit=5)
+            manager.list_sessions(limit=5, cursor=first['next_cursor'])
+            first = manager.list_sessions("agent-1", limit=2)
+            manager.list_sessions("agent-1", limit=2, cursor=first['next_cursor'])
+        finally:
+            sqlite3.connect = original_connect
+        
+        conn = sqlite3.connect(db_path)
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+        assert selects, "no history queries were traced"
+        for sql in selects:
+            steps = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            query = " ".join(sql.split())[:70]
+            print(f"  {query}...")
+            print(f"      {' | '.join(steps)}")
+            assert any("USING INDEX" in step or "USING COVERING INDEX" in step or "USING INTEGER PRIMARY KEY" in step
+                       for step in steps), f"no index used: {query} -> {steps}"
+            assert not any(step.startswith("SCAN") and "INDEX" not in step for step in steps), \
+                f"table scan: {query} -> {steps}"
+            assert not any("TEMP B-TREE" in step for step in steps), f"sort without an index: {query} -> {steps}"
+        conn.close()
+    
+    print("\n✅ History queries use indexes!\n")
+
+
+def test_workflow_node_failure():
+    """Test that a node whose agent turn errors is retried and fails its workflow"""
+    print("🧪 Testing workflow node failure...")
+    
+    import asyncio
+    import tempfile
+    
+    import core.base_agent
+    import server.main as server
+    from core.agent_actor import ActorSystem
+    from core.base_agent import BaseAgent
+    from core.job_queue import JobQueue, JobWorkerPool
+    from core.workflow_engine import WorkflowEngine
+    
+    class FailingToolLoop:
+        """Stands in for the model: every turn raises"""
+        def __init__(self, *args, **kwargs):
+            pass
+        
+        async def run(self, prompt):
+            raise RuntimeError("model unavailable")
+    
+    class PlainAgent(BaseAgent):
+        pass
+    
+    async def scenario(tmp: Path):
+        agent = PlainAgent(
+            agent_id="finance_agent", agent_name="Finance", role="Budget", tone="plain",
+            keywords=[], gemini_api_key="test", work_docs_dir=tmp / "work_docs"
+        )
+        
+        class Loader:
+            def get_agent(self, agent_id):
+                return agent if agent_id == agent.agent_id else None
+        
+        server.agent_loader = Loader()
+        server.history_manager = None
+        server.actor_system = ActorSystem()
+        server.job_queue = JobQueue(tmp / "jobs.db")
+        server.job_pool = JobWorkerPool(server.job_queue, server._run_job, poll_interval=0.05)
+        await server.job_pool.start()
+        engine = WorkflowEngine(tmp / "jobs.db", server.ContextManager(tmp / "work_docs"), server._dispatch_workflow_node)
+        try:
+            workflow_id = engine.create([
+                {"id": "budget", "agent_id": "finance_agent", "task": "예산 집계", "max_retries": 1},
+                {"id": "report", "agent_id": "finance_agent", "task": "보고서 작성", "depends_on": ["budget"]}
+            ])
+            return await asyncio.wait_for(engine.run(workflow_id), 30)
+        finally:
+            await server.job_pool.stop()
+            await server.actor_system.stop()
+    
+    original_loop = core.base_agent.ToolLoop
+    core.base_agent.ToolLoop = FailingToolLoop
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            workflow = asyncio.run(scenario(Path(tmp)))
+    finally:
+        core.base_agent.ToolLoop = original_loop
+    
+    nodes = {node['id']: node for node in workflow['nodes']}
+    assert workflow['status'] == "failed", workflow['status']
+    assert nodes['budget']['status'] == "failed", nodes['budget']
+    assert nodes['budget']['attempts'] == 2, nodes['budget']['attempts']
+    assert "model unavailable" in nodes['budget']['error'], nodes['budget']['error']
+    assert nodes['report']['status'] == "skipped", nodes['report']
+    print("\n✅ Failed node was retried and failed its workflow!\n")
+
+
+def test_status_debounce_from_worker_thread():
+    """Test that a status update made on a tool worker thread is written by the debounce timer"""
+    print("🧪 Testing status debounce from a worker thread...")
+    
+    import asyncio
+    import tempfile
+    import threading
+    
+    from core.status_store import StatusStore, read_status
+    
+    def update_in_tool_thread(store: StatusStore, item: str) -> None:
+        # Same shape as ToolExecutor._offload: a short-lived loop on a worker thread
+        async def tool():
+            store.update([item], [], [], [])
+        
+        thread = threading.Thread(target=lambda: asyncio.run(tool()))
+        thread.start()
+        thread.join()
+    
+    async def scenario(agent_dir: Path):
+        store = StatusStore(agent_dir, "Finance", flush_delay=0.1)
+        update_in_tool_thread(store, "예산 집계")
+        update_in_tool_thread(store, "보고서 작성")
+        assert store.writes == 0, store.writes
+        await asyncio.sleep(0.3)
+        return store
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store = asyncio.run(scenario(Path(tmp)))
+        assert store.writes == 1, store.writes
+        assert read_status(Path(tmp)).in_progress == ["보고서 작성"]
+    print("\n✅ Debounced status write landed!\n")
+
+
+def test_requeue_interrupted_children():
+    """Test that restart re-queues parents but fails children they will delegate again"""
+    print("🧪 Testing interrupted job recovery...")
+    
+    import tempfile
+    
+    from core.job_queue import JobQueue
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(Path(tmp) / "jobs.db")
+        
+        def running(parent_job_id=None):
+            job = queue.submit("finance_agent", "작업", "session-1", parent_job_id=parent_job_id)
+            claimed = queue.claim_next()
+            assert claimed['job_id'] == job['job_id']
+            return job['job_id']
+        
+        parent = running()
+        child = running(parent)
+        node = running("wf-0123456789abcdef")
+        finished_parent = running()
+        queue.complete(finished_parent, {"response": "pending"})
+        detached = running(finished_parent)
+        
+        assert queue.requeue_interrupted() == (2, 2)
+        status = {job_id: queue.get(job_id) for job_id in (parent, child, node, detached)}
+        assert status[parent]['status'] == "queued"
+        assert status[child]['status'] == "failed" and status[child]['error'] == "interrupted"
+        assert status[node]['status'] == "failed"
+        # Its parent already returned and polls for the result, so it still has to run
+        assert status[detached]['status'] == "queued"
+    print("\n✅ Interrupted children are not run twice!\n")
+
+
+def _passes(test) -> bool:
+    """Run an asserting test for the summary below"""
+    try:
+        test()
+        return True
+    except Exception as e:
+        print(f"\n❌ {test.__name__} failed: {e!r}\n")
+        return False
+
+
 def main():
     """Run all tests"""
     print("\n" + "="*50)
@@ -110,6 +311,10 @@ def main():
     results.append(("Directory Structure", test_directories()))
     results.append(("Configuration", test_config()))
     results.append(("Module Imports", test_imports()))
+    results.append(("History Query Plans", _passes(test_history_query_plans)))
+    results.append(("Workflow Node Failure", _passes(test_workflow_node_failure)))
+    results.append(("Status Debounce", _passes(test_status_debounce_from_worker_thread)))
+    results.append(("Interrupted Job Recovery", _passes(test_requeue_interrupted_children)))
     
     print("\n" + "="*50)
     print("  Test Summary")